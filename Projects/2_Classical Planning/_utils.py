@@ -15,17 +15,34 @@ class PrintableProblem(InstrumentedProblem):
         return '{:^10d}  {:^10d}  {:^10d}  {:^10d}'.format(
             len(self.problem.actions_list), self.succs, self.goal_tests, self.states)
 
+    def details(self):
+        """ Return the timing, memory & frontier statistics as printable lines """
+        stats = self.stats()
+        rss = "n/a" if stats["peak_rss_kb"] is None else "{} KB".format(stats["peak_rss_kb"])
+        return ("Expansions/sec: {expansions_per_sec:.1f}  Peak frontier: {max_frontier}  "
+                "Peak explored: {max_explored}  Peak RSS: {rss}\n"
+                "Heuristic: {heuristic_time:.4f}s in {heuristic_calls} calls  "
+                "actions(): {actions_time:.4f}s  result(): {result_time:.4f}s").format(rss=rss, **stats)
 
-def run_search(problem, search_function, parameter=None):
-    ip = PrintableProblem(problem)
+
+def print_progress(stats):
+    """ Progress callback for PrintableProblem that prints the search statistics so far """
+    print("  ... {expansions} expansions in {elapsed:.1f}s ({expansions_per_sec:.1f}/s), "
+          "frontier {max_frontier}, heuristic {heuristic_time:.1f}s".format(**stats), flush=True)
+
+
+def run_search(problem, search_function, parameter=None, progress_interval=None):
+    progress = print_progress if progress_interval else None
+    ip = PrintableProblem(problem, progress, progress_interval or 10.0)
     start = timer()
     if parameter is not None:
-        node = search_function(ip, parameter)
+        node = search_function(ip, ip.timed_heuristic(parameter))
     else:
         node = search_function(ip)
     end = timer()
     print("\n# Actions   Expansions   Goal Tests   New Nodes")
     print("{}\n".format(ip))
+    print("{}\n".format(ip.details()))
     show_solution(node, end - start)
     print()
 
@@ -109,11 +126,12 @@ def conjunctive_sentence(pos_list, neg_list):
 
 def encode_state(fs, fluent_map):
     """ Convert a FluentState (list of positive fluents and negative fluents) into
-    an ordered sequence of True/False values.
+    an integer bitset.
 
     It is sometimes convenient to encode a problem in terms of the specific
     fluents that are True or False in a state, but other times it is easier (or faster)
-    to perform computations on an an array of booleans.
+    to perform computations on a bitset (e.g., testing the preconditions of an
+    action is a single mask operation).
 
     Parameters
     ----------
@@ -125,23 +143,29 @@ def encode_state(fs, fluent_map):
     
     Returns
     -------
-    tuple of True/False elements corresponding to the fluents in fluent_map
+    int with one bit for each fluent in fluent_map that is set if the fluent is
+    True (i.e., in the pos list of fs); the first fluent is the most significant
+    bit, so encoded states are ordered the same way as the sequences of
+    True/False values they replace (which keeps search tie-breaking unchanged)
     """
-    return tuple([f in fs.pos for f in fluent_map])
+    pos = set(fs.pos)
+    last = len(fluent_map) - 1
+    return sum(1 << (last - i) for i, f in enumerate(fluent_map) if f in pos)
 
 
 def decode_state(state, fluent_map):
-    """ Convert an ordered list of True/False values into a FluentState
-    (list of positive fluents and negative fluents)
+    """ Convert an integer bitset into a FluentState (list of positive fluents
+    and negative fluents)
 
     It is sometimes convenient to encode a problem in terms of the specific
     fluents that are True or False in a state, but other times it is easier (or faster)
-    to perform computations on an an array of booleans.
+    to perform computations on a bitset.
 
     Parameters
     ----------
     state:
-        A state represented as an ordered sequence of True/False values
+        A state represented as an int bitset (see encode_state; an ordered
+        sequence of True/False values is also accepted)
 
     fluent_map:
         An ordered sequence of fluents
@@ -152,9 +176,12 @@ def decode_state(state, fluent_map):
     entries from the input state in the pos_list, and containing the fluents from
     fluent_map corresponding to False entries in the neg_list
     """
+    last = len(fluent_map) - 1
+    if not isinstance(state, int):
+        state = sum(1 << (last - i) for i, elem in enumerate(state) if elem)
     fs = FluentState(set(), set())
-    for idx, elem in enumerate(state):
-        if elem:
+    for idx in range(len(fluent_map)):
+        if state >> (last - idx) & 1:
             fs.pos.append(fluent_map[idx])
         else:
             fs.neg.append(fluent_map[idx])
@@ -9,6 +9,12 @@ from .utils import (
 )
 
 import sys
+from time import perf_counter
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
 
 infinity = float('inf')
 
@@ -64,6 +70,12 @@ class Problem:
         """For optimization problems, each state has a value.  Hill-climbing
         and related algorithms try to maximize this value."""
         raise NotImplementedError
+
+    def expanded(self, frontier, explored):
+        """Called by the tree & graph searches after each node expansion with
+        the current frontier and explored set. The default method does
+        nothing; InstrumentedProblem uses it to track the search."""
+        pass
 # ______________________________________________________________________________
 
 
@@ -143,6 +155,7 @@ def tree_search(problem, frontier):
         if problem.goal_test(node.state):
             return node
         frontier.extend(node.expand(problem))
+        problem.expanded(frontier, ())
     return None
 
 
@@ -160,6 +173,7 @@ def graph_search(problem, frontier):
         frontier.extend(child for child in node.expand(problem)
                         if child.state not in explored and
                         child not in frontier)
+        problem.expanded(frontier, explored)
     return None
 
 
@@ -194,6 +208,7 @@ def breadth_first_search(problem):
                 if problem.goal_test(child.state):
                     return child
                 frontier.append(child)
+        problem.expanded(frontier, explored)
     return None
 
 
@@ -223,8 +238,9 @@ def best_first_graph_search(problem, f):
             elif child in frontier:
                 incumbent = frontier[child]
                 if f(child) < f(incumbent):
-                    # del frontier[incumbent]
+                    del frontier[incumbent]
                     frontier.append(child)
+        problem.expanded(frontier, explored)
     return None
 
 
@@ -317,20 +333,40 @@ def recursive_best_first_search(problem, h=None):
 
 class InstrumentedProblem(Problem):
 
-    """Delegates to a problem, and keeps statistics."""
+    """Delegates to a problem, and keeps statistics.
 
-    def __init__(self, problem):
+    MODIFIED FROM AIMA VERSION
+        - Time the calls to actions() & result(), and to heuristics wrapped
+          with timed_heuristic()
+        - Track the peak frontier & explored set sizes (see Problem.expanded)
+        - Call progress(self.stats()) every progress_interval seconds of search
+    """
+
+    def __init__(self, problem, progress=None, progress_interval=10.0):
         self.problem = problem
         self.succs = self.goal_tests = self.states = 0
         self.found = None
+        self.actions_time = self.result_time = self.heuristic_time = 0.0
+        self.heuristic_calls = 0
+        self.max_frontier = self.max_explored = 0
+        self.progress = progress
+        self.progress_interval = progress_interval
+        self.start = perf_counter()
+        self._next_progress = self.start + progress_interval
 
     def actions(self, state):
         self.succs += 1
-        return self.problem.actions(state)
+        start = perf_counter()
+        actions = self.problem.actions(state)
+        self.actions_time += perf_counter() - start
+        return actions
 
     def result(self, state, action):
         self.states += 1
-        return self.problem.result(state, action)
+        start = perf_counter()
+        result = self.problem.result(state, action)
+        self.result_time += perf_counter() - start
+        return result
 
     def goal_test(self, state):
         self.goal_tests += 1
@@ -345,6 +381,36 @@ class InstrumentedProblem(Problem):
     def value(self, state):
         return self.problem.value(state)
 
+    def expanded(self, frontier, explored):
+        self.max_frontier = max(self.max_frontier, len(frontier))
+        self.max_explored = max(self.max_explored, len(explored))
+        if self.progress is not None:
+            now = perf_counter()
+            if now >= self._next_progress:
+                self._next_progress = now + self.progress_interval
+                self.progress(self.stats())
+
+    def timed_heuristic(self, h):
+        """Return a wrapper of the heuristic function h(node) that adds the
+        time spent in each call to self.heuristic_time"""
+        def timed(node):
+            start = perf_counter()
+            value = h(node)
+            self.heuristic_time += perf_counter() - start
+            self.heuristic_calls += 1
+            return value
+        return timed
+
+    def stats(self):
+        """Return a dict of the search statistics so far"""
+        elapsed = perf_counter() - self.start
+        return dict(expansions=self.succs, goal_tests=self.goal_tests, new_nodes=self.states,
+                    elapsed=elapsed, expansions_per_sec=self.succs / elapsed if elapsed else 0.0,
+                    actions_time=self.actions_time, result_time=self.result_time,
+                    heuristic_time=self.heuristic_time, heuristic_calls=self.heuristic_calls,
+                    max_frontier=self.max_frontier, max_explored=self.max_explored,
+                    peak_rss_kb=peak_rss_kb())
+
     def __getattr__(self, attr):
         return getattr(self.problem, attr)
 
@@ -353,6 +419,15 @@ class InstrumentedProblem(Problem):
                                      self.states, str(self.found)[:4])
 
 
+def peak_rss_kb():
+    """Return the peak resident set size of this process in KB (None if it
+    is not available on this platform)"""
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss // 1024 if sys.platform == 'darwin' else rss  # macOS reports bytes
+
+
 def compare_searchers(problems, header,
                       searchers=[breadth_first_tree_search,
                                  breadth_first_search,
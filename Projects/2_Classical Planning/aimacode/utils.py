@@ -313,8 +313,7 @@ class Queue:
         q.pop()         -- return the top item from the queue
         len(q)          -- number of items in q (also q.__len())
         item in q       -- does q contain item?
-    Note that isinstance(Stack(), Queue) is false, because we implement stacks
-    as lists.  If Python ever gets interfaces, Queue will be an interface."""
+    If Python ever gets interfaces, Queue will be an interface."""
 
     def __init__(self):
         raise NotImplementedError
@@ -324,9 +323,37 @@ class Queue:
             self.append(item)
 
 
-def Stack():
-    """Return an empty list, suitable as a Last-In-First-Out Queue."""
-    return []
+class Stack(Queue):
+    """A Last-In-First-Out Queue implemented with a list
+
+    MODIFIED FROM AIMA VERSION
+        - Use a class instead of a plain list
+        - Use an additional Counter to track membership, so `item in q` is a
+          hash lookup instead of a scan of the list (search nodes hash and
+          compare by state, so membership is keyed on the state). A Counter
+          is used because tree search can push several nodes with the same
+          state.
+    """
+    def __init__(self):
+        self.A = []
+        self._A = Counter()
+
+    def append(self, item):
+        self.A.append(item)
+        self._A[item] += 1
+
+    def __len__(self):
+        return len(self.A)
+
+    def pop(self):
+        item = self.A.pop()
+        self._A[item] -= 1
+        if not self._A[item]:
+            del self._A[item]
+        return item
+
+    def __contains__(self, item):
+        return item in self._A
 
 
 class FIFOQueue(Queue):
@@ -363,31 +390,47 @@ class PriorityQueue(Queue):
     MODIFIED FROM AIMA VERSION
         - Use heapq
         - Use an additional dict to track membership
+        - Each item is stored once: appending an item that is already in the
+          queue replaces it, and `del q[item]` removes it. Replaced & removed
+          heap entries are marked dead and skipped by pop() (lazy deletion),
+          which gives decrease-key without searching the heap.
     """
 
     def __init__(self, order=None, f=lambda x: x):
-        self.A = []
-        self._A = Counter()
+        self.A = []  # heap of [f(item), item, live] entries
+        self._entries = {}
         self.f = f
 
     def append(self, item):
-        heapq.heappush(self.A, (self.f(item), item))
-        self._A[item] += 1
+        if item in self._entries:
+            del self[item]
+        entry = [self.f(item), item, True]
+        self._entries[item] = entry
+        heapq.heappush(self.A, entry)
 
     def __len__(self):
-        return len(self.A)
+        return len(self._entries)
 
     def pop(self):
-        _, item = heapq.heappop(self.A)
-        self._A[item] -= 1
-        return item
+        while self.A:
+            _, item, live = heapq.heappop(self.A)
+            if live:
+                del self._entries[item]
+                return item
+        raise IndexError("pop from an empty priority queue")
 
     def __contains__(self, item):
-        return self._A[item] > 0
+        return item in self._entries
 
     def __getitem__(self, key):
-        if self._A[key] > 0:
-            return key
+        """Return the item in the queue that is equal to key"""
+        return self._entries[key][1]
+
+    def __delitem__(self, key):
+        self._entries.pop(key)[2] = False
+        if len(self.A) > 2 * len(self._entries) + 64:
+            self.A = [entry for entry in self.A if entry[2]]
+            heapq.heapify(self.A)
 
 # ______________________________________________________________________________
 # Useful Shorthands
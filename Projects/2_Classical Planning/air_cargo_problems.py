@@ -1,6 +1,8 @@
 
+from random import Random
+
 from aimacode.planning import Action
-from aimacode.utils import expr
+from aimacode.utils import Expr
 from _utils import (
     FluentState, encode_state, decode_state, create_expressions, make_relations
 )
@@ -49,59 +51,69 @@ class AirCargoProblem(BasePlanningProblem):
         expensive to call this method directly; however, it is called in the
         constructor and the results cached in the `actions_list` property.
 
+        Only the actions that can become applicable are grounded: a relaxed
+        reachability analysis from the initial state (see reachable_relations())
+        finds the At & In fluents that can ever be True, and a Load, Unload or
+        Fly action is created only if all of its preconditions are among them.
+        The literals are built directly as Expr objects rather than parsed with
+        `expr()`. The actions are in the same order as a full grounding.
+
         Returns
         -------
             list of Action objects
         """
+        symbols = {name: Expr(name) for name in self.cargos + self.planes + self.airports}
+        literals = {}
+
+        def literal(op, x, y):
+            """ Return the (shared) Expr op(x, y) """
+            key = (op, x, y)
+            if key not in literals:
+                literals[key] = Expr(op, symbols[x], symbols[y])
+            return literals[key]
+
+        def action(op, args, precond_pos, effect_add, effect_rem):
+            return Action(Expr(op, *(symbols[x] for x in args)),
+                          [precond_pos, []], [effect_add, effect_rem])
+
+        at, inside = self.reachable_relations()
+        cargos, planes = set(self.cargos), set(self.planes)
+        cargo_index = {c: i for i, c in enumerate(self.cargos)}
+        plane_index = {p: i for i, p in enumerate(self.planes)}
+        airport_index = {a: i for i, a in enumerate(self.airports)}
 
         def load_actions():
-            """ Create all concrete Load actions
+            """ Create the concrete Load actions of cargos & planes that can
+            both be at the same airport
 
             Returns
             -------
             collection of Action objects
             """
-            loads = []
-            for c in self.cargos:
-                for p in self.planes:
-                    for a in self.airports:
-                        precond_pos = set([expr("At({}, {})".format(c, a)),
-                                       expr("At({}, {})".format(p, a))
-                                       ])
-                        precond_neg = set([])
-                        effect_add = set([expr("In({}, {})".format(c, p))])
-                        effect_rem = set([expr("At({}, {})".format(c, a))])
-                        load = Action(expr("Load({}, {}, {})".format(c, p, a)),
-                                      [precond_pos, precond_neg],
-                                      [effect_add, effect_rem])
-                        loads.append(load)
-            return loads
+            args = sorted(((c, p, a) for a in self.airports for c in at[a] & cargos
+                           for p in at[a] & planes),
+                          key=lambda x: (cargo_index[x[0]], plane_index[x[1]], airport_index[x[2]]))
+            return [action("Load", (c, p, a), [literal("At", c, a), literal("At", p, a)],
+                           [literal("In", c, p)], [literal("At", c, a)])
+                    for c, p, a in args]
 
         def unload_actions():
-            """Create all concrete Unload actions
+            """ Create the concrete Unload actions of cargos that can be in a
+            plane at each airport the plane can reach
 
             Returns
             -------
             collection of Action objects
             """
-            unloads = []
-            for c in self.cargos:
-                for p in self.planes:
-                    for a in self.airports:
-                        precond_pos = set([expr("In({}, {})".format(c, p)),
-                                       expr("At({}, {})".format(p, a)),
-                                       ])
-                        precond_neg = set([])
-                        effect_add = set([expr("At({}, {})".format(c, a))])
-                        effect_rem = set([expr("In({}, {})".format(c, p))])
-                        unload = Action(expr("Unload({}, {}, {})".format(c, p, a)),
-                                      [precond_pos, precond_neg],
-                                      [effect_add, effect_rem])
-                        unloads.append(unload)
-            return unloads
+            args = sorted(((c, p, a) for p in self.planes for c in inside[p]
+                           for a in self.airports if p in at[a]),
+                          key=lambda x: (cargo_index[x[0]], plane_index[x[1]], airport_index[x[2]]))
+            return [action("Unload", (c, p, a), [literal("In", c, p), literal("At", p, a)],
+                           [literal("At", c, a)], [literal("In", c, p)])
+                    for c, p, a in args]
 
         def fly_actions():
-            """Create all concrete Fly actions
+            """ Create the concrete Fly actions from each airport a plane can reach
 
             Returns
             -------
@@ -112,19 +124,59 @@ class AirCargoProblem(BasePlanningProblem):
                 for to in self.airports:
                     if fr != to:
                         for p in self.planes:
-                            precond_pos = set([expr("At({}, {})".format(p, fr)),
-                                           ])
-                            precond_neg = set([])
-                            effect_add = set([expr("At({}, {})".format(p, to))])
-                            effect_rem = set([expr("At({}, {})".format(p, fr))])
-                            fly = Action(expr("Fly({}, {}, {})".format(p, fr, to)),
-                                         [precond_pos, precond_neg],
-                                         [effect_add, effect_rem])
-                            flys.append(fly)
+                            if p in at[fr]:
+                                flys.append(action("Fly", (p, fr, to), [literal("At", p, fr)],
+                                                   [literal("At", p, to)], [literal("At", p, fr)]))
             return flys
 
         return load_actions() + unload_actions() + fly_actions()
 
+    def reachable_relations(self):
+        """ Find the At & In fluents that can become True from the initial state
+        when the delete effects of the actions are ignored
+
+        Each fluent is processed once when it is first reached, and only
+        triggers the actions that have it as a precondition, so the analysis
+        takes time proportional to the number of reachable actions.
+
+        Returns
+        -------
+        (dict, dict)
+            A dict mapping each airport to the set of cargos & planes that can
+            be at it, and a dict mapping each plane to the set of cargos that
+            can be in it
+        """
+        cargos, planes = set(self.cargos), set(self.planes)
+        at = {a: set() for a in self.airports}
+        inside = {p: set() for p in self.planes}
+        airports_of = {p: set() for p in self.planes}
+        queue = []
+        for fluent in decode_state(self.initial, self.state_map).pos:
+            x, y = (str(arg) for arg in fluent.args)
+            if fluent.op == "At" and x in cargos | planes and y in at:
+                queue.append(("At", x, y))
+            elif fluent.op == "In" and x in cargos and y in inside:
+                queue.append(("In", x, y))
+
+        while queue:
+            op, x, y = queue.pop()
+            if op == "At":
+                if x in at[y]: continue
+                at[y].add(x)
+                if x in planes:
+                    if not airports_of[x]:  # Fly: a plane at any airport can reach every airport
+                        queue.extend(("At", x, a) for a in self.airports)
+                    airports_of[x].add(y)
+                    queue.extend(("In", c, x) for c in at[y] & cargos)  # Load
+                    queue.extend(("At", c, y) for c in inside[x])  # Unload
+                else:
+                    queue.extend(("In", x, p) for p in at[y] & planes)  # Load
+            else:
+                if x in inside[y]: continue
+                inside[y].add(x)
+                queue.extend(("At", x, a) for a in airports_of[y])  # Unload
+        return at, inside
+
 
 def air_cargo_p1():
     cargos = ['C1', 'C2']
@@ -199,3 +251,45 @@ def air_cargo_p4():
     init = FluentState(pos, [r for r in at_relations + in_relations if r not in pos])
     goal = create_expressions(['At(C1, JFK)', 'At(C2, SFO)', 'At(C3, JFK)', 'At(C4, SFO)', 'At(C5, JFK)'])
     return AirCargoProblem(cargos, planes, airports, init, goal)
+
+
+def air_cargo(n_cargos, n_planes, n_airports, seed=None):
+    """ Generate a random air cargo problem of a given size
+
+    Each cargo & plane starts at a random airport, and each cargo must be
+    delivered to a random airport other than its starting airport. Planes
+    can fly between any two airports, so every instance is solvable.
+
+    Parameters
+    ----------
+    n_cargos, n_planes, n_airports : int
+        The number of cargos (at least 1), planes (at least 1), and airports
+        (at least 2)
+
+    seed : int, None
+        Seed for the random placement (the same seed always generates the
+        same problem)
+
+    Returns
+    -------
+    AirCargoProblem
+
+    Examples
+    --------
+    >>> problem = air_cargo(10, 3, 5, seed=0)
+    """
+    if n_cargos < 1 or n_planes < 1 or n_airports < 2:
+        raise ValueError("air cargo problems need at least 1 cargo, 1 plane, and 2 airports")
+    rng = Random(seed)
+    cargos = ['C{}'.format(i) for i in range(1, n_cargos + 1)]
+    planes = ['P{}'.format(i) for i in range(1, n_planes + 1)]
+    airports = ['A{}'.format(i) for i in range(1, n_airports + 1)]
+    at_relations = make_relations('At', cargos + planes, airports)
+    in_relations = make_relations('In', cargos, planes)
+    start = {x: rng.choice(airports) for x in cargos + planes}
+    destination = {c: rng.choice([a for a in airports if a != start[c]]) for c in cargos}
+    pos = create_expressions(['At({}, {})'.format(x, start[x]) for x in cargos + planes])
+    true = set(pos)
+    init = FluentState(pos, [r for r in at_relations + in_relations if r not in true])
+    goal = create_expressions(['At({}, {})'.format(c, destination[c]) for c in cargos])
+    return AirCargoProblem(cargos, planes, airports, init, goal)
@@ -0,0 +1,281 @@
+from collections import namedtuple
+from itertools import combinations
+from weakref import WeakKeyDictionary
+
+
+GraphTables = namedtuple("GraphTables", "num_literals literal_index preconditions effects "
+                                        "real_actions achievers consumers static_mutexes")
+GraphTables.__doc__ = """ Integer-indexed literals & actions of a planning problem
+
+Literal 2i is the fluent problem.state_map[i] and literal 2i + 1 is its
+negation; actions 0 .. num_literals - 1 are the no-op actions of each
+literal, followed by the actions in problem.actions_list. Every set of
+literals or actions is an int bitset.
+
+Attributes
+----------
+num_literals : int
+    The number of literals (twice the number of fluents)
+
+literal_index : dict
+    Mapping from each literal Expr (X or ~X) to its index
+
+preconditions, effects : list
+    The literal bitset of the preconditions & effects of each action
+
+real_actions : int
+    Bitset of the actions that are not no-ops
+
+achievers, consumers : list
+    The bitset of actions that have each literal as an effect or precondition
+
+static_mutexes : list
+    The bitset of actions that are mutex with each action independent of the
+    layer (by inconsistent effects or interference)
+"""
+
+_tables = WeakKeyDictionary()
+
+
+def graph_tables(problem):
+    """ Return the GraphTables of a problem (compiled once per problem) """
+    tables = _tables.get(problem)
+    if tables is None:
+        tables = _tables[problem] = _compile(problem)
+    return tables
+
+
+def _compile(problem):
+    num_literals = 2 * len(problem.state_map)
+    literal_index = {}
+    for i, fluent in enumerate(problem.state_map):
+        literal_index[fluent] = 2 * i
+        literal_index[~fluent] = 2 * i + 1
+
+    def literal_bits(literals):
+        return sum(1 << literal_index[l] for l in set(literals))
+
+    preconditions = [1 << l for l in range(num_literals)]
+    effects = list(preconditions)
+    for action in problem.actions_list:
+        preconditions.append(literal_bits(list(action.precond_pos) + [~f for f in action.precond_neg]))
+        effects.append(literal_bits(list(action.effect_add) + [~f for f in action.effect_rem]))
+    num_actions = len(preconditions)
+    real_actions = ((1 << num_actions) - 1) & ~((1 << num_literals) - 1)
+
+    achievers = [0] * num_literals
+    consumers = [0] * num_literals
+    for a in range(num_actions):
+        for l in _indices(effects[a]): achievers[l] |= 1 << a
+        for l in _indices(preconditions[a]): consumers[l] |= 1 << a
+
+    # inconsistent effects: an effect of one action negates an effect of the other
+    # interference: an effect of one action negates a precondition of the other
+    static_mutexes = []
+    for a in range(num_actions):
+        row = 0
+        for l in _indices(negate(effects[a])):
+            row |= achievers[l] | consumers[l]
+        for l in _indices(negate(preconditions[a])):
+            row |= achievers[l]
+        static_mutexes.append(row & ~(1 << a))
+    return GraphTables(num_literals, literal_index, preconditions, effects, real_actions,
+                       achievers, consumers, static_mutexes)
+
+
+def negate(literals):
+    """ Return the bitset of the negations of a literal bitset """
+    even = _EVEN_BITS.get(literals.bit_length())
+    if even is None:
+        even = _even_bits(literals.bit_length())
+    return ((literals & even) << 1) | ((literals >> 1) & even)
+
+
+_EVEN_BITS = {}
+
+
+def _even_bits(length):
+    mask = int("01" * ((length + 2) // 2), 2)
+    _EVEN_BITS[length] = mask
+    return mask
+
+
+def _indices(bits):
+    """ Return the indices of the set bits of an int """
+    indices = []
+    while bits:
+        low = bits & -bits
+        indices.append(low.bit_length() - 1)
+        bits ^= low
+    return indices
+
+
+class BitPlanningGraph:
+    """ Planning graph with integer-indexed literals & actions
+
+    This engine builds the same graph as my_planning_graph.PlanningGraph
+    (the same layers, mutex rules, and leveling test), but each layer is an
+    int bitset and the mutex relation of each layer is a bit matrix stored
+    as one int row per literal or action. The static mutexes of each pair
+    of actions (inconsistent effects & interference) are computed once per
+    problem (see graph_tables()), and the dynamic mutexes are computed with
+    a few bitwise operations per row:
+
+    - competing needs: action b is mutex with action a if a precondition of
+      b is mutex with a precondition of a, i.e., if b consumes any literal
+      in the union of the literal mutex rows of a's preconditions
+    - inconsistent support: literal m is mutex with literal l if none of
+      the achievers of m is compatible (not mutex) with an achiever of l
+
+    Parameters
+    ----------
+    problem : BasePlanningProblem
+        The planning problem
+
+    state : int
+        A bitset indicating the literal value of each fluent in
+        problem.state_map (see problem.fluent_bits)
+
+    serialize : bool
+        Flag indicating whether to serialize non-persistence actions
+
+    ignore_mutexes : bool
+        Skip the dynamic mutexes (competing needs & inconsistent support); the
+        layers & level costs do not depend on mutexes, so the max level and
+        level sum heuristics use this to skip all mutex bookkeeping
+    """
+    def __init__(self, problem, state, serialize=True, ignore_mutexes=False):
+        self.tables = tables = graph_tables(problem)
+        self._serialize = serialize
+        self._ignore_mutexes = ignore_mutexes
+        self._is_leveled = False
+        literals = sum(1 << (2 * i + (0 if state & problem.fluent_bits[f] else 1))
+                       for i, f in enumerate(problem.state_map))
+        self.literal_layers = [literals]
+        self.literal_mutexes = [self._negation_mutexes(literals)]
+        self.action_layers = []
+        self.action_mutexes = []
+        self.goal = sum(1 << tables.literal_index[g] for g in problem.goal)
+
+    def _negation_mutexes(self, literals):
+        return {l: negate(1 << l) & literals for l in _indices(literals)}
+
+    def is_mutex(self, level, literalA, literalB):
+        """ Return True if two literals (Expr) are mutex in a literal layer """
+        index = self.tables.literal_index
+        return bool(self.literal_mutexes[level].get(index[literalA], 0) >> index[literalB] & 1)
+
+    def fill(self, maxlevels=-1):
+        """ Extend the planning graph until it is leveled, or until a specified number of
+        levels have been added
+        """
+        while not self._is_leveled:
+            if maxlevels == 0:
+                break
+            self._extend()
+            maxlevels -= 1
+        return self
+
+    def _extend(self):
+        """ Add an action layer & a literal layer to the planning graph """
+        if self._is_leveled:
+            return
+        t = self.tables
+        parent = self.literal_layers[-1]
+        parent_mutexes = self.literal_mutexes[-1]
+        actions = self.action_layers[-1] if self.action_layers else 0
+
+        # actions are added monotonically, so only new actions are tested
+        literals = parent
+        candidates = ~actions & ((1 << len(t.preconditions)) - 1)
+        for a in _indices(candidates):
+            if not t.preconditions[a] & ~parent:
+                actions |= 1 << a
+        for a in _indices(actions):
+            literals |= t.effects[a]
+
+        action_mutexes = {}
+        literal_mutexes = self._negation_mutexes(literals)
+        for a in _indices(actions):
+            row = t.static_mutexes[a]
+            if self._serialize and (1 << a) & t.real_actions:
+                row |= t.real_actions
+            if not self._ignore_mutexes:
+                needs = 0
+                for l in _indices(t.preconditions[a]):
+                    needs |= parent_mutexes.get(l, 0)
+                for l in _indices(needs):
+                    row |= t.consumers[l]
+            # an action with mutex preconditions is not mutex with itself
+            action_mutexes[a] = row & actions & ~(1 << a)
+
+        if not self._ignore_mutexes:
+            supporters = {l: t.achievers[l] & actions for l in _indices(literals)}
+            for l, achievers in supporters.items():
+                compatible = 0
+                for a in _indices(achievers):
+                    compatible |= actions & ~action_mutexes[a]
+                row = literal_mutexes[l]
+                for m, other in supporters.items():
+                    if m != l and not other & compatible:
+                        row |= 1 << m
+                literal_mutexes[l] = row
+
+        self.action_layers.append(actions)
+        self.action_mutexes.append(action_mutexes)
+        self.literal_layers.append(literals)
+        self.literal_mutexes.append(literal_mutexes)
+        self._is_leveled = literals == parent and literal_mutexes == parent_mutexes
+
+    def _first_level(self, test):
+        """ Extend the graph until `test(level)` is True and return the level
+        (or float("inf") if the graph levels off first)
+        """
+        level = 0
+        while not test(level):
+            if self._is_leveled:
+                return float("inf")
+            self._extend()
+            level += 1
+        return level
+
+    def level_costs(self):
+        """ Return a dict mapping the index of each goal literal to the first
+        level where it appears (float("inf") for goals that never appear)
+        """
+        costs = {}
+        remaining = self.goal
+
+        def all_found(level):
+            nonlocal remaining
+            found = remaining & self.literal_layers[level]
+            for l in _indices(found):
+                costs[l] = level
+            remaining &= ~found
+            return not remaining
+
+        self._first_level(all_found)
+        costs.update((l, float("inf")) for l in _indices(remaining))
+        return costs
+
+    def h_levelsum(self):
+        """ Return the sum of the level costs of the goal literals """
+        return sum(self.level_costs().values())
+
+    def h_maxlevel(self):
+        """ Return the largest level cost of any goal literal """
+        return max(self.level_costs().values(), default=0)
+
+    def h_setlevel(self):
+        """ Return the first level where every goal literal appears and no pair
+        of goal literals is mutex
+        """
+        goals = _indices(self.goal)
+
+        def goals_compatible(level):
+            if self.goal & ~self.literal_layers[level]:
+                return False
+            mutexes = self.literal_mutexes[level]
+            return not any(mutexes[a] >> b & 1 for a, b in combinations(goals, 2))
+
+        return self._first_level(goals_compatible)
@@ -0,0 +1,127 @@
+from collections import OrderedDict, namedtuple
+from functools import wraps
+
+
+DEFAULT_CAPACITY = 100000
+
+CacheInfo = namedtuple("CacheInfo", "hits misses evictions maxsize currsize")
+
+_MISSING = object()
+
+
+class HeuristicCache:
+    """ Bounded LRU cache of heuristic values keyed on the state bitset
+
+    Parameters
+    ----------
+    capacity : int, None
+        The maximum number of states to keep (the least recently used state
+        is evicted when the cache is full); 0 disables caching and None
+        removes the bound
+    """
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        self.capacity = capacity
+        self.hits = self.misses = self.evictions = 0
+        self._values = OrderedDict()
+
+    def __len__(self):
+        return len(self._values)
+
+    def __contains__(self, state):
+        return state in self._values
+
+    def get(self, state, default=None):
+        """ Return the cached value of a state (and mark it as recently used) """
+        value = self._values.get(state, _MISSING)
+        if value is _MISSING:
+            self.misses += 1
+            return default
+        self.hits += 1
+        self._values.move_to_end(state)
+        return value
+
+    def put(self, state, value):
+        """ Store the value of a state and return it """
+        if self.capacity == 0:
+            return value
+        self._values[state] = value
+        self._values.move_to_end(state)
+        if self.capacity is not None and len(self._values) > self.capacity:
+            self._values.popitem(last=False)
+            self.evictions += 1
+        return value
+
+    def clear(self):
+        self._values.clear()
+        self.hits = self.misses = self.evictions = 0
+
+    def info(self):
+        """ Return the hit & miss statistics as a CacheInfo tuple """
+        return CacheInfo(self.hits, self.misses, self.evictions, self.capacity, len(self._values))
+
+
+def fingerprint(problem):
+    """ Return a hashable key identifying a planning problem (two instances with the
+    same fluents, goal, and actions have the same heuristic values in every state)
+    """
+    return (type(problem).__name__, tuple(str(f) for f in problem.state_map),
+            problem.goal_mask, tuple(str(a) for a in problem.actions_list))
+
+
+class CacheRegistry:
+    """ Source of the heuristic caches used by each problem instance
+
+    By default every problem instance gets new caches; when sharing is
+    enabled, problem instances with the same fingerprint share one cache per
+    heuristic, so consecutive searches of the same problem (e.g., in one
+    run_search.py session) reuse the values computed by earlier searches.
+
+    Parameters
+    ----------
+    capacity : int, None
+        The capacity of each cache (see HeuristicCache)
+
+    shared : bool
+        Share caches between instances of the same problem
+    """
+    def __init__(self, capacity=DEFAULT_CAPACITY, shared=False):
+        self.configure(capacity, shared)
+
+    def configure(self, capacity=DEFAULT_CAPACITY, shared=False):
+        """ Change the settings for the caches created from now on (and drop
+        all shared caches)
+        """
+        self.capacity = capacity
+        self.shared = shared
+        self._shared = {}
+
+    def cache(self, problem, name):
+        """ Return the cache for heuristic `name` of a problem instance """
+        if not self.shared:
+            return HeuristicCache(self.capacity)
+        key = (fingerprint(problem), name)
+        if key not in self._shared:
+            self._shared[key] = HeuristicCache(self.capacity)
+        return self._shared[key]
+
+
+registry = CacheRegistry()
+
+
+def cached_heuristic(method):
+    """ Decorator caching the value of a heuristic method of a planning problem
+    by the state of the node (problem.heuristic_caches holds the cache of each
+    heuristic, created on first use from the module registry)
+    """
+    name = method.__name__
+
+    @wraps(method)
+    def wrapper(problem, node):
+        cache = problem.heuristic_caches.get(name)
+        if cache is None:
+            cache = problem.heuristic_caches[name] = registry.cache(problem, name)
+        value = cache.get(node.state, _MISSING)
+        if value is _MISSING:
+            value = cache.put(node.state, method(problem, node))
+        return value
+    return wrapper
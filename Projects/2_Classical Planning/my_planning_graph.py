@@ -91,9 +91,9 @@ class PlanningGraph:
         problem : PlanningProblem
             An instance of the PlanningProblem class
 
-        state : tuple(bool)
-            An ordered sequence of True/False values indicating the literal value
-            of the corresponding fluent in problem.state_map
+        state : int
+            A bitset indicating the literal value of each fluent in
+            problem.state_map (see problem.fluent_bits)
 
         serialize : bool
             Flag indicating whether to serialize non-persistence actions. Actions
@@ -117,7 +117,7 @@ class PlanningGraph:
 
         # initialize the planning graph by finding the literals that are in the
         # first layer and finding the actions they they should be connected to
-        literals = [s if f else ~s for f, s in zip(state, problem.state_map)]
+        literals = [s if state & problem.fluent_bits[s] else ~s for s in problem.state_map]
         layer = LiteralLayer(literals, ActionLayer(), self._ignore_mutexes)
         layer.update_mutexes()
         self.literal_layers = [layer]
@@ -1,11 +1,13 @@
 
-from functools import lru_cache
-
 from aimacode.logic import PropKB
 from aimacode.search import Node, Problem
 
-from _utils import encode_state, decode_state
+from _utils import encode_state
+from bit_planning_graph import BitPlanningGraph
+from heuristic_cache import cached_heuristic
 from my_planning_graph import PlanningGraph
+from relaxed_exploration import RelaxedExploration
+from successor_generator import SuccessorGenerator
 
     ##############################################################################
     #                 YOU DO NOT NEED TO MODIFY CODE IN THIS FILE                #
@@ -13,21 +15,83 @@ from my_planning_graph import PlanningGraph
 
 
 class BasePlanningProblem(Problem):
+    """ Base class for planning problems with states encoded as int bitsets
+
+    Each fluent in self.state_map has one bit in the state (self.fluent_bits
+    maps each fluent to its bit; see _utils.encode_state), so the
+    preconditions & effects of every action are compiled to bit masks (see
+    compile_action()) and checking or applying an action only takes a few
+    integer operations. The applicable actions in each state are found with
+    a SuccessorGenerator decision tree over the action preconditions, so
+    only the applicable actions are visited.
+
+    The heuristic values are cached by state in self.heuristic_caches (one
+    HeuristicCache per heuristic; see heuristic_cache.registry to change the
+    capacity or share the caches between instances of the same problem).
+    """
     def __init__(self, initial, goal):
         self.state_map = sorted(initial.pos + initial.neg, key=str)
+        last = len(self.state_map) - 1
+        self.fluent_bits = {f: 1 << (last - i) for i, f in enumerate(self.state_map)}
         self.initial_state_TF = encode_state(initial, self.state_map)
+        self.goal_mask = self.fluent_mask(goal)
+        self._action_masks = None
+        self._successor_generator = None
+        self._relaxed_exploration = None
+        self.heuristic_caches = {}
         super().__init__(self.initial_state_TF, goal=goal)
 
-    @lru_cache()
+    def fluent_mask(self, fluents):
+        """ Return the bitset of the fluents in the state map (other fluents are ignored) """
+        return sum(self.fluent_bits.get(f, 0) for f in set(fluents))
+
+    def compile_action(self, action):
+        """ Return the (positive precondition, negative precondition, add, remove)
+        bit masks of an action, or None if the action can never be executed
+        because a precondition refers to a fluent that is not in the state map
+        """
+        preconditions = action.precond_pos | action.precond_neg
+        if any(f not in self.fluent_bits for f in preconditions):
+            return None
+        return (self.fluent_mask(action.precond_pos), self.fluent_mask(action.precond_neg),
+                self.fluent_mask(action.effect_add), self.fluent_mask(action.effect_rem))
+
+    @property
+    def action_masks(self):
+        """ Dict mapping each action in self.actions_list to its compiled
+        masks (built the first time it is used, because subclasses set the
+        actions_list after calling the BasePlanningProblem constructor)
+        """
+        if self._action_masks is None:
+            self._action_masks = {a: self.compile_action(a) for a in self.actions_list}
+        return self._action_masks
+
+    @property
+    def successor_generator(self):
+        """ SuccessorGenerator over self.actions_list (built the first time it is used) """
+        if self._successor_generator is None:
+            masks = [self.action_masks[a] for a in self.actions_list]
+            self._successor_generator = SuccessorGenerator(
+                self.actions_list, [m and m[:2] for m in masks])
+        return self._successor_generator
+
+    @property
+    def relaxed_exploration(self):
+        """ RelaxedExploration over self.actions_list (built the first time it is used) """
+        if self._relaxed_exploration is None:
+            self._relaxed_exploration = RelaxedExploration(self)
+        return self._relaxed_exploration
+
+    @cached_heuristic
     def h_unmet_goals(self, node):
         """ This heuristic estimates the minimum number of actions that must be
         carried out from the current state in order to satisfy all of the goal
         conditions by ignoring the preconditions required for an action to be
         executed.
         """
-        return sum(1 for i, f in enumerate(self.state_map) if not node.state[i] and f in self.goal)
+        return bin(self.goal_mask & ~node.state).count("1")
 
-    @lru_cache()
+    @cached_heuristic
     def h_pg_levelsum(self, node):
         """ This heuristic uses a planning graph representation of the problem
         state space to estimate the sum of the number of actions that must be
@@ -42,7 +106,7 @@ class BasePlanningProblem(Problem):
         score = pg.h_levelsum()
         return score
 
-    @lru_cache()
+    @cached_heuristic
     def h_pg_maxlevel(self, node):
         """ This heuristic uses a planning graph representation of the problem
         to estimate the maximum level cost out of all the individual goal literals.
@@ -57,7 +121,7 @@ class BasePlanningProblem(Problem):
         score = pg.h_maxlevel()
         return score
 
-    @lru_cache()
+    @cached_heuristic
     def h_pg_setlevel(self, node):
         """ This heuristic uses a planning graph representation of the problem
         to estimate the level cost in the planning graph to achieve all of the
@@ -71,33 +135,58 @@ class BasePlanningProblem(Problem):
         score = pg.h_setlevel()
         return score
 
+    @cached_heuristic
+    def h_bpg_levelsum(self, node):
+        """ The level sum heuristic computed on a BitPlanningGraph (the same
+        values as h_pg_levelsum, but float("inf") if a goal is unreachable)
+        """
+        return BitPlanningGraph(self, node.state, serialize=True, ignore_mutexes=True).h_levelsum()
+
+    @cached_heuristic
+    def h_bpg_maxlevel(self, node):
+        """ The max level heuristic computed on a BitPlanningGraph """
+        return BitPlanningGraph(self, node.state, serialize=True, ignore_mutexes=True).h_maxlevel()
+
+    @cached_heuristic
+    def h_bpg_setlevel(self, node):
+        """ The set level heuristic computed on a BitPlanningGraph: the first
+        level where all goal literals appear and no pair of them is mutex
+        """
+        return BitPlanningGraph(self, node.state, serialize=True).h_setlevel()
+
+    @cached_heuristic
+    def h_max(self, node):
+        """ The max level heuristic computed by relaxed exploration instead of
+        a planning graph (see RelaxedExploration)
+        """
+        return self.relaxed_exploration.h_max(node.state)
+
+    @cached_heuristic
+    def h_add(self, node):
+        """ The additive heuristic: the sum of the estimated costs of the goal
+        literals, where the cost of each action is one more than the sum of
+        the costs of its preconditions
+        """
+        return self.relaxed_exploration.h_add(node.state)
+
+    @cached_heuristic
+    def h_ff(self, node):
+        """ The FF heuristic: the number of actions in a relaxed plan extracted
+        from the best supporters of the additive heuristic
+        """
+        return self.relaxed_exploration.h_ff(node.state)
+
     def actions(self, state):
         """ Return the actions that can be executed in the given state. """
-        possible_actions = []
-        fluent = decode_state(state, self.state_map)
-        for action in self.actions_list:
-            is_possible = True
-            for clause in action.precond_pos:
-                if clause not in fluent.pos:
-                    is_possible = False
-                    break
-            if not is_possible: continue
-            for clause in action.precond_neg:
-                if clause not in fluent.neg:
-                    is_possible = False
-                    break
-            if is_possible: possible_actions.append(action)
-        return possible_actions
+        return self.successor_generator.applicable(state)
 
     def result(self, state, action):
         """ Return the state that results from executing the given action in the
         given state. The action must be one of self.actions(state).
         """
-        return tuple([
-            (f and s not in action.effect_rem) or (s in action.effect_add)
-            for f, s in zip(state, self.state_map)
-        ])
+        _, _, add, rem = self.action_masks[action]
+        return (state & ~rem) | add
 
-    def goal_test(self, state: str) -> bool:
+    def goal_test(self, state: int) -> bool:
         """ Test the state to see if goal is reached """
-        return all(f for f, c in zip(state, self.state_map) if c in self.goal)
+        return state & self.goal_mask == self.goal_mask
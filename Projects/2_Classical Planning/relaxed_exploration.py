@@ -0,0 +1,141 @@
+from heapq import heappop, heappush
+
+
+class RelaxedExploration:
+    """ Delete-relaxation heuristics computed by counter-based exploration
+
+    The level costs of a planning graph built with ignore_mutexes=True only
+    depend on which literals can be reached, so they can be computed without
+    building any layers: every action keeps a counter of its unsatisfied
+    preconditions, and reaching a literal decrements the counters of the
+    actions that need it. An action fires when its counter reaches zero,
+    and its effects are reached with cost 1 + the combined cost of its
+    preconditions. Literals are processed in order of cost (a generalized
+    Dijkstra search), so each action is visited once per precondition.
+
+    Combining precondition costs with max gives h_max, where the cost of a
+    literal is exactly the first planning graph level that contains it (the
+    level cost used by h_pg_maxlevel & h_pg_levelsum). Combining them with a
+    sum gives h_add, and the actions that first reach each literal in the
+    h_add exploration (the "best supporters") define the relaxed plan that
+    is counted by h_FF.
+
+    Literals & actions are integer-indexed like bit_planning_graph: literal
+    2i is the fluent problem.state_map[i] and literal 2i + 1 is its negation.
+
+    Parameters
+    ----------
+    problem : BasePlanningProblem
+        The planning problem; the actions that can never be executed
+        (see BasePlanningProblem.compile_action) are ignored
+
+    See Also
+    --------
+    Bonet & Geffner, "Planning as heuristic search" (2001)
+    Hoffmann & Nebel, "The FF planning system" (2001)
+    """
+    def __init__(self, problem):
+        index = {}
+        for i, fluent in enumerate(problem.state_map):
+            index[fluent] = 2 * i
+            index[~fluent] = 2 * i + 1
+        self.num_literals = 2 * len(problem.state_map)
+        self.fluent_bits = [problem.fluent_bits[f] for f in problem.state_map]
+        self.preconditions, self.effects = [], []
+        for action in problem.actions_list:
+            if problem.action_masks[action] is None: continue
+            self.preconditions.append([index[f] for f in action.precond_pos] +
+                                      [index[~f] for f in action.precond_neg])
+            self.effects.append([index[f] for f in action.effect_add if f in index] +
+                                [index[~f] for f in action.effect_rem if ~f in index])
+        self.consumers = [[] for _ in range(self.num_literals)]
+        for a, preconditions in enumerate(self.preconditions):
+            for literal in preconditions:
+                self.consumers[literal].append(a)
+        self.goals = sorted(set(index[g] for g in problem.goal))
+
+    def explore(self, state, additive=False):
+        """ Return the cost of reaching each literal from `state` & the index
+        of the action that first reached it (None for literals in the state)
+
+        Literals that cannot be reached have cost float("inf"). The
+        exploration stops once the costs of all goal literals are final, so
+        only literals that are no more expensive than the goals are exact.
+
+        Parameters
+        ----------
+        state : int
+            A bitset indicating the value of each fluent in problem.state_map
+
+        additive : bool
+            Combine the costs of action preconditions with sum (h_add) rather
+            than max (h_max)
+        """
+        inf = float("inf")
+        cost = [inf] * self.num_literals
+        supporter = [None] * self.num_literals
+        unsatisfied = [len(p) for p in self.preconditions]
+        action_cost = [0] * len(self.preconditions)
+
+        queue = []
+        for i, bit in enumerate(self.fluent_bits):
+            literal = 2 * i if state & bit else 2 * i + 1
+            cost[literal] = 0
+            queue.append((0, literal))
+        for a, count in enumerate(unsatisfied):
+            if not count:
+                self._fire(a, 1, cost, supporter, queue)
+
+        goals = set(self.goals)
+        while queue and goals:
+            c, literal = heappop(queue)
+            if c > cost[literal]: continue
+            goals.discard(literal)
+            for a in self.consumers[literal]:
+                action_cost[a] = action_cost[a] + c if additive else max(action_cost[a], c)
+                unsatisfied[a] -= 1
+                if not unsatisfied[a]:
+                    self._fire(a, action_cost[a] + 1, cost, supporter, queue)
+        return cost, supporter
+
+    def _fire(self, action, c, cost, supporter, queue):
+        for literal in self.effects[action]:
+            if c < cost[literal]:
+                cost[literal] = c
+                supporter[literal] = action
+                heappush(queue, (c, literal))
+
+    def level_costs(self, state):
+        """ Return the level cost (first planning graph level) of each goal literal """
+        cost, _ = self.explore(state)
+        return [cost[g] for g in self.goals]
+
+    def h_max(self, state):
+        """ Return the largest level cost of any goal literal (equal to the
+        planning graph max level heuristic)
+        """
+        return max(self.level_costs(state), default=0)
+
+    def h_add(self, state):
+        """ Return the sum of the additive costs of the goal literals """
+        cost, _ = self.explore(state, additive=True)
+        return sum(cost[g] for g in self.goals)
+
+    def h_ff(self, state):
+        """ Return the number of actions in the relaxed plan formed by the best
+        supporters of the goal literals and (recursively) their preconditions
+        """
+        cost, supporter = self.explore(state, additive=True)
+        if any(cost[g] == float("inf") for g in self.goals):
+            return float("inf")
+        plan, reached = set(), set()
+        stack = list(self.goals)
+        while stack:
+            literal = stack.pop()
+            if literal in reached or not cost[literal]: continue
+            reached.add(literal)
+            action = supporter[literal]
+            if action not in plan:
+                plan.add(action)
+                stack.extend(self.preconditions[action])
+        return len(plan)
@@ -18,6 +18,8 @@
 #
 
 # %%
+import os
+
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
@@ -93,7 +95,52 @@ dataset = [
     Record(3, 2, "DFS", "", 88, 408, 409, 3364, 392, 0.2780),
     Record(4, 2, "DFS", "", 104, 25174, 25175, 228849, 24132, 771.7955),
 ]
-df = pd.DataFrame(dataset)
+
+
+# %% [markdown]
+# When `run_experiments.py` has written a results file, the report reads the statistics from it instead of the records above.
+
+# %%
+RESULTS_FILE = "results.jsonl"
+
+ALG_NAMES = {
+    "breadth_first_search": "BFS",
+    "depth_first_graph_search": "DFS",
+    "uniform_cost_search": "UCS",
+    "greedy_best_first_graph_search": "Greedy",
+    "astar_search": "A*",
+}
+
+
+def load_results(path):
+    """Loads the completed runs of a run_experiments.py results file.
+
+    Parameters:
+        path: JSON lines file, or CSV file if the name ends with .csv
+    """
+    if path.endswith(".csv"):
+        results = pd.read_csv(path, keep_default_na=False)
+    else:
+        results = pd.read_json(path, lines=True)
+    results = results.drop_duplicates(["problem", "search", "heuristic"], keep="last")
+    results = results[results.status == "ok"]
+    return pd.DataFrame(
+        {
+            "Problem": results.problem_index.astype(int),
+            "Alg_Num": results.search_index.astype(int),
+            "Alg_Name": results.search.map(ALG_NAMES).fillna(results.search),
+            "Heuristic": results.heuristic.fillna(""),
+            "Actions": results.actions.astype(int),
+            "Expansions": results.expansions.astype(int),
+            "Goal_Tests": results.goal_tests.astype(int),
+            "New_Nodes": results.new_nodes.astype(int),
+            "Length": results.plan_length.astype(int),
+            "Time": results.time.astype(float),
+        }
+    )
+
+
+df = load_results(RESULTS_FILE) if os.path.exists(RESULTS_FILE) else pd.DataFrame(dataset)
 
 
 # %% [markdown]
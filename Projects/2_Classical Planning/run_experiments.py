@@ -0,0 +1,202 @@
+
+import argparse
+import csv
+import json
+import os
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+from multiprocessing import Pipe, Process
+from multiprocessing.connection import wait
+from timeit import default_timer as timer
+
+from aimacode.search import peak_rss_kb
+from _utils import PrintableProblem
+from run_search import PROBLEMS, SEARCHES
+
+
+FIELDS = ["problem_index", "problem", "search_index", "search", "heuristic", "status", "actions",
+          "expansions", "goal_tests", "new_nodes", "plan_length", "time", "heuristic_time",
+          "max_frontier", "max_explored", "peak_rss_kb"]
+
+
+def run_key(record):
+    """ Identify a problem/search combination by name (the indices of the
+    searches change when new searches are added to run_search.SEARCHES)
+    """
+    return (record["problem"], record["search"], record["heuristic"] or "")
+
+
+def run_one(problem_index, search_index, memory_limit=None):
+    """ Solve one problem with one search and return a result record
+
+    Parameters
+    ----------
+    problem_index, search_index : int
+        The (1-based) index of the problem in run_search.PROBLEMS and of the
+        search in run_search.SEARCHES
+
+    memory_limit : int, None
+        The maximum address space of the current process in bytes; a search
+        that runs out of memory is recorded with status "memory" (ignored
+        where the resource module is not available)
+    """
+    pname, problem_fn = PROBLEMS[problem_index - 1]
+    sname, search_fn, heuristic = SEARCHES[search_index - 1]
+    record = dict.fromkeys(FIELDS)
+    record.update(problem_index=problem_index, problem=pname, search_index=search_index,
+                  search=sname, heuristic=heuristic, status="ok")
+    if memory_limit and resource is not None:
+        resource.setrlimit(resource.RLIMIT_AS, (memory_limit, memory_limit))
+
+    start = timer()
+    problem = None
+    try:
+        problem = PrintableProblem(problem_fn())
+        args = (problem.timed_heuristic(getattr(problem.problem, heuristic)),) if heuristic else ()
+        node = search_fn(problem, *args)
+        if node is None:
+            record["status"] = "unsolved"
+        else:
+            record["plan_length"] = len(node.solution())
+    except MemoryError:
+        record["status"] = "memory"
+    record["time"] = timer() - start
+    if problem is not None:
+        stats = problem.stats()
+        record.update((k, stats[k]) for k in ("expansions", "goal_tests", "new_nodes", "heuristic_time",
+                                              "max_frontier", "max_explored"))
+        record["actions"] = len(problem.problem.actions_list)
+    record["peak_rss_kb"] = peak_rss_kb()
+    return record
+
+
+def _worker(conn, problem_index, search_index, memory_limit):
+    conn.send(run_one(problem_index, search_index, memory_limit))
+    conn.close()
+
+
+def run_experiments(runs, processes=1, timeout=None, memory_limit=None):
+    """ Run each (problem index, search index) pair in its own process, at most
+    `processes` at a time, and yield the result records as runs finish
+
+    A run that exceeds `timeout` seconds is terminated and recorded with status
+    "timeout", and a run whose process dies without a result (e.g., killed by
+    the OS) is recorded with status "error".
+    """
+    pending = list(reversed(runs))
+    running = {}  # process sentinel -> (process, connection, run, start time)
+    while pending or running:
+        while pending and len(running) < processes:
+            run = pending.pop()
+            receiver, sender = Pipe(duplex=False)
+            process = Process(target=_worker, args=(sender, run[0], run[1], memory_limit), daemon=True)
+            process.start()
+            sender.close()
+            running[process.sentinel] = (process, receiver, run, timer())
+
+        wait_time = None
+        if timeout is not None:
+            wait_time = max(0, min(start + timeout for _, _, _, start in running.values()) - timer())
+        finished = wait(list(running) + [conn for _, conn, _, _ in running.values()], wait_time)
+
+        for sentinel, (process, conn, run, start) in list(running.items()):
+            record = None
+            if conn in finished or sentinel in finished:
+                try:
+                    record = conn.recv()
+                except EOFError:
+                    record = _failed(run, "error", timer() - start)
+            elif timeout is not None and timer() - start >= timeout:
+                process.terminate()
+                record = _failed(run, "timeout", timer() - start)
+            if record is not None:
+                process.join()
+                conn.close()
+                del running[sentinel]
+                yield record
+
+
+def _failed(run, status, elapsed):
+    record = dict.fromkeys(FIELDS)
+    pname, _ = PROBLEMS[run[0] - 1]
+    sname, _, heuristic = SEARCHES[run[1] - 1]
+    record.update(problem_index=run[0], problem=pname, search_index=run[1], search=sname,
+                  heuristic=heuristic, status=status, time=elapsed)
+    return record
+
+
+def read_records(path):
+    """ Return the records in a results file (JSON lines, or CSV if the name ends with .csv) """
+    if not os.path.exists(path):
+        return []
+    with open(path, newline="") as f:
+        if path.endswith(".csv"):
+            return list(csv.DictReader(f))
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def append_record(path, record):
+    """ Append a record to a results file (JSON lines, or CSV if the name ends with .csv) """
+    if path.endswith(".csv"):
+        new_file = not os.path.exists(path) or not os.path.getsize(path)
+        with open(path, "a", newline="") as f:
+            writer = csv.DictWriter(f, FIELDS)
+            if new_file:
+                writer.writeheader()
+            writer.writerow(record)
+    else:
+        with open(path, "a") as f:
+            f.write(json.dumps(record) + "\n")
+
+
+def pending_runs(p_choices, s_choices, path, retry=False):
+    """ Return the (problem, search) index pairs that have no record in the results
+    file (or, with retry, whose latest record did not finish with status "ok")
+    """
+    latest = {run_key(r): r["status"] for r in read_records(path)}
+    runs = []
+    for p in p_choices:
+        for s in s_choices:
+            sname, _, heuristic = SEARCHES[s - 1]
+            status = latest.get((PROBLEMS[p - 1][0], sname, heuristic))
+            if status is None or (retry and status != "ok"):
+                runs.append((p, s))
+    return runs
+
+
+def main(p_choices, s_choices, path, processes=1, timeout=None, memory_limit=None, retry=False):
+    runs = pending_runs(p_choices, s_choices, path, retry)
+    print("Running {} of {} experiments ({} already in {})".format(
+        len(runs), len(p_choices) * len(s_choices), len(p_choices) * len(s_choices) - len(runs), path))
+    for record in run_experiments(runs, processes, timeout, memory_limit):
+        append_record(path, record)
+        print("{problem} / {search} {heuristic}: {status} in {time:.2f}s".format(**record))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the problem & search matrix of run_search.py " +
+        "in parallel and record the search statistics of each run in a results file.")
+    parser.add_argument('-p', '--problems', nargs="+", choices=range(1, len(PROBLEMS)+1), type=int, metavar='',
+                        default=list(range(1, len(PROBLEMS)+1)),
+                        help="Indices of the problems to solve (default: all). Choose from: {!s}".format(list(range(1, len(PROBLEMS)+1))))
+    parser.add_argument('-s', '--searches', nargs="+", choices=range(1, len(SEARCHES)+1), type=int, metavar='',
+                        default=list(range(1, len(SEARCHES)+1)),
+                        help="Indices of the search algorithms to use (default: all). Choose from: {!s}".format(list(range(1, len(SEARCHES)+1))))
+    parser.add_argument('-o', '--output', default="results.jsonl",
+                        help="Results file; JSON lines, or CSV if the name ends with .csv (default: results.jsonl)")
+    parser.add_argument('-j', '--processes', type=int, default=os.cpu_count() or 1,
+                        help="Number of runs to execute in parallel (default: number of CPUs)")
+    parser.add_argument('-t', '--timeout', type=float, default=None,
+                        help="Wall-clock limit of each run in seconds (default: no limit)")
+    parser.add_argument('-m', '--memory', type=int, default=None,
+                        help="Address space limit of each run in MB (default: no limit)")
+    parser.add_argument('--retry', action="store_true",
+                        help="Run again the combinations whose latest run did not finish (timeout, memory, error)")
+    args = parser.parse_args()
+    memory = args.memory * 2**20 if args.memory else None
+    main(sorted(set(args.problems)), sorted(set(args.searches)), args.output,
+         args.processes, args.timeout, memory, args.retry)
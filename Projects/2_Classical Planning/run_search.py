@@ -1,13 +1,16 @@
 
 import argparse
 
+from functools import partial
+
 from aimacode.search import (breadth_first_search, astar_search,
     breadth_first_tree_search, depth_first_graph_search, uniform_cost_search,
     greedy_best_first_graph_search, depth_limited_search,
     recursive_best_first_search)
-from air_cargo_problems import air_cargo_p1, air_cargo_p2, air_cargo_p3, air_cargo_p4
+from air_cargo_problems import air_cargo_p1, air_cargo_p2, air_cargo_p3, air_cargo_p4, air_cargo
 
 from _utils import run_search
+from heuristic_cache import DEFAULT_CAPACITY, registry
 
     ##############################################################################
     #                 YOU DO NOT NEED TO MODIFY CODE IN THIS FILE                #
@@ -33,7 +36,10 @@ choices for each include:
 PROBLEMS = [["Air Cargo Problem 1", air_cargo_p1],
             ["Air Cargo Problem 2", air_cargo_p2],
             ["Air Cargo Problem 3", air_cargo_p3],
-            ["Air Cargo Problem 4", air_cargo_p4]]
+            ["Air Cargo Problem 4", air_cargo_p4],
+            ["Generated Air Cargo 8x3x5 (seed 0)", partial(air_cargo, 8, 3, 5, 0)],
+            ["Generated Air Cargo 16x5x10 (seed 0)", partial(air_cargo, 16, 5, 10, 0)],
+            ["Generated Air Cargo 32x8x20 (seed 0)", partial(air_cargo, 32, 8, 20, 0)]]
 SEARCHES = [["breadth_first_search", breadth_first_search, ""],
             ['depth_first_graph_search', depth_first_graph_search, ""],
             ['uniform_cost_search', uniform_cost_search, ""],
@@ -44,7 +50,19 @@ SEARCHES = [["breadth_first_search", breadth_first_search, ""],
             ['astar_search', astar_search, 'h_unmet_goals'],
             ['astar_search', astar_search, 'h_pg_levelsum'],
             ['astar_search', astar_search, 'h_pg_maxlevel'],
-            ['astar_search', astar_search, 'h_pg_setlevel']
+            ['astar_search', astar_search, 'h_pg_setlevel'],
+            ['greedy_best_first_graph_search', greedy_best_first_graph_search, 'h_bpg_levelsum'],
+            ['greedy_best_first_graph_search', greedy_best_first_graph_search, 'h_bpg_maxlevel'],
+            ['greedy_best_first_graph_search', greedy_best_first_graph_search, 'h_bpg_setlevel'],
+            ['astar_search', astar_search, 'h_bpg_levelsum'],
+            ['astar_search', astar_search, 'h_bpg_maxlevel'],
+            ['astar_search', astar_search, 'h_bpg_setlevel'],
+            ['greedy_best_first_graph_search', greedy_best_first_graph_search, 'h_max'],
+            ['greedy_best_first_graph_search', greedy_best_first_graph_search, 'h_add'],
+            ['greedy_best_first_graph_search', greedy_best_first_graph_search, 'h_ff'],
+            ['astar_search', astar_search, 'h_max'],
+            ['astar_search', astar_search, 'h_add'],
+            ['astar_search', astar_search, 'h_ff']
             ]
 
 
@@ -66,7 +84,7 @@ def manual():
         __file__, " ".join(p_choices), " ".join(s_choices)))
 
 
-def main(p_choices, s_choices):
+def main(p_choices, s_choices, cache_stats=False, progress_interval=None):
     problems = [PROBLEMS[i-1] for i in map(int, p_choices)]
     searches = [SEARCHES[i-1] for i in map(int, s_choices)]
 
@@ -77,7 +95,12 @@ def main(p_choices, s_choices):
 
             problem_instance = problem_fn()
             heuristic_fn = None if not heuristic else getattr(problem_instance, heuristic)
-            run_search(problem_instance, search_fn, heuristic_fn)
+            run_search(problem_instance, search_fn, heuristic_fn, progress_interval)
+            cache = problem_instance.heuristic_caches.get(heuristic)
+            if cache_stats and cache is not None:
+                info = cache.info()
+                print("Heuristic cache: {} hits, {} misses, {} evictions, {} states cached".format(
+                    info.hits, info.misses, info.evictions, info.currsize))
 
 
 if __name__=="__main__":
@@ -90,12 +113,21 @@ if __name__=="__main__":
                         help="Specify the indices of the problems to solve as a list of space separated values. Choose from: {!s}".format(list(range(1, len(PROBLEMS)+1))))
     parser.add_argument('-s', '--searches', nargs="+", choices=range(1, len(SEARCHES)+1), type=int, metavar='',
                         help="Specify the indices of the search algorithms to use as a list of space separated values. Choose from: {!s}".format(list(range(1, len(SEARCHES)+1))))
+    parser.add_argument('--cache_size', type=int, default=DEFAULT_CAPACITY, metavar='N',
+                        help="Maximum number of states in the cache of each heuristic (0 disables caching; default {})".format(DEFAULT_CAPACITY))
+    parser.add_argument('--share_cache', action="store_true",
+                        help="Reuse the heuristic values cached by earlier searches of the same problem.")
+    parser.add_argument('--cache_stats', action="store_true",
+                        help="Print the heuristic cache hits & misses after each search.")
+    parser.add_argument('--progress', type=float, default=None, metavar='SECONDS',
+                        help="Print the expansions per second & frontier size every SECONDS during each search.")
     args = parser.parse_args()
+    registry.configure(args.cache_size, args.share_cache)
 
     if args.manual:
         manual()
     elif args.problems and args.searches:
-        main(list(sorted(set(args.problems))), list(sorted(set((args.searches)))))
+        main(list(sorted(set(args.problems))), list(sorted(set((args.searches)))), args.cache_stats, args.progress)
     else:
         print()
         parser.print_help()
@@ -0,0 +1,104 @@
+class SuccessorGenerator:
+    """ Decision tree index over the preconditions of grounded actions
+
+    Finding the applicable actions by testing every action in a state takes
+    time proportional to the number of grounded actions. The successor
+    generator (as in the Fast Downward planner) arranges the actions in a
+    decision tree instead: each internal node tests one fluent, and has a
+    child for the actions that require the fluent to be True, a child for
+    those that require it to be False, and a "don't care" child for the
+    actions that do not test it. An action is stored at the node where all
+    of its preconditions have been tested, so a lookup only follows the
+    branches that agree with the state and never visits actions with an
+    unsatisfied precondition.
+
+    Fluents are tested in order of the state bits (most significant first),
+    so every path through the tree tests each fluent at most once.
+
+    Parameters
+    ----------
+    actions : list
+        The grounded actions
+
+    preconditions : list
+        The (positive, negative) precondition bit masks of each action, or
+        None for an action that can never be executed
+
+    Examples
+    --------
+    >>> generator = SuccessorGenerator(problem.actions_list, masks)
+    >>> generator.applicable(state)  # actions in the same order as problem.actions_list
+    """
+    def __init__(self, actions, preconditions):
+        entries = []
+        for index, (action, masks) in enumerate(zip(actions, preconditions)):
+            if masks is None: continue
+            pos, neg = masks
+            if pos & neg: continue  # contradictory preconditions
+            conditions = sorted([(bit, True) for bit in _bits(pos)] + [(bit, False) for bit in _bits(neg)],
+                                reverse=True)
+            entries.append(((index, action), conditions))
+        self.num_nodes = 0
+        self.root = self._build(entries)
+
+    def _build(self, entries):
+        """ Build the tree iteratively (the don't care branches can be as deep
+        as the number of fluents, which could exceed the recursion limit)
+
+        Each node is a list [immediate actions, fluent bit, true child,
+        false child, don't care child]; leaves have bit 0 and no children.
+        The entries below a node are grouped by the next fluent they test,
+        and the groups form a chain of don't care nodes in order of the
+        fluent bits, so each entry is only visited once per tree level.
+        """
+        root = [[], 0, None, None, None]
+        stack = [(root, [(item, conditions, 0) for item, conditions in entries])]
+        while stack:
+            node, group = stack.pop()
+            self.num_nodes += 1
+            branches = {}  # fluent bit -> (true entries, false entries)
+            for item, conditions, depth in group:
+                if depth == len(conditions):
+                    node[0].append(item)
+                    continue
+                bit, value = conditions[depth]
+                if bit not in branches:
+                    branches[bit] = ([], [])
+                branches[bit][0 if value else 1].append((item, conditions, depth + 1))
+            for bit in sorted(branches, reverse=True):
+                if node[1]:
+                    node[4] = [[], 0, None, None, None]
+                    node = node[4]
+                    self.num_nodes += 1
+                node[1] = bit
+                for slot, branch in enumerate(branches[bit], 2):
+                    if branch:
+                        node[slot] = [[], 0, None, None, None]
+                        stack.append((node[slot], branch))
+        return root
+
+    def applicable(self, state):
+        """ Return the actions whose preconditions are satisfied in `state` (in
+        the order they were given to the constructor)
+        """
+        found = []
+        stack = [self.root]
+        while stack:
+            immediate, bit, on, off, dont_care = stack.pop()
+            found.extend(immediate)
+            if not bit: continue
+            branch = on if state & bit else off
+            if branch is not None: stack.append(branch)
+            if dont_care is not None: stack.append(dont_care)
+        found.sort(key=lambda item: item[0])
+        return [action for _, action in found]
+
+
+def _bits(mask):
+    """ Return the individual set bits of an int mask """
+    bits = []
+    while mask:
+        low = mask & -mask
+        bits.append(low)
+        mask ^= low
+    return bits
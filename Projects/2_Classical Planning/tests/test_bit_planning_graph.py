@@ -0,0 +1,47 @@
+
+import unittest
+
+from itertools import combinations
+
+from aimacode.search import Node
+from air_cargo_problems import air_cargo_p1, air_cargo_p2, air_cargo_p3
+from example_have_cake import have_cake
+from bit_planning_graph import BitPlanningGraph
+from my_planning_graph import PlanningGraph
+
+
+class BitPlanningGraphTest(unittest.TestCase):
+    def setUp(self):
+        self.problems = [have_cake(), air_cargo_p1(), air_cargo_p2(), air_cargo_p3()]
+
+    def test_heuristic_values(self):
+        expected = {"h_maxlevel": [1, 2, 2, 3], "h_levelsum": [1, 4, 6, 10], "h_setlevel": [2, 4, 4, 6]}
+        for name, values in expected.items():
+            scores = [getattr(BitPlanningGraph(p, p.initial, ignore_mutexes=name != "h_setlevel"), name)()
+                      for p in self.problems]
+            self.assertEqual(scores, values, name)
+
+    def test_layers_match_planning_graph(self):
+        """ Each literal layer has the same literals & mutexes as PlanningGraph """
+        for problem in self.problems[:2]:
+            for serialize in (True, False):
+                pg = PlanningGraph(problem, problem.initial, serialize=serialize).fill()
+                bpg = BitPlanningGraph(problem, problem.initial, serialize=serialize).fill()
+                self.assertEqual(len(bpg.literal_layers), len(pg.literal_layers))
+                index = bpg.tables.literal_index
+                for level, layer in enumerate(pg.literal_layers):
+                    literals = sorted(layer, key=index.get)
+                    self.assertEqual(sum(1 << index[l] for l in literals), bpg.literal_layers[level])
+                    for a, b in combinations(literals, 2):
+                        self.assertEqual(layer.is_mutex(a, b), bpg.is_mutex(level, a, b), (level, a, b))
+
+    def test_problem_heuristics(self):
+        problem = air_cargo_p1()
+        node = Node(problem.initial)
+        for name in ("levelsum", "maxlevel", "setlevel"):
+            self.assertEqual(getattr(problem, "h_bpg_" + name)(node), getattr(problem, "h_pg_" + name)(node))
+
+    def test_unreachable_goal(self):
+        problem = have_cake()
+        problem.actions_list = [a for a in problem.actions_list if "Eat" not in str(a.name)]
+        self.assertEqual(BitPlanningGraph(problem, problem.initial).h_setlevel(), float("inf"))
@@ -0,0 +1,44 @@
+
+import unittest
+
+from aimacode.search import Node, astar_search
+from air_cargo_problems import air_cargo_p1
+from heuristic_cache import HeuristicCache, registry
+
+
+class HeuristicCacheTest(unittest.TestCase):
+    def tearDown(self):
+        registry.configure()
+
+    def test_lru_eviction_and_stats(self):
+        cache = HeuristicCache(capacity=2)
+        cache.put(1, "a")
+        cache.put(2, "b")
+        self.assertEqual(cache.get(1), "a")  # 2 is now the least recently used
+        cache.put(3, "c")
+        self.assertNotIn(2, cache)
+        self.assertIsNone(cache.get(2))
+        self.assertEqual(tuple(cache.info()), (1, 1, 1, 2, 2))
+        disabled = HeuristicCache(capacity=0)
+        self.assertEqual(disabled.put(1, "a"), "a")
+        self.assertEqual(len(disabled), 0)
+
+    def test_keyed_on_state(self):
+        problem = air_cargo_p1()
+        first = problem.h_pg_levelsum(Node(problem.initial))
+        self.assertEqual(problem.h_pg_levelsum(Node(problem.initial, action="other")), first)
+        info = problem.heuristic_caches["h_pg_levelsum"].info()
+        self.assertEqual((info.hits, info.misses), (1, 1))
+
+    def test_shared_between_instances(self):
+        registry.configure(capacity=1000, shared=True)
+        first, second = air_cargo_p1(), air_cargo_p1()
+        astar_search(first, first.h_max)
+        astar_search(second, second.h_max)
+        self.assertIs(first.heuristic_caches["h_max"], second.heuristic_caches["h_max"])
+        info = second.heuristic_caches["h_max"].info()
+        self.assertEqual(info.misses, info.currsize)  # the second search only hits
+        registry.configure(capacity=1000, shared=False)
+        third = air_cargo_p1()
+        third.h_max(Node(third.initial))
+        self.assertIsNot(third.heuristic_caches["h_max"], first.heuristic_caches["h_max"])
@@ -0,0 +1,28 @@
+
+import unittest
+
+from aimacode.search import astar_search, breadth_first_search, depth_first_graph_search
+from air_cargo_problems import air_cargo_p1
+from _utils import PrintableProblem
+
+
+class InstrumentationTest(unittest.TestCase):
+    def test_heuristic_and_successor_times(self):
+        problem = PrintableProblem(air_cargo_p1())
+        astar_search(problem, problem.timed_heuristic(problem.problem.h_pg_levelsum))
+        stats = problem.stats()
+        self.assertTrue(0 < stats["heuristic_calls"] <= stats["new_nodes"] + 1)
+        self.assertGreater(stats["heuristic_time"], stats["actions_time"])
+        self.assertGreater(stats["result_time"], 0)
+        self.assertIn("Heuristic:", problem.details())
+
+    def test_frontier_sizes_and_progress(self):
+        for search in (breadth_first_search, depth_first_graph_search, astar_search):
+            reports = []
+            problem = PrintableProblem(air_cargo_p1(), reports.append, progress_interval=0)
+            search(problem, problem.h_unmet_goals) if search is astar_search else search(problem)
+            self.assertGreater(problem.max_frontier, 0)
+            self.assertGreater(problem.max_explored, 0)
+            self.assertIn(len(reports), (problem.succs - 1, problem.succs))  # the search may stop mid-expansion
+            self.assertEqual(reports[-1]["max_frontier"], problem.max_frontier)
+            self.assertGreater(reports[-1]["expansions_per_sec"], 0)
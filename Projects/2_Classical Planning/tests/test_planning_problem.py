@@ -0,0 +1,115 @@
+
+import unittest
+
+from aimacode.search import Node, astar_search
+from air_cargo_problems import AirCargoProblem, air_cargo, air_cargo_p1, air_cargo_p2
+from example_have_cake import have_cake
+from _utils import FluentState, create_expressions, decode_state, encode_state, make_relations
+
+
+def reference_actions(problem, state):
+    """ Applicable actions found by testing each precondition against the decoded state """
+    fluent = decode_state(state, problem.state_map)
+    return [a for a in problem.actions_list
+            if all(c in fluent.pos for c in a.precond_pos) and all(c in fluent.neg for c in a.precond_neg)]
+
+
+class BitsetStateTest(unittest.TestCase):
+    def setUp(self):
+        self.problems = [have_cake(), air_cargo_p1(), air_cargo_p2()]
+
+    def test_encode_decode_round_trip(self):
+        for problem in self.problems:
+            fluent = decode_state(problem.initial, problem.state_map)
+            self.assertEqual(encode_state(fluent, problem.state_map), problem.initial)
+            as_tuple = [f in fluent.pos for f in problem.state_map]
+            self.assertEqual(decode_state(as_tuple, problem.state_map).pos, fluent.pos)
+
+    def test_bitset_order_matches_tuple_order(self):
+        """ Encoded states compare like the True/False tuples they replace """
+        problem = air_cargo_p1()
+        state = problem.initial
+        for action in problem.actions(state):
+            child = problem.result(state, action)
+            as_tuples = [tuple(bool(s & problem.fluent_bits[f]) for f in problem.state_map)
+                         for s in (state, child)]
+            self.assertEqual(state < child, as_tuples[0] < as_tuples[1])
+
+    def test_actions_and_results(self):
+        """ Walk a few levels of each problem and check the compiled masks
+        against the preconditions & effects of the actions
+        """
+        for problem in self.problems:
+            frontier, seen = [problem.initial], {problem.initial}
+            for _ in range(3):
+                next_frontier = []
+                for state in frontier:
+                    actions = problem.actions(state)
+                    self.assertEqual(actions, reference_actions(problem, state))
+                    for action in actions:
+                        child = problem.result(state, action)
+                        fluent = decode_state(child, problem.state_map)
+                        self.assertTrue(action.effect_add <= set(fluent.pos))
+                        self.assertTrue(action.effect_rem.isdisjoint(fluent.pos))
+                        if child not in seen:
+                            seen.add(child)
+                            next_frontier.append(child)
+                frontier = next_frontier
+
+    def test_goal_test_and_unmet_goals(self):
+        problem = air_cargo_p1()
+        self.assertFalse(problem.goal_test(problem.initial))
+        self.assertEqual(problem.h_unmet_goals(Node(problem.initial)), 2)
+        goal = problem.initial | problem.goal_mask
+        self.assertTrue(problem.goal_test(goal))
+        self.assertEqual(problem.h_unmet_goals(Node(goal)), 0)
+
+
+class AirCargoGeneratorTest(unittest.TestCase):
+    def test_problem_size(self):
+        problem = air_cargo(4, 2, 3, seed=0)
+        self.assertEqual(len(problem.state_map), 4 * 3 + 2 * 3 + 4 * 2)
+        self.assertEqual(len(problem.goal), 4)
+        self.assertFalse(problem.goal_test(problem.initial))
+
+    def test_seed_is_reproducible(self):
+        first, second = air_cargo(6, 2, 4, seed=3), air_cargo(6, 2, 4, seed=3)
+        self.assertEqual(first.initial, second.initial)
+        self.assertEqual(first.goal, second.goal)
+
+    def test_generated_problems_are_solvable(self):
+        for seed in range(3):
+            problem = air_cargo(3, 2, 3, seed=seed)
+            node = astar_search(problem, problem.h_unmet_goals)
+            self.assertIsNotNone(node)
+            self.assertTrue(problem.goal_test(node.state))
+
+    def test_rejects_degenerate_sizes(self):
+        with self.assertRaises(ValueError):
+            air_cargo(3, 2, 1)
+
+
+class AirCargoGroundingTest(unittest.TestCase):
+    def test_matches_full_grounding(self):
+        """ Every action of p2 is reachable, so none are pruned """
+        problem = air_cargo_p2()
+        names = [str(a) for a in problem.actions_list]
+        cpa = [(c, p, a) for c in problem.cargos for p in problem.planes for a in problem.airports]
+        expected = (["Load({}, {}, {})".format(*args) for args in cpa] +
+                    ["Unload({}, {}, {})".format(*args) for args in cpa] +
+                    ["Fly({}, {}, {})".format(p, fr, to) for fr in problem.airports for to in problem.airports
+                     for p in problem.planes if fr != to])
+        self.assertEqual(names, expected)
+
+    def test_unreachable_actions_are_pruned(self):
+        """ C2 & P2 are not anywhere, so no action can move them """
+        cargos, planes, airports = ['C1', 'C2'], ['P1', 'P2'], ['JFK', 'SFO']
+        relations = make_relations('At', cargos + planes, airports) + make_relations('In', cargos, planes)
+        pos = create_expressions(['At(C1, JFK)', 'At(P1, SFO)'])
+        init = FluentState(pos, [r for r in relations if r not in pos])
+        problem = AirCargoProblem(cargos, planes, airports, init, create_expressions(['At(C1, SFO)']))
+        self.assertEqual(sorted(str(a) for a in problem.actions_list), [
+            'Fly(P1, JFK, SFO)', 'Fly(P1, SFO, JFK)', 'Load(C1, P1, JFK)', 'Load(C1, P1, SFO)',
+            'Unload(C1, P1, JFK)', 'Unload(C1, P1, SFO)'])
+        node = astar_search(problem, problem.h_unmet_goals)
+        self.assertEqual(len(node.solution()), 4)
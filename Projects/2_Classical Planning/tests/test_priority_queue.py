@@ -0,0 +1,42 @@
+
+import unittest
+
+from aimacode.search import Node, Problem, uniform_cost_search
+from aimacode.utils import PriorityQueue
+
+
+class WeightedGraph(Problem):
+    """ S -> A costs 1 and S -> B costs 5, so B is in the frontier with g=5
+    when the cheaper path S -> A -> B (g=2) is found
+    """
+    EDGES = {"S": {"A": 1, "B": 5}, "A": {"B": 1}, "B": {"G": 1}, "G": {}}
+
+    def actions(self, state):
+        return sorted(self.EDGES[state])
+
+    def result(self, state, action):
+        return action
+
+    def path_cost(self, c, state1, action, state2):
+        return c + self.EDGES[state1][state2]
+
+
+class PriorityQueueTest(unittest.TestCase):
+    def test_decrease_key(self):
+        queue = PriorityQueue(min, lambda node: node.path_cost)
+        queue.append(Node("x", path_cost=5))
+        queue.append(Node("y", path_cost=3))
+        better = Node("x", path_cost=1)
+        self.assertEqual(queue[better].path_cost, 5)  # lookup returns the incumbent
+        del queue[better]
+        queue.append(better)
+        self.assertEqual(len(queue), 2)
+        self.assertIs(queue.pop(), better)
+        self.assertEqual(queue.pop().state, "y")
+        self.assertFalse(queue)
+        self.assertRaises(IndexError, queue.pop)
+
+    def test_uniform_cost_uses_cheaper_path(self):
+        node = uniform_cost_search(WeightedGraph("S", "G"))
+        self.assertEqual(node.path_cost, 3)
+        self.assertEqual([n.state for n in node.path()], ["S", "A", "B", "G"])
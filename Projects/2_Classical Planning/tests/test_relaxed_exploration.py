@@ -0,0 +1,44 @@
+
+import unittest
+
+from random import Random
+
+from aimacode.search import Node
+from air_cargo_problems import air_cargo_p1, air_cargo_p2
+from example_have_cake import have_cake
+from my_planning_graph import PlanningGraph
+
+
+class RelaxedExplorationTest(unittest.TestCase):
+    def setUp(self):
+        self.problems = [have_cake(), air_cargo_p1(), air_cargo_p2()]
+
+    def states(self, problem, count=10, seed=7):
+        """ The initial state & a few states along a random walk """
+        rng, state = Random(seed), problem.initial
+        for _ in range(count):
+            yield state
+            state = problem.result(state, rng.choice(problem.actions(state)))
+
+    def test_level_costs_match_planning_graph(self):
+        for problem in self.problems:
+            exploration = problem.relaxed_exploration
+            for state in self.states(problem):
+                pg = PlanningGraph(problem, state, serialize=True, ignore_mutexes=True)
+                self.assertEqual(exploration.h_max(state), pg.h_maxlevel())
+                pg = PlanningGraph(problem, state, serialize=True, ignore_mutexes=True)
+                self.assertEqual(sum(exploration.level_costs(state)), pg.h_levelsum())
+
+    def test_initial_values(self):
+        expected = {"h_max": [1, 2, 2], "h_add": [1, 6, 9], "h_ff": [1, 6, 9]}
+        for name, values in expected.items():
+            self.assertEqual([getattr(p, name)(Node(p.initial)) for p in self.problems], values, name)
+
+    def test_goal_and_unreachable_states(self):
+        problem = air_cargo_p1()
+        goal = problem.initial | problem.goal_mask
+        for name in ("h_max", "h_add", "h_ff"):
+            self.assertEqual(getattr(problem.relaxed_exploration, name)(goal), 0)
+        cake = have_cake()
+        cake.actions_list = [a for a in cake.actions_list if "Eat" not in str(a.name)]
+        self.assertEqual(cake.relaxed_exploration.h_ff(cake.initial), float("inf"))
@@ -0,0 +1,37 @@
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from run_experiments import append_record, pending_runs, read_records, run_experiments
+
+
+class RunExperimentsTest(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_records_and_skips_completed_runs(self):
+        for name in ("results.jsonl", "results.csv"):
+            path = os.path.join(self.tmpdir, name)
+            runs = pending_runs([1], [1, 4], path)
+            self.assertEqual(runs, [(1, 1), (1, 4)])
+            for record in run_experiments(runs, processes=2):
+                append_record(path, record)
+            records = sorted(read_records(path), key=lambda r: int(r["search_index"]))
+            self.assertEqual([r["status"] for r in records], ["ok", "ok"])
+            self.assertEqual([int(r["plan_length"]) for r in records], [6, 6])
+            self.assertEqual(int(records[1]["expansions"]), 7)
+            self.assertGreater(int(records[0]["peak_rss_kb"]), 0)
+            self.assertEqual(pending_runs([1], [1, 4], path), [])
+
+    def test_timeout(self):
+        path = os.path.join(self.tmpdir, "results.jsonl")
+        [record] = run_experiments([(3, 1)], timeout=0.2)
+        self.assertEqual(record["status"], "timeout")
+        append_record(path, record)
+        self.assertEqual(pending_runs([3], [1], path), [])
+        self.assertEqual(pending_runs([3], [1], path, retry=True), [(3, 1)])
@@ -0,0 +1,27 @@
+
+import unittest
+
+from aimacode.search import Node, depth_first_graph_search, depth_first_tree_search
+from aimacode.utils import Stack
+from example_have_cake import have_cake
+
+
+class StackTest(unittest.TestCase):
+    def test_lifo_and_membership(self):
+        stack = Stack()
+        stack.extend([Node(1), Node(2), Node(1)])
+        self.assertEqual(len(stack), 3)
+        self.assertIn(Node(2), stack)
+        self.assertEqual(stack.pop().state, 1)
+        self.assertIn(Node(1), stack)  # the first node with state 1 is still queued
+        stack.pop()
+        self.assertNotIn(Node(2), stack)
+        self.assertEqual(stack.pop().state, 1)
+        self.assertFalse(stack)
+        self.assertRaises(IndexError, stack.pop)
+
+    def test_depth_first_searches(self):
+        problem = have_cake()
+        for search in (depth_first_graph_search, depth_first_tree_search):
+            node = search(problem)
+            self.assertTrue(problem.goal_test(node.state))
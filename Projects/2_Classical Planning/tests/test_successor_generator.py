@@ -0,0 +1,37 @@
+
+import unittest
+
+from random import Random
+
+from air_cargo_problems import air_cargo_p3
+from example_have_cake import have_cake
+from successor_generator import SuccessorGenerator
+
+
+def scan(actions, preconditions, state):
+    """ Applicable actions found by testing every action """
+    return [a for a, m in zip(actions, preconditions)
+            if m is not None and state & m[0] == m[0] and not state & m[1]]
+
+
+class SuccessorGeneratorTest(unittest.TestCase):
+    def test_matches_scan(self):
+        """ The tree finds the same actions as a linear scan, in the same order """
+        problem = air_cargo_p3()
+        masks = [problem.action_masks[a][:2] for a in problem.actions_list]
+        generator = SuccessorGenerator(problem.actions_list, masks)
+        rng = Random(42)
+        state = problem.initial
+        for _ in range(200):
+            actions = generator.applicable(state)
+            self.assertEqual(actions, scan(problem.actions_list, masks, state))
+            state = problem.result(state, rng.choice(actions))
+
+    def test_negative_and_empty_preconditions(self):
+        problem = have_cake()
+        eat, bake = problem.actions_list
+        have = problem.fluent_bits[next(iter(eat.precond_pos))]
+        generator = SuccessorGenerator(["eat", "bake", "noop", "never", "contradiction"],
+                                       [(have, 0), (0, have), (0, 0), None, (have, have)])
+        self.assertEqual(generator.applicable(have), ["eat", "noop"])
+        self.assertEqual(generator.applicable(0), ["bake", "noop"])
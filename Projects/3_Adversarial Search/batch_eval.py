@@ -0,0 +1,214 @@
+""" Vectorized evaluation of batches of Isolation positions with NumPy
+
+The heuristics used by the sample agents are computed one node at a time in
+pure Python. This module packs a batch of game states into NumPy arrays and
+computes mobility features for every state in the batch at once using
+precomputed move masks, which is much faster than looping over the states
+when many positions need to be scored (e.g., all children of a search node,
+or a large set of training positions).
+
+The open cells of each board are unpacked into one row of a boolean matrix
+with one column per cell of the board (the padding columns of the bitboard
+are dropped), and the knight locations are stored as column indices (-1 for
+a player that has not been placed on the board yet). Every state in a batch
+must have the same board dimensions; the move masks are built once for each
+board size.
+
+Examples
+--------
+>>> batch = pack([Isolation(), Isolation().result(57)])
+>>> features(batch, player_id=0).shape
+(2, 6)
+>>> scores = evaluate_children(state, player_id=0)  # dict {action: score}
+"""
+from collections import namedtuple
+from functools import lru_cache
+
+import numpy as np
+
+from isolation.isolation import board_tables, _WIDTH, _HEIGHT
+
+FEATURES = ("own_liberties", "opp_liberties", "own_reach", "opp_reach", "own_area", "opp_area")
+AREA_RADIUS = 2  # open area is counted in a (2r + 1) x (2r + 1) window around each knight
+
+Masks = namedtuple("Masks", "num_bytes cells column moves near moves_float actions targets")
+
+
+@lru_cache(maxsize=None)
+def masks(width=_WIDTH, height=_HEIGHT):
+    """ Build the lookup arrays for a board size
+
+    Returns
+    -------
+    Masks
+        num_bytes: the number of bytes in a bitboard
+        cells: the bitboard index of each column (one column per cell on the board)
+        column: the column of each bitboard index (-1 in the padding columns)
+        moves: (cells x cells) boolean mask of the knight moves between cells
+        near: (cells x cells) boolean mask of the cells within AREA_RADIUS of each cell
+        moves_float: the moves mask as float32 (for matrix products)
+        actions: the action for each column of targets
+        targets: (cells x actions) destination column of each action from each
+            column (-1 if the move leaves the board)
+    """
+    tables = board_tables(width, height)
+    num_bytes = (tables.size + 7) // 8
+    cells = np.array([i for i in range(tables.size) if i % (width + 2) < width], dtype=np.intp)
+    column = np.full(num_bytes * 8, -1, dtype=np.intp)
+    column[cells] = np.arange(len(cells))
+
+    moves = np.zeros((len(cells), len(cells)), dtype=bool)
+    near = np.zeros((len(cells), len(cells)), dtype=bool)
+    targets = np.full((len(cells), len(tables.actions)), -1, dtype=np.intp)
+    for col, cell in enumerate(cells):
+        x, y = cell % (width + 2), cell // (width + 2)
+        for idx, action in enumerate(tables.actions):
+            target = cell + action
+            if 0 <= target < tables.size and column[target] >= 0:
+                moves[col, column[target]] = True
+                targets[col, idx] = column[target]
+        for dx in range(-AREA_RADIUS, AREA_RADIUS + 1):
+            for dy in range(-AREA_RADIUS, AREA_RADIUS + 1):
+                if 0 <= x + dx < width and 0 <= y + dy < height:
+                    near[col, column[cell + dx + dy * (width + 2)]] = True
+    return Masks(num_bytes, cells, column, moves, near, moves.astype(np.float32), tables.actions, targets)
+
+
+Batch = namedtuple("Batch", "open locs players width height")
+Batch.__doc__ = """ A batch of game states packed into arrays
+
+Attributes
+----------
+open : np.ndarray
+    Boolean array of shape (N, cells) that is True for each open cell
+
+locs : np.ndarray
+    Integer array of shape (N, 2) containing the column of each player's
+    knight (-1 if the player has not been placed on the board)
+
+players : np.ndarray
+    Integer array of shape (N,) containing the active player of each state
+
+width, height : int
+    The dimensions of the board shared by every state in the batch
+"""
+
+
+def unpack_boards(boards, width=_WIDTH, height=_HEIGHT):
+    """ Convert a sequence of Isolation bitboards into a boolean (N, cells) array """
+    m = masks(width, height)
+    data = b"".join(board.to_bytes(m.num_bytes, "big") for board in boards)
+    bits = np.unpackbits(np.frombuffer(data, dtype=np.uint8)).reshape(-1, m.num_bytes * 8)
+    return bits[:, ::-1][:, m.cells].astype(bool)  # reverse big-endian bits to bitboard order
+
+
+def pack(states, width=_WIDTH, height=_HEIGHT):
+    """ Pack a sequence of Isolation states into a Batch (the dimensions are
+    taken from the first state if there are any states)
+    """
+    states = list(states)
+    if states:
+        width, height = states[0].width, states[0].height
+    if any((s.width, s.height) != (width, height) for s in states):
+        raise ValueError("Every state in a batch must have the same board size")
+    column = masks(width, height).column
+    locs = np.array([[-1 if loc is None else column[loc] for loc in s.locs] for s in states],
+                    dtype=np.intp).reshape(-1, 2)
+    players = np.array([s.ply_count % 2 for s in states], dtype=np.intp)
+    return Batch(unpack_boards([s.board for s in states], width, height), locs, players, width, height)
+
+
+def _rows(mask, locs, open_cells):
+    """ Select the mask row for each knight location; unplaced knights can
+    move to any open cell (the same rule as Isolation.liberties(None))
+    """
+    rows = mask[np.maximum(locs, 0)] & open_cells
+    return np.where((locs >= 0)[:, None], rows, open_cells)
+
+
+def player_features(batch, player_id):
+    """ Return the (liberties, reach, area) counts for one player as three
+    integer arrays of shape (N,)
+
+    liberties: open cells one knight move from the player
+    reach: open cells within two knight moves of the player
+    area: open cells within AREA_RADIUS rows & columns of the player
+    """
+    m = masks(batch.width, batch.height)
+    locs = batch.locs[:, player_id]
+    liberties = _rows(m.moves, locs, batch.open)
+    second = (liberties.astype(np.float32) @ m.moves_float > 0) & batch.open
+    reach = liberties | second
+    area = _rows(m.near, locs, batch.open)
+    return liberties.sum(axis=1), reach.sum(axis=1), area.sum(axis=1)
+
+
+def features(batch, player_id):
+    """ Return a float array of shape (N, len(FEATURES)) containing the
+    features of each state in the batch from the perspective of `player_id`
+    """
+    own = player_features(batch, player_id)
+    opp = player_features(batch, 1 - player_id)
+    columns = [own[0], opp[0], own[1], opp[1], own[2], opp[2]]
+    return np.stack(columns, axis=1).astype(np.float32)
+
+
+def score(batch, player_id, weights=None):
+    """ Return a linear heuristic score for every state in the batch
+
+    Parameters
+    ----------
+    batch : Batch
+        Game states packed by pack()
+
+    player_id : int
+        The player whose perspective the states are scored from
+
+    weights : sequence, optional
+        One weight for each name in FEATURES; by default the score is the
+        difference between the players' liberties (the same heuristic used
+        by CustomPlayer.score)
+    """
+    if weights is None:
+        weights = (1, -1, 0, 0, 0, 0)
+    return features(batch, player_id) @ np.asarray(weights, dtype=np.float32)
+
+
+def children(state):
+    """ Pack all of the children of a (non-terminal) Isolation state into a
+    Batch without constructing the child states
+
+    Returns
+    -------
+    (list, Batch)
+        The actions available in the state and a batch containing the state
+        produced by each action (in the same order)
+    """
+    parent = pack([state])
+    m = masks(parent.width, parent.height)
+    player = state.player()
+    loc = parent.locs[0, player]
+    if loc < 0:
+        targets = np.flatnonzero(parent.open[0])
+        actions = [int(c) for c in m.cells[targets]]
+    else:
+        idx = [i for i, t in enumerate(m.targets[loc]) if t >= 0 and parent.open[0, t]]
+        targets = m.targets[loc, idx]
+        actions = [m.actions[i] for i in idx]
+    num_children = len(targets)
+    open_cells = np.repeat(parent.open, num_children, axis=0)
+    open_cells[np.arange(num_children), targets] = False
+    locs = np.repeat(parent.locs, num_children, axis=0)
+    locs[:, player] = targets
+    players = np.full(num_children, 1 - player, dtype=np.intp)
+    return actions, Batch(open_cells, locs, players, parent.width, parent.height)
+
+
+def evaluate_children(state, player_id, weights=None):
+    """ Score every child of `state` in one vectorized pass and return a
+    dict mapping each action to the score of the state it produces
+    """
+    actions, batch = children(state)
+    if not actions:
+        return {}
+    return dict(zip(actions, score(batch, player_id, weights).tolist()))
@@ -0,0 +1,259 @@
+""" Benchmark move generation (perft) and the search speed of the Isolation agents """
+import argparse
+import json
+import platform
+import random
+import sys
+import textwrap
+import time
+import timeit
+
+from multiprocessing import Pipe
+
+from isolation import Isolation, SearchState
+from isolation.isolation import _WIDTH, _HEIGHT
+from isolation import TimedQueue, _request_action
+from sample_players import RandomPlayer, GreedyPlayer, MinimaxPlayer
+from my_custom_player import CustomPlayer
+
+FORMAT_VERSION = 1
+PERFT_DEPTH = 3  # default perft search depth (in plies)
+TIME_LIMIT = 150  # number of milliseconds per agent move
+PRIMITIVE_CALLS = 2000  # number of calls to time for each state primitive
+
+# fixed positions described by the actions applied to an empty 11x9 board
+# (on other board sizes each position is replaced by a seeded random game
+# with the same number of plies; see make_position())
+POSITIONS = {
+    "empty": [],
+    "opening": [19, 85],
+    "midgame": [57, 114, 15, -15, -27, -11, -27, -15, -11, -15, 27, 11],
+    "endgame": [7, 14, 25, 15, 27, 11, 15, -25, -27, 27, 11, -11, 25, -11, 15,
+                -15, -11, 11, 27, -15, -15, 27, 11, 27, -15, -25, -25, -11, 15, 15],
+}
+
+AGENTS = {
+    "RANDOM": RandomPlayer,
+    "GREEDY": GreedyPlayer,
+    "MINIMAX": MinimaxPlayer,
+    "SELF": CustomPlayer,
+}
+
+
+def make_position(name, width=_WIDTH, height=_HEIGHT):
+    state = Isolation(width=width, height=height)
+    if (width, height) == (_WIDTH, _HEIGHT):
+        for action in POSITIONS[name]:
+            state = state.result(action)
+        return state
+    rng = random.Random(name)
+    for _ in POSITIONS[name]:
+        actions = state.actions()
+        child = state.result(rng.choice(actions)) if actions else state
+        if child.terminal_test():
+            break
+        state = child
+    return state
+
+
+def perft(state, depth):
+    """ Count the leaf nodes of the game tree below `state` to a fixed depth
+    (the count only depends on move generation, so any two correct
+    implementations of the game rules must return the same value)
+    """
+    if depth == 0:
+        return 1
+    return sum(perft(state.result(a), depth - 1) for a in state.actions())
+
+
+def fast_perft(state, depth):
+    """ perft() implemented with SearchState.apply() """
+    if depth == 0:
+        return 1
+    return sum(fast_perft(state.apply(a), depth - 1) for a in state.actions())
+
+
+def run_perft(depth, width=_WIDTH, height=_HEIGHT):
+    results = []
+    for name in POSITIONS:
+        state = make_position(name, width, height)
+        for impl, fn, root in (("Isolation", perft, state),
+                               ("SearchState", fast_perft, SearchState.from_state(state))):
+            start = time.perf_counter()
+            nodes = fn(root, depth)
+            elapsed = time.perf_counter() - start
+            results.append({"position": name, "state": impl, "depth": depth,
+                            "nodes": nodes, "seconds": elapsed, "nps": nodes / elapsed})
+    return results
+
+
+def run_primitives(calls=PRIMITIVE_CALLS, width=_WIDTH, height=_HEIGHT):
+    results = []
+    for name in POSITIONS:
+        state = make_position(name, width, height)
+        loc = state.locs[state.player()]
+        action = state.actions()[0]
+        fast_state = SearchState.from_state(state)
+        primitives = (
+            ("Isolation", "actions", state.actions),
+            ("Isolation", "result", lambda: state.result(action)),
+            ("Isolation", "terminal_test", state.terminal_test),
+            ("Isolation", "liberties", lambda: state.liberties(loc)),
+            ("SearchState", "actions", fast_state.actions),
+            ("SearchState", "result", lambda: fast_state.apply(action)),
+            ("SearchState", "terminal_test", fast_state.terminal_test),
+            ("SearchState", "liberties", lambda: fast_state.liberties(loc)),
+        )
+        for impl, primitive, fn in primitives:
+            elapsed = min(timeit.repeat(fn, number=calls, repeat=3))
+            results.append({"position": name, "state": impl, "primitive": primitive,
+                            "ns_per_call": 1e9 * elapsed / calls})
+    return results
+
+
+class NodeCounter:
+    """ Context manager that counts every state created by an agent by
+    wrapping Isolation.result() and SearchState.apply()
+    """
+    def __enter__(self):
+        self.nodes = 0
+        self._result, self._apply = Isolation.result, SearchState.apply
+
+        def result(state, action):
+            self.nodes += 1
+            return self._result(state, action)
+
+        def apply(state, action):
+            self.nodes += 1
+            return self._apply(state, action)
+
+        Isolation.result, SearchState.apply = result, apply
+        return self
+
+    def __exit__(self, *args):
+        Isolation.result, SearchState.apply = self._result, self._apply
+
+
+def run_agents(agent_names, time_limit=TIME_LIMIT, width=_WIDTH, height=_HEIGHT):
+    results = []
+    for agent_name in agent_names:
+        for name in POSITIONS:
+            state = make_position(name, width, height)
+            agent = AGENTS[agent_name](player_id=state.player())
+            receiver, sender = Pipe()
+            queue = TimedQueue(receiver, sender, time_limit)
+            with NodeCounter() as counter:
+                start = time.perf_counter()
+                _request_action(agent, queue, state)
+                elapsed = time.perf_counter() - start
+            # moves taken from the opening book or the endgame solver don't
+            # create any states, so their node counts are not comparable
+            source = (agent.metrics or {}).get("source", "search")
+            results.append({"agent": agent_name, "position": name, "source": source,
+                            "nodes": counter.nodes, "seconds": elapsed, "nps": counter.nodes / elapsed})
+    return results
+
+
+def compare(results, baseline):
+    """ Print the speedup of each benchmark relative to a baseline run """
+    def index(section, fields):
+        return {tuple(r.get(f) for f in fields): r for r in section}
+
+    for section, fields, metric, higher_is_better in (
+            ("perft", ("position", "state", "depth"), "nps", True),
+            ("primitives", ("position", "state", "primitive"), "ns_per_call", False),
+            ("agents", ("agent", "position", "source"), "nps", True)):
+        old = index(baseline.get(section, []), fields)
+        print("\n{}".format(section))
+        for key, new in sorted(index(results.get(section, []), fields).items()):
+            if key not in old or not old[key][metric] or not new[metric]:
+                continue
+            ratio = new[metric] / old[key][metric]
+            print("  {:<48} {:>8.2f}x".format(" / ".join(map(str, key)),
+                                               ratio if higher_is_better else 1 / ratio))
+            if section == "perft" and new["nodes"] != old[key]["nodes"]:
+                print("    WARNING: node count changed from {} to {}".format(old[key]["nodes"], new["nodes"]))
+
+
+def main(args):
+    results = {
+        "format": FORMAT_VERSION,
+        "python": "{} {}".format(platform.python_implementation(), platform.python_version()),
+        "board": "{}x{}".format(args.width, args.height),
+        "perft": run_perft(args.depth, args.width, args.height),
+        "primitives": run_primitives(width=args.width, height=args.height),
+        "agents": run_agents([a.upper() for a in args.agents], args.time_limit, args.width, args.height),
+    }
+
+    # every state implementation must generate exactly the same game tree
+    counts = {}
+    for r in results["perft"]:
+        counts.setdefault((r["position"], r["depth"]), set()).add(r["nodes"])
+    mismatched = [key for key, nodes in counts.items() if len(nodes) > 1]
+    for position, depth in mismatched:
+        print("ERROR: perft counts disagree for position '{}' at depth {}".format(position, depth),
+              file=sys.stderr)
+
+    output = json.dumps(results, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if baseline.get("board", "{}x{}".format(_WIDTH, _HEIGHT)) != results["board"]:
+            print("ERROR: the baseline was measured on a different board size", file=sys.stderr)
+            return 1
+        compare(results, baseline)
+    return 1 if mismatched else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        description="Measure the speed of the game engine and the search speed of each agent.",
+        epilog=textwrap.dedent("""\
+            Example Usage:
+            --------------
+            - Save a baseline, then compare a later run against it:
+
+                $python benchmark.py -o baseline.json
+                $python benchmark.py -o new.json -c baseline.json
+
+            The perft node counts of every position are checked against each other
+            for all state implementations, and against the baseline when comparing
+            runs, so the benchmark also detects move generation bugs.
+        """)
+    )
+    parser.add_argument(
+        '-d', '--depth', type=int, default=PERFT_DEPTH,
+        help="Set the perft search depth (in plies) for every fixed position."
+    )
+    parser.add_argument(
+        '-a', '--agents', nargs="+", default=list(AGENTS), choices=list(AGENTS) + [a.lower() for a in AGENTS],
+        help="Choose the agents to include in the nodes-per-second benchmark."
+    )
+    parser.add_argument(
+        '-t', '--time_limit', type=int, default=TIME_LIMIT,
+        help="Set the time limit (in milliseconds) for each agent move."
+    )
+    parser.add_argument(
+        '-o', '--output', type=str, default=None,
+        help="Write the results as JSON to this file (default: print to stdout)."
+    )
+    parser.add_argument(
+        '-c', '--compare', type=str, default=None,
+        help="Compare the results against a JSON file saved by a previous run."
+    )
+    parser.add_argument(
+        '--width', type=int, default=_WIDTH,
+        help="Set the number of columns on the board."
+    )
+    parser.add_argument(
+        '--height', type=int, default=_HEIGHT,
+        help="Set the number of rows on the board."
+    )
+    sys.exit(main(parser.parse_args()))
@@ -0,0 +1,117 @@
+""" Build an opening book for an agent by searching the early game offline """
+import argparse
+import logging
+import textwrap
+import time
+
+from functools import partial
+
+from multiprocessing import Pool, cpu_count
+
+from isolation import Isolation
+from isolation.isolation import _WIDTH, _HEIGHT
+from isolation.book import encode_entry, write_book
+from isolation.symmetry import canonical_key, transform_state
+from my_custom_player import alpha_beta, liberty_difference
+
+logger = logging.getLogger(__name__)
+
+BOOK_FILE = "data.book"
+NUM_PLIES = 4  # build entries for every position with fewer plies than this
+SEARCH_DEPTH = 4  # search depth (in plies) used to choose each book move
+
+
+def opening_positions(num_plies, width=_WIDTH, height=_HEIGHT):
+    """ Return every distinct position (up to symmetry) that can be reached
+    from an empty board of the specified size in fewer than `num_plies` plies
+
+    Each position is returned in its canonical orientation, so the best move
+    found by searching it can be stored in the book without translation.
+    """
+    root = Isolation(width=width, height=height)
+    layer = {canonical_key(root)[0]: root}
+    positions = []
+    for _ in range(num_plies):
+        positions.extend(layer.values())
+        next_layer = {}
+        for state in layer.values():
+            for action in state.actions():
+                child = state.result(action)
+                if child.terminal_test():
+                    continue
+                key, symmetry = canonical_key(child)
+                if key not in next_layer:
+                    next_layer[key] = transform_state(child, symmetry)
+        layer = next_layer
+    return positions
+
+
+def search_position(args):
+    """ Choose the best move in a position using a fixed-depth search """
+    state, depth = args
+    player_id = state.player()
+    _, action = alpha_beta(state, depth, player_id, partial(liberty_difference, player_id=player_id))
+    return encode_entry(state, action)
+
+
+def build_book(num_plies=NUM_PLIES, depth=SEARCH_DEPTH, processes=None, width=_WIDTH, height=_HEIGHT):
+    positions = opening_positions(num_plies, width, height)
+    print("Searching {} positions to depth {}:".format(len(positions), depth))
+    entries = []
+    start = time.perf_counter()
+    with Pool(processes or cpu_count()) as pool:
+        tasks = ((state, depth) for state in positions)
+        for idx, entry in enumerate(pool.imap_unordered(search_position, tasks, chunksize=8)):
+            entries.append(entry)
+            if (idx + 1) % 1000 == 0:
+                print("  {} / {} positions ({:.1f}s)".format(
+                    idx + 1, len(positions), time.perf_counter() - start))
+    print("Finished in {:.1f}s".format(time.perf_counter() - start))
+    return entries
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        description="Build an opening book for your agent by searching the early game offline.",
+        epilog=textwrap.dedent("""\
+            Example Usage:
+            --------------
+            - Build a book covering the first 4 plies using a depth 5 search on
+              all available cores:
+
+                $python build_opening_book.py -n 4 -d 5
+
+            The book is written to {} by default, where DataPlayer agents load
+            it automatically (see sample_players.DataPlayer).
+        """.format(BOOK_FILE))
+    )
+    parser.add_argument(
+        '-n', '--num_plies', type=int, default=NUM_PLIES,
+        help="Add a book entry for every position with fewer than this many plies."
+    )
+    parser.add_argument(
+        '-d', '--depth', type=int, default=SEARCH_DEPTH,
+        help="Set the search depth (in plies) used to choose each book move."
+    )
+    parser.add_argument(
+        '-p', '--processes', type=int, default=None,
+        help="Set the number of parallel search processes (default: all available cores)."
+    )
+    parser.add_argument(
+        '-o', '--output', type=str, default=BOOK_FILE,
+        help="Set the name of the opening book file."
+    )
+    parser.add_argument(
+        '--width', type=int, default=_WIDTH,
+        help="Set the number of columns on the board."
+    )
+    parser.add_argument(
+        '--height', type=int, default=_HEIGHT,
+        help="Set the number of rows on the board."
+    )
+    args = parser.parse_args()
+
+    entries = build_book(args.num_plies, args.depth, args.processes, args.width, args.height)
+    write_book(args.output, entries, args.width, args.height)
+    print("Wrote {} entries to {}".format(len(entries), args.output))
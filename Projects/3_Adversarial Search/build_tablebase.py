@@ -0,0 +1,124 @@
+""" Solve knight's Isolation exactly on a small board and save the tablebase """
+import argparse
+import random
+import textwrap
+import time
+
+from isolation import Isolation, _get_action
+from isolation.tablebase import Tablebase, solve, write_tablebase
+from sample_players import RandomPlayer, GreedyPlayer, MinimaxPlayer
+from my_custom_player import CustomPlayer
+
+WIDTH = 4  # default board size; exhaustive solving is only practical on small boards
+HEIGHT = 5
+NUM_POSITIONS = 200  # number of positions sampled to evaluate an agent
+TIME_LIMIT = 150  # number of milliseconds per agent move
+
+AGENTS = {
+    "RANDOM": RandomPlayer,
+    "GREEDY": GreedyPlayer,
+    "MINIMAX": MinimaxPlayer,
+    "SELF": CustomPlayer,
+}
+
+
+def sample_positions(width, height, count, seed=0):
+    """ Return `count` non-terminal positions sampled from random games """
+    rng = random.Random(seed)
+    positions = []
+    while len(positions) < count:
+        state = Isolation(width=width, height=height)
+        games = []
+        while not state.terminal_test():
+            games.append(state)
+            state = state.result(rng.choice(state.actions()))
+        positions.append(rng.choice(games))
+    return positions
+
+
+def evaluate(table, agent_class, positions, time_limit=TIME_LIMIT):
+    """ Compare the moves chosen by an agent with the tablebase
+
+    A blunder is a move that turns a won position into a loss; a move is
+    optimal if it achieves the exact value of the position (winning as
+    quickly or losing as slowly as possible).
+    """
+    stats = {"positions": 0, "winning": 0, "blunders": 0, "optimal": 0}
+    for state in positions:
+        action, _ = _get_action(state, agent_class(player_id=state.player()), time_limit)
+        best = table.get(state)
+        if best is None:
+            raise KeyError("The sampled position is not in {}".format(table.path))
+        values = table.move_values(state)
+        stats["positions"] += 1
+        stats["optimal"] += values.get(action) == best
+        if best > 0:
+            stats["winning"] += 1
+            stats["blunders"] += values.get(action, -1) < 0
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        description="Solve knight's Isolation exactly on a small board and save the tablebase.",
+        epilog=textwrap.dedent("""\
+            Example Usage:
+            --------------
+            - Solve the 4x5 board (10-20 seconds) and write the table to 4x5.tbl:
+
+                $python build_tablebase.py --width 4 --height 5
+
+            - Measure the decision quality of your agent against that table:
+
+                $python build_tablebase.py --width 4 --height 5 --evaluate SELF
+
+            Solving takes time & memory roughly 15-25 times greater for every
+            extra row or column; 5x5 and larger boards are out of reach for
+            the pure Python solver.
+        """)
+    )
+    parser.add_argument(
+        '--width', type=int, default=WIDTH,
+        help="Set the number of columns on the board."
+    )
+    parser.add_argument(
+        '--height', type=int, default=HEIGHT,
+        help="Set the number of rows on the board."
+    )
+    parser.add_argument(
+        '-o', '--output', type=str, default=None,
+        help="Set the name of the tablebase file (default: <width>x<height>.tbl)."
+    )
+    parser.add_argument(
+        '--evaluate', type=str, default=None, choices=list(AGENTS.keys()),
+        help="Evaluate the moves of an agent against an existing tablebase instead of building one."
+    )
+    parser.add_argument(
+        '-n', '--num_positions', type=int, default=NUM_POSITIONS,
+        help="Set the number of sampled positions used to evaluate an agent."
+    )
+    parser.add_argument(
+        '-t', '--time_limit', type=int, default=TIME_LIMIT,
+        help="Set the maximum allowed time (in milliseconds) for each agent move."
+    )
+    args = parser.parse_args()
+    path = args.output or "{}x{}.tbl".format(args.width, args.height)
+
+    if args.evaluate:
+        table = Tablebase(path)
+        positions = sample_positions(table.width, table.height, args.num_positions)
+        stats = evaluate(table, AGENTS[args.evaluate], positions, args.time_limit)
+        print("Positions:  {positions}  (winning: {winning})".format(**stats))
+        print("Optimal:    {:.1%}".format(stats["optimal"] / stats["positions"]))
+        print("Blunders:   {} ({:.1%} of winning positions)".format(
+            stats["blunders"], stats["blunders"] / max(1, stats["winning"])))
+        table.close()
+    else:
+        start = time.perf_counter()
+        values = solve(args.width, args.height)
+        root = values[max(values)]  # the empty board has the largest key
+        print("Solved {} positions in {:.1f}s".format(len(values), time.perf_counter() - start))
+        print("First player {} with best play".format("wins" if root > 0 else "loses"))
+        write_tablebase(path, args.width, args.height, values)
+        print("Wrote {}".format(path))
@@ -14,13 +14,17 @@ from multiprocessing import Process, Pipe
 from queue import Empty
 
 from .isolation import Isolation, DebugState
+from .search_state import SearchState
 
-__all__ = ['Isolation', 'DebugState', 'Status', 'play', 'fork_get_action']
+__all__ = ['Isolation', 'DebugState', 'SearchState', 'Status', 'GameResult', 'Deadline',
+           'play', 'play_game', 'fork_get_action']
 logger = logging.getLogger(__name__)
 
 Agent = namedtuple("Agent", "agent_class name")
+GameResult = namedtuple("GameResult", "agents initial_state history metrics status winner loser match_id")
 
-PROCESS_TIMEOUT = 5  # time to interrupt agent search processes (in seconds)
+KILL_GRACE = 0.1  # time after the hard limit before agent search processes are terminated (in seconds)
+SOFT_LIMIT = 0.5  # fraction of the time limit before the soft deadline of each move
 GAME_INFO = """\
 Initial game state: {}
 First agent: {!s}
@@ -41,6 +45,7 @@ History: {}
 Winner: {}
 Loser: {}
 """
+RESULT_SUMMARY = "Match %s ended with status %s after %d moves; winner: %s"
 
 class Status(Enum):
     NORMAL = 0
@@ -53,31 +58,102 @@ class Status(Enum):
 class StopSearch(Exception): pass  # Exception class used to halt search
 
 
+class Deadline:
+    """ Time limits for the current move, which agents can read from
+    self.deadline during get_action() and poll from their search loops
+
+    The hard limit is the move time limit: TimedQueue.put() raises
+    StopSearch after it expires, and the agent process is terminated
+    KILL_GRACE seconds later. The soft limit is a hint for agents that
+    search incrementally (e.g., with iterative deepening) that there is
+    probably not enough time left to complete another iteration.
+
+    Every method is a single clock read, so they are cheap enough to call
+    every few hundred nodes of a search.
+
+    Parameters
+    ----------
+    time_limit : float
+        The time limit of the move (in seconds)
+
+    soft_limit : float, optional
+        The fraction of the time limit before the soft deadline
+
+    start : float, optional
+        The time.perf_counter() value when the move started (default: now);
+        the match runner passes the time it started the agent process, so
+        the time to start the process counts against the limit
+    """
+    __slots__ = ("start", "soft", "hard")
+
+    def __init__(self, time_limit, soft_limit=SOFT_LIMIT, start=None):
+        self.start = time.perf_counter() if start is None else start
+        self.soft = self.start + soft_limit * time_limit
+        self.hard = self.start + time_limit
+
+    def elapsed(self):
+        """ Return the time since the move started (in seconds) """
+        return time.perf_counter() - self.start
+
+    def remaining(self):
+        """ Return the time left before the hard limit (in seconds; negative after it) """
+        return self.hard - time.perf_counter()
+
+    def soft_expired(self):
+        return time.perf_counter() > self.soft
+
+    def expired(self):
+        return time.perf_counter() > self.hard
+
+    def check(self):
+        """ Raise StopSearch if the hard limit has expired """
+        if time.perf_counter() > self.hard:
+            raise StopSearch
+
+
 class TimedQueue:
     """Modified queue class to block .put() after a time limit expires,
-    and to include both a context object & action choice in the queue.
+    and to include a context object, search metrics & action choice in
+    the queue.
+
+    The metrics are a copy of the agent's `metrics` dict (if any) taken
+    when .put() is called, extended with the time used by the agent so
+    far and the time limit (both in seconds).
+
+    The timer is a Deadline (see start_timer()), which is shared with the
+    agent as its `deadline` attribute.
     """
     def __init__(self, receiver, sender, time_limit):
         self.__sender = sender
         self.__receiver = receiver
         self.__time_limit = time_limit / 1000
-        self.__stop_time = None
+        self.deadline = None
         self.agent = None
 
-    def start_timer(self):
-        self.__stop_time = self.__time_limit + time.perf_counter()
+    def start_timer(self, start=None):
+        self.deadline = Deadline(self.__time_limit, start=start)
 
     def put(self, item, block=True, timeout=None):
-        if self.__stop_time and time.perf_counter() > self.__stop_time:
-            raise StopSearch
+        if self.deadline:
+            self.deadline.check()
         if self.__receiver.poll():
             self.__receiver.recv()
-        self.__sender.send((getattr(self.agent, "context", None), item))
+        metrics = dict(getattr(self.agent, "metrics", None) or {})
+        if self.deadline:
+            metrics.update(time_used=self.deadline.elapsed(), time_limit=self.__time_limit)
+        self.__sender.send((getattr(self.agent, "context", None), metrics, item))
 
     def put_nowait(self, item):
         self.put(item, block=False)
 
     def get(self, block=True, timeout=None):
+        """ Return the last item put in the queue; raise queue.Empty if there is
+        none (immediately if block is False, or after timeout seconds)
+        """
+        if not block:
+            timeout = 0
+        if timeout is not None and not self.__receiver.poll(timeout):
+            raise Empty
         return self.__receiver.recv()
 
     def get_nowait(self):
@@ -91,10 +167,30 @@ class TimedQueue:
 def play(args): return _play(*args)  # multithreading ThreadPool.map doesn't expand args
 
 
+def play_game(args): return _play_game(*args)  # multithreading ThreadPool.map doesn't expand args
+
+
 def _play(agents, game_state, time_limit, match_id, debug=False):
     """ Run a match between two agents by alternately soliciting them to
     select a move and applying it to advance the game state.
 
+    See _play_game() for a description of the parameters.
+
+    Returns
+    -------
+    (agent, list<[(int, int),]>, int)
+        Return multiple including the winning agent, the actions that
+        were applied to the initial state, and the match id
+    """
+    result = _play_game(agents, game_state, time_limit, match_id, debug)
+    return result.winner, result.history, result.match_id
+
+
+def _play_game(agents, game_state, time_limit, match_id, debug=False):
+    """ Run a match between two agents by alternately soliciting them to
+    select a move and applying it to advance the game state, and collect
+    the search metrics reported by the agents for every move.
+
     Parameters
     ----------
     agents : tuple
@@ -111,17 +207,29 @@ def _play(agents, game_state, time_limit, match_id, debug=False):
 
     Returns
     -------
-    (agent, list<[(int, int),]>, Status)
-        Return multiple including the winning agent, the actions that
-        were applied to the initial state, a status code describing the
-        reason the game ended, and any error information
+    GameResult
+        A named tuple containing the agents, the initial state, the actions
+        that were applied to the initial state, the metrics reported by the
+        active agent for each of those actions (a list of dicts aligned with
+        the actions), a status code describing the reason the game ended,
+        the winning & losing agents, and the match id
+
+    Notes
+    -----
+    Every log record carries the match id & an `event` name as extra
+    attributes for structured log handlers (see run_match.py). The full
+    game states are only formatted when DEBUG logging is enabled; each
+    game logs one short summary at INFO level.
     """
     initial_state = game_state
     game_history = []
+    game_metrics = []
     winner = None
     status = Status.NORMAL
     players = [a.agent_class(player_id=i) for i, a in enumerate(agents)]
-    logger.info(GAME_INFO.format(initial_state, *agents))
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(GAME_INFO.format(initial_state, *agents),
+                     extra={"event": "game_start", "match_id": match_id})
     while not game_state.terminal_test():
         active_idx = game_state.player()
 
@@ -129,7 +237,7 @@ def _play(agents, game_state, time_limit, match_id, debug=False):
         winner, loser = agents[1 - active_idx], agents[active_idx]
 
         try:
-            action = fork_get_action(game_state, players[active_idx], time_limit, debug)
+            action, metrics = _get_action(game_state, players[active_idx], time_limit, debug)
         except Empty:
             status = Status.TIMEOUT
             logger.warn(textwrap.dedent("""\
@@ -137,13 +245,14 @@ def _play(agents, game_state, time_limit, match_id, debug=False):
                 the queue.put() method was not called by the get_action() method, or that
                 the queue was empty after the procedure was killed due to timeout {} seconds
                 after the move time limit of {} milliseconds had expired.
-                """.format(players[active_idx], PROCESS_TIMEOUT, time_limit)).replace("\n", " "))
+                """.format(players[active_idx], KILL_GRACE, time_limit)).replace("\n", " "),
+                extra={"event": "timeout", "match_id": match_id, "agent": agents[active_idx].name})
             break
         except Exception as err:
             status = Status.EXCEPTION
             logger.error(ERR_INFO.format(
                 err, initial_state, agents[0], agents[1], game_state, game_history
-            ))
+            ), extra={"event": "exception", "match_id": match_id, "agent": agents[active_idx].name})
             break
 
         if action not in game_state.actions():
@@ -152,16 +261,30 @@ def _play(agents, game_state, time_limit, match_id, debug=False):
 
         game_state = game_state.result(action)
         game_history.append(action)
+        game_metrics.append(metrics)
     else:
         status = Status.GAME_OVER
         if game_state.utility(active_idx) > 0:
             winner, loser = loser, winner  # swap winner/loser if active player won
 
-    logger.info(RESULT_INFO.format(status, game_state, game_history, winner, loser))
-    return winner, game_history, match_id
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(RESULT_INFO.format(status, game_state, game_history, winner, loser),
+                     extra={"event": "game_state", "match_id": match_id})
+    winner_name = getattr(winner, "name", None)
+    logger.info(RESULT_SUMMARY, match_id, status.name, len(game_history), winner_name,
+                extra={"event": "game_end", "match_id": match_id, "agents": [a.name for a in agents],
+                       "status": status.name, "winner": winner_name, "moves": len(game_history)})
+    return GameResult(agents, initial_state, game_history, game_metrics, status, winner, loser, match_id)
 
 
 def fork_get_action(game_state, active_player, time_limit, debug=False):
+    return _get_action(game_state, active_player, time_limit, debug)[0]
+
+
+def _get_action(game_state, active_player, time_limit, debug=False):
+    """ Solicit an action from the active player, and return the action along
+    with the metrics the player reported with it (see TimedQueue)
+    """
     receiver, sender = Pipe()
     action_queue = TimedQueue(receiver, sender, time_limit)
     if debug:  # run the search in the main process and thread
@@ -172,25 +295,31 @@ def fork_get_action(game_state, active_player, time_limit, debug=False):
         _request_action(active_player, action_queue, game_state)
         time.sleep(time_limit / 1000)
     else:  # spawn a new process to run the search function
+        p = None
         try:
-            p = Process(target=_request_action, args=(active_player, action_queue, game_state))
+            start = time.perf_counter()
+            p = Process(target=_request_action, args=(active_player, action_queue, game_state, start))
             p.start()
-            p.join(timeout=PROCESS_TIMEOUT + time_limit / 1000)
+            p.join(timeout=max(0, start + time_limit / 1000 + KILL_GRACE - time.perf_counter()))
         finally:
             if p and p.is_alive(): p.terminate()
-    new_context, action = action_queue.get_nowait()  # raises Empty if agent did not respond
+    new_context, metrics, action = action_queue.get_nowait()  # raises Empty if agent did not respond
     active_player.context = new_context
-    return action
+    return action, metrics
 
 
-def _request_action(agent, queue, game_state):
+def _request_action(agent, queue, game_state, start=None):
     """ Augment agent instances with a countdown timer on every method before
     calling the get_action() method and catch countdown timer exceptions.
+
+    The timer counts from `start` (a time.perf_counter() value taken by the
+    parent process before starting this one), or from now if it is None.
     """
     agent.queue = queue
     queue.agent = agent
     try:
-        queue.start_timer()
+        queue.start_timer(start)
+        agent.deadline = queue.deadline
         agent.get_action(game_state)
     except StopSearch:
         pass
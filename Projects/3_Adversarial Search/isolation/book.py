@@ -0,0 +1,155 @@
+""" Compact on-disk opening book for knight's Isolation
+
+An opening book file is a short header followed by fixed-size records sorted
+by key, so the file can be memory-mapped and binary-searched directly without
+being parsed or loaded into memory:
+
+    header:  magic (8 bytes) | version (uint16) | key size (uint16) |
+             board width (uint16) | board height (uint16) | count (uint32)
+    record:  canonical state key (big-endian, `key size` bytes) | cell (uint16)
+
+Each record stores the best move for the active player in the canonical
+orientation of the state (see isolation.symmetry) as the index of the cell
+the active player should move to, so one record covers all four symmetric
+orientations of the position. A book only contains positions for the board
+size recorded in its header.
+"""
+import mmap
+import struct
+
+from .isolation import board_tables, _WIDTH, _HEIGHT
+from .symmetry import canonical_key, loc_bits, transform_cell
+
+MAGIC = b"ISOBOOK\x00"
+VERSION = 2
+_HEADER = struct.Struct(">8sHHHHI")
+_CELL = struct.Struct(">H")
+
+
+def key_size(width=_WIDTH, height=_HEIGHT):
+    """ Return the number of bytes in the key of each record for a board size
+    (board bits + two locations + ply parity; see symmetry.canonical_key())
+    """
+    return (board_tables(width, height).size + 2 * loc_bits(width, height) + 1 + 7) // 8
+
+
+KEY_SIZE = key_size()
+
+
+def encode_entry(state, action):
+    """ Return the (key, cell) record for the best action in `state`, where
+    the key & cell are expressed in the canonical orientation of the state
+    """
+    key, symmetry = canonical_key(state)
+    loc = state.locs[state.player()]
+    cell = action if loc is None else loc + action
+    return key, transform_cell(cell, symmetry, state.width, state.height)
+
+
+def write_book(path, entries, width=_WIDTH, height=_HEIGHT):
+    """ Write an opening book file
+
+    Parameters
+    ----------
+    path : str
+        Name of the output file
+
+    entries : iterable
+        A collection of (key, cell) pairs produced by encode_entry(); later
+        entries replace earlier entries with the same key
+
+    width, height : int
+        The dimensions of the board that every entry was encoded from
+    """
+    records = dict(entries)
+    size = key_size(width, height)
+    with open(path, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, VERSION, size, width, height, len(records)))
+        for key in sorted(records):
+            f.write(key.to_bytes(size, "big"))
+            f.write(_CELL.pack(records[key]))
+
+
+class OpeningBook:
+    """ Read-only view of an opening book file
+
+    The file is memory-mapped when the book is opened, so opening a book
+    costs the same regardless of its size, and each lookup is a binary
+    search over the records in the mapped file. Looking up a state with
+    different board dimensions than the book always misses.
+
+    Examples
+    --------
+    >>> book = OpeningBook("data.book")
+    >>> action = book.get(Isolation())  # None if the state is not in the book
+    """
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, version, size, width, height, count = _HEADER.unpack_from(self._map, 0)
+            valid = (magic == MAGIC and version == VERSION and size == key_size(width, height) and
+                     len(self._map) == _HEADER.size + count * (size + _CELL.size))
+        except (struct.error, ValueError):  # truncated header or invalid board size
+            valid = False
+        if not valid:
+            self._map.close()
+            raise ValueError("{} is not a compatible opening book file".format(path))
+        self.width, self.height = width, height
+        self._count = count
+        self._key_size = size
+        self._record_size = size + _CELL.size
+
+    def __len__(self):
+        return self._count
+
+    def __contains__(self, state):
+        return self._find(state) is not None
+
+    def _find(self, state):
+        """ Return the canonical cell stored for `state` and the symmetry that
+        maps the state to its canonical orientation, or None if not found
+        """
+        if (state.width, state.height) != (self.width, self.height):
+            return None
+        key, symmetry = canonical_key(state)
+        target = key.to_bytes(self._key_size, "big")
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            start = _HEADER.size + mid * self._record_size
+            probe = self._map[start:start + self._key_size]
+            if probe < target:
+                lo = mid + 1
+            elif probe > target:
+                hi = mid
+            else:
+                return _CELL.unpack_from(self._map, start + self._key_size)[0], symmetry
+        return None
+
+    def get(self, state, default=None):
+        """ Return the book action for the active player in `state` """
+        found = self._find(state)
+        if found is None:
+            return default
+        cell = transform_cell(found[0], found[1], self.width, self.height)
+        loc = state.locs[state.player()]
+        if loc is None:
+            return cell
+        actions = state.tables.actions
+        return actions[actions.index(cell - loc)]
+
+    def close(self):
+        self._map.close()
+
+    # the memory map is shared read-only data; copies of agents reuse the same
+    # mapping and pickled books are re-opened from the file on load
+    def __deepcopy__(self, memo):
+        return self
+
+    def __getstate__(self):
+        return {"path": self.path}
+
+    def __setstate__(self, state):
+        self.__init__(state["path"])
@@ -0,0 +1,193 @@
+""" Exact endgame solver for partitioned knight's Isolation positions
+
+Once no cell is reachable by both knights the players can no longer
+interfere with each other, and the game splits into two independent
+longest-path problems: each player simply makes as many moves as possible
+inside their own region. The active player wins exactly when their longest
+knight tour is strictly longer than their opponent's (the active player is
+the first to run out of moves when the tours have equal length).
+
+All region computations are performed directly on the bitboard (see the
+isolation module readme for details of the bitboard layout), so every
+function that takes a bitboard also takes the board dimensions.
+"""
+from functools import lru_cache
+from typing import NamedTuple
+
+from .isolation import board_tables, _WIDTH, _HEIGHT
+
+# default number of longest-path search nodes (per player) before giving up
+MAX_NODES = 5000
+
+
+@lru_cache(maxsize=None)
+def _even_cells(width, height):
+    """ Return a bitboard of the cells with even (x + y) on a board
+
+    Knight moves always change the color of the square on a checkerboard, so
+    cells of each color alternate along any tour; these masks are used to
+    bound the length of the longest tour through a region.
+    """
+    cells = 0
+    for idx in range(board_tables(width, height).size):
+        x, y = idx % (width + 2), idx // (width + 2)
+        if x < width and y < height and not (x + y) % 2:
+            cells |= 1 << idx
+    return cells
+
+
+class _BudgetExceeded(Exception): pass  # Exception class used to halt search
+
+
+class Endgame(NamedTuple('Endgame', [('action', int), ('active_moves', int), ('inactive_moves', int)])):
+    """ Exact result for a partitioned game state
+
+    Attributes
+    ----------
+    action: Action
+        The first move of the longest tour for the active player
+
+    active_moves: int
+        The length of the longest tour available to the active player
+
+    inactive_moves: int
+        The length of the longest tour available to the inactive player
+    """
+    @property
+    def active_player_wins(self):
+        return self.active_moves > self.inactive_moves
+
+    def utility(self, player_id, state):
+        """ Return the game-theoretic utility of `state` for the specified player
+
+        See Also
+        --------
+            Isolation.utility()
+        """
+        player_id_is_active = (player_id == state.player())
+        return float("inf") if self.active_player_wins == player_id_is_active else float("-inf")
+
+
+def knight_moves(cells, width=_WIDTH, height=_HEIGHT):
+    """ Return a bitboard of the cells one knight move away from any of the
+    cells in the `cells` bitboard (including blocked cells and cells outside
+    the board; mask the result with an Isolation board to remove them)
+    """
+    out = 0
+    for offset in board_tables(width, height).actions:
+        out |= (cells << offset) if offset > 0 else (cells >> -offset)
+    return out
+
+
+def region(board, loc, width=_WIDTH, height=_HEIGHT):
+    """ Return a bitboard of all open cells reachable by a knight at `loc`
+    using any number of moves through open cells of `board`
+    """
+    reached = frontier = 1 << loc
+    while frontier:
+        frontier = knight_moves(frontier, width, height) & board & ~reached
+        reached |= frontier
+    return reached & ~(1 << loc)
+
+
+def is_partitioned(state):
+    """ Return True if neither player can reach any cell the other player
+    can reach (i.e., the players can no longer interact)
+    """
+    loc0, loc1 = state.locs
+    if loc0 is None or loc1 is None:
+        return False
+    size = (state.width, state.height)
+    return not (region(state.board, loc0, *size) & region(state.board, loc1, *size))
+
+
+def _popcount(cells):
+    return bin(cells).count("1")
+
+
+def longest_path(board, loc, max_nodes=MAX_NODES, width=_WIDTH, height=_HEIGHT):
+    """ Return the length of the longest knight tour starting from `loc` that
+    only visits open cells on the board, along with the first move of that
+    tour (None if there are no legal moves).
+
+    The search is a memoized depth first search keyed on the bitboard of the
+    region that remains reachable from the current location, so positions
+    that were reached along different paths but leave the same reachable
+    region are only solved once.
+
+    Raises
+    ------
+    _BudgetExceeded
+        If more than `max_nodes` positions need to be searched
+    """
+    memo = {}
+    nodes = [0]
+    actions = board_tables(width, height).actions
+    even_cells = _even_cells(width, height)
+
+    def bound(loc, cells):
+        # a tour alternates colors starting from the opposite color of `loc`
+        same = _popcount(cells & even_cells)
+        opposite = _popcount(cells) - same
+        if (1 << loc) & even_cells:
+            same, opposite = opposite, same
+        return min(2 * same, 2 * opposite + 1)
+
+    def search(loc, cells):
+        key = (loc, cells)
+        if key in memo:
+            return memo[key]
+        nodes[0] += 1
+        if nodes[0] > max_nodes:
+            raise _BudgetExceeded
+        best, limit = 0, bound(loc, cells)
+        for offset in actions:
+            target = loc + offset
+            if target < 0 or not (cells & (1 << target)):
+                continue
+            best = max(best, 1 + search(target, region(cells, target, width, height)))
+            if best >= limit:
+                break
+        memo[key] = best
+        return best
+
+    best_length, best_action = 0, None
+    cells = region(board, loc, width, height)
+    for action in actions:
+        target = loc + action
+        if target < 0 or not (board & (1 << target)):
+            continue
+        length = 1 + search(target, region(cells, target, width, height))
+        if length > best_length:
+            best_length, best_action = length, action
+    return best_length, best_action
+
+
+def solve(state, max_nodes=MAX_NODES):
+    """ Return the exact result of a partitioned game state
+
+    Parameters
+    ----------
+    state : Isolation
+        A non-terminal game state
+
+    max_nodes : int
+        The maximum number of positions to search for each player's longest
+        tour before giving up
+
+    Returns
+    -------
+    Endgame or None
+        An Endgame instance if the players are partitioned and both longest
+        tours were solved within the node budget, otherwise None
+    """
+    if state.terminal_test() or not is_partitioned(state):
+        return None
+    active = state.player()
+    size = (state.width, state.height)
+    try:
+        active_moves, action = longest_path(state.board, state.locs[active], max_nodes, *size)
+        inactive_moves, _ = longest_path(state.board, state.locs[1 - active], max_nodes, *size)
+    except _BudgetExceeded:
+        return None
+    return Endgame(action, active_moves, inactive_moves)
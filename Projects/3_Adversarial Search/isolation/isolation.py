@@ -3,10 +3,11 @@
 #                          DO NOT MODIFY THIS FILE                            #
 ###############################################################################
 from enum import IntEnum
+from functools import lru_cache
 from typing import NamedTuple
 
 
-# board array dimensions and bitboard size
+# default board array dimensions and bitboard size
 _WIDTH = 11
 _HEIGHT = 9
 _SIZE = (_WIDTH + 2) * _HEIGHT - 2
@@ -34,7 +35,62 @@ class Action(IntEnum):
 _ACTIONSET = set(Action)  # used for efficient membership testing
 
 
-class Isolation(NamedTuple('Isolation', [('board', int), ('ply_count', int), ('locs', int)])):
+class BoardTables(NamedTuple('BoardTables', [('width', int), ('height', int), ('size', int),
+                                             ('blank_board', int), ('directions', tuple),
+                                             ('actions', tuple), ('actionset', frozenset),
+                                             ('moves', tuple)])):
+    """ Precomputed constants for one board size (see board_tables())
+
+    Attributes
+    ----------
+    width, height: int
+        The dimensions of the board (in cells)
+
+    size: int
+        The length of the bitboard (in bits)
+
+    blank_board: int
+        The bitboard of an empty board
+
+    directions: tuple
+        The bitboard offsets of the cardinal directions (S, N, W, E)
+
+    actions: tuple
+        The bitboard offset of each knight move, in the same order as the
+        Action enum; these ARE the Action members on the default board size,
+        and plain ints on every other board size
+
+    actionset: frozenset
+        The set of actions (used for efficient membership testing)
+
+    moves: tuple
+        The (action, destination) pairs for every knight move from each
+        cell that stays within the bitboard (destinations in the padding
+        columns are always blocked)
+    """
+
+
+@lru_cache(maxsize=None)
+def board_tables(width=_WIDTH, height=_HEIGHT):
+    """ Return the BoardTables for a board size; the tables are computed once
+    per size and shared by every state with the same dimensions
+    """
+    if width < 1 or height < 1:
+        raise ValueError("Invalid board size: {}x{}".format(width, height))
+    s, n, w, e = -width - 2, width + 2, 1, -1
+    if (width, height) == (_WIDTH, _HEIGHT):
+        actions = tuple(Action)
+    else:
+        actions = (n+n+e, e+n+e, e+s+e, s+s+e, s+s+w, w+s+w, w+n+w, n+n+w)
+    size = (width + 2) * height - 2
+    blank_board = 0
+    for _ in range(height): blank_board = ((blank_board << (width + 2)) | ((1 << width) - 1))
+    moves = tuple(tuple((a, loc + a) for a in actions if 0 <= loc + a < size) for loc in range(size))
+    return BoardTables(width, height, size, blank_board, (s, n, w, e), actions, frozenset(actions), moves)
+
+
+class Isolation(NamedTuple('Isolation', [('board', int), ('ply_count', int), ('locs', int),
+                                         ('width', int), ('height', int)])):
     """ Bitboard implementation of knight's Isolation game state
 
     Subclassing NamedTuple makes the states (effectively) immutable
@@ -55,9 +111,26 @@ class Isolation(NamedTuple('Isolation', [('board', int), ('ply_count', int), ('l
         A pair of values defining the location of each player. Default for
         each player is None while the player has not yet placed their piece
         on the board; otherwise an integer.
+
+    width: int
+        The number of columns on the board (default 11)
+
+    height: int
+        The number of rows on the board (default 9)
+
+    Examples
+    --------
+    >>> state = Isolation(width=5, height=5)  # an empty 5x5 board
     """
-    def __new__(cls, board=_BLANK_BOARD, ply_count=0, locs=(None, None)):
-        return super(Isolation, cls).__new__(cls, board, ply_count, locs)
+    def __new__(cls, board=None, ply_count=0, locs=(None, None), width=_WIDTH, height=_HEIGHT):
+        if board is None:
+            board = board_tables(width, height).blank_board
+        return super(Isolation, cls).__new__(cls, board, ply_count, locs, width, height)
+
+    @property
+    def tables(self):
+        """ The precomputed BoardTables for the size of this board """
+        return board_tables(self.width, self.height)
 
     def actions(self):
         """ Return a list of the legal actions in the current state
@@ -74,7 +147,7 @@ class Isolation(NamedTuple('Isolation', [('board', int), ('ply_count', int), ('l
         loc = self.locs[self.player()]
         if loc is None:
             return self.liberties(loc)
-        return [a for a in Action if (a + loc) >= 0 and (self.board & (1 << (a + loc)))]
+        return [a for a in self.tables.actions if (a + loc) >= 0 and (self.board & (1 << (a + loc)))]
 
     def player(self):
         """ Return the id (zero for first player, one for second player) of player
@@ -100,8 +173,8 @@ class Isolation(NamedTuple('Isolation', [('board', int), ('ply_count', int), ('l
             A new state object with the input move applied.
         """
         player_location = self.locs[self.player()]
-        assert player_location is None or action in _ACTIONSET, \
-            "{} is not a valid action from the set {}".format(action, list(Action))
+        assert player_location is None or action in self.tables.actionset, \
+            "{} is not a valid action from the set {}".format(action, list(self.tables.actions))
         if player_location is None:
             player_location = 0
         player_location = int(action) + player_location
@@ -110,7 +183,8 @@ class Isolation(NamedTuple('Isolation', [('board', int), ('ply_count', int), ('l
         # update the board to block the ending cell from the new move
         board = self.board ^ (1 << player_location)
         locs = (self.locs[0], player_location) if self.player() else (player_location, self.locs[1])
-        return Isolation(board=board, ply_count=self.ply_count + 1, locs=locs)
+        return Isolation(board=board, ply_count=self.ply_count + 1, locs=locs,
+                         width=self.width, height=self.height)
 
     def terminal_test(self):
         """ Return True if either player has no legal moves, otherwise False
@@ -165,7 +239,8 @@ class Isolation(NamedTuple('Isolation', [('board', int), ('ply_count', int), ('l
             A list containing the position of open liberties in the
             neighborhood of the starting position
         """
-        cells = range(_SIZE) if loc is None else (loc + a for a in Action)
+        tables = self.tables
+        cells = range(tables.size) if loc is None else (loc + a for a in tables.actions)
         return [c for c in cells if c >= 0 and self.board & (1 << c)]
 
     def _has_liberties(self, player_id):
@@ -209,20 +284,22 @@ class DebugState(Isolation):
     player_symbols=['1', '2']
     
     @staticmethod
-    def from_state(gamestate): return DebugState(gamestate.board, gamestate.ply_count, gamestate.locs)
+    def from_state(gamestate):
+        return DebugState(gamestate.board, gamestate.ply_count, gamestate.locs,
+                          gamestate.width, gamestate.height)
 
     @property
     def bitboard_string(self): return "{:b}".format(self.board)
 
     @classmethod
-    def ind2xy(cls, ind):
+    def ind2xy(cls, ind, width=_WIDTH):
         """ Convert from board index value to xy coordinates
 
         The coordinate frame is 0 in the bottom right corner, with x increasing
         along the columns progressing towards the left, and y increasing along
         the rows progressing towards teh top.
         """
-        return (ind % (_WIDTH + 2), ind // (_WIDTH + 2))
+        return (ind % (width + 2), ind // (width + 2))
 
     def __str__(self):
         """ Generate a string representation of the current game state, marking
@@ -234,15 +311,15 @@ class DebugState(Isolation):
         OPEN = " "
         CLOSED = "X"
         cell = "| {} "
-        rowsep = "+ - " * _WIDTH + "+"
+        rowsep = "+ - " * self.width + "+"
         out = StringIO()
         out.write(rowsep + os.linesep)
 
         board = self.board << 2
-        for loc in range(_SIZE + 2):
-            if loc > 2 and loc % (_WIDTH + 2) == 0:
+        for loc in range(self.tables.size + 2):
+            if loc > 2 and loc % (self.width + 2) == 0:
                 out.write("|" + os.linesep + rowsep + os.linesep)
-            if loc % (_WIDTH + 2) == 0 or loc % (_WIDTH + 2) == 1:
+            if loc % (self.width + 2) == 0 or loc % (self.width + 2) == 1:
                 continue
             sym = OPEN if (board & (1 << loc)) else CLOSED
             if loc - 2 == self.locs[0]: sym = self.player_symbols[0]
@@ -0,0 +1,300 @@
+""" Compact binary game records for knight's Isolation matches
+
+A record file is a sequence of self-delimiting records that can be appended
+to by any number of processes at once. Each record is written to a file
+opened with O_APPEND, normally with a single write() call. Concurrent
+writers only avoid interleaving their records if they use lock=True (an
+exclusive fcntl lock), or if every os.write() call writes the whole record;
+the rest of a short write is written with another call, which can land
+after another writer's record and make GameRecords reject the file:
+
+    record:  magic (4 bytes) | payload length (uint32) | payload
+
+    payload: version (uint8) | width (uint16) | height (uint16) |
+             match id (int32) | status (uint8) | winner (uint8) |
+             initial ply count (uint16) | initial locations (2 x int16) |
+             initial board (little-endian bitboard bytes) |
+             action count (uint16) | actions (1 byte each) |
+             agent names (2 x uint8 length + utf-8) |
+             metrics length (uint32) | metrics (JSON list, optional)
+
+Each action is stored in one byte: the index of the knight move in the
+action list of the board size, or the index of the cell on the board
+(without the padding columns of the bitboard) for the moves that place a
+knight on an empty board. The winner is the index of the winning agent
+(0 or 1) in the match.
+
+GameRecords memory-maps a file and indexes the records without decoding
+them, so any game can be decoded & replayed on demand.
+
+Examples
+--------
+>>> with RecordWriter("games.rec") as writer:
+...     writer.write(game_result)  # an isolation.GameResult
+>>> records = GameRecords("games.rec")
+>>> records[0].agents, records[0].winner
+(('Random Agent', 'Custom Agent'), 1)
+>>> replay(records[0], ply=10)  # the state after the first 10 actions
+"""
+import json
+import mmap
+import os
+import struct
+
+from collections import namedtuple
+
+try:
+    import fcntl
+except ImportError:  # not available on Windows
+    fcntl = None
+
+from . import Status
+from .isolation import Isolation, board_tables
+
+MAGIC = b"IREC"
+VERSION = 1
+MAX_CELLS = 256  # every placement action must fit in one byte
+
+_PREFIX = struct.Struct("<4sI")
+_HEADER = struct.Struct("<BHHiBBHhh")
+_COUNT = struct.Struct("<H")
+_METRICS = struct.Struct("<I")
+
+Record = namedtuple("Record", "agents initial_state actions status winner match_id metrics")
+Record.__doc__ = """ A decoded game record
+
+Attributes
+----------
+agents : tuple
+    The names of the two agents in the match
+
+initial_state : Isolation
+    The state the game started from
+
+actions : list
+    The actions applied to the initial state (in the same form as the
+    history of an isolation.GameResult)
+
+status : Status
+    The reason the game ended
+
+winner : int
+    The index (0 or 1) of the winning agent
+
+match_id : int
+    The id of the match
+
+metrics : list or None
+    The metrics reported by the active agent for each action (None if the
+    metrics were not recorded)
+"""
+
+
+def _num_bytes(width, height):
+    return (board_tables(width, height).size + 7) // 8
+
+
+def encode_record(result, metrics=True):
+    """ Return the bytes of the record for an isolation.GameResult """
+    state = result.initial_state
+    width, height = state.width, state.height
+    if width * height > MAX_CELLS:
+        raise ValueError("Game records are limited to boards with at most {} cells".format(MAX_CELLS))
+    actions = board_tables(width, height).actions
+    codes = bytearray()
+    for action in result.history:
+        loc = state.locs[state.player()]
+        if loc is None:
+            codes.append(action % (width + 2) + (action // (width + 2)) * width)
+        else:
+            codes.append(actions.index(action))
+        state = state.result(action)
+    # the agents are often equal (e.g., self-play), so the winner is found
+    # from the final state the same way _play_game() chooses it
+    active = state.player()
+    if result.status == Status.GAME_OVER and state.utility(active) > 0:
+        winner = active
+    else:
+        winner = 1 - active
+
+    initial = result.initial_state
+    locs = [-1 if loc is None else loc for loc in initial.locs]
+    payload = [
+        _HEADER.pack(VERSION, width, height, result.match_id, result.status.value, winner,
+                     initial.ply_count, *locs),
+        initial.board.to_bytes(_num_bytes(width, height), "little"),
+        _COUNT.pack(len(codes)),
+        bytes(codes),
+    ]
+    for agent in result.agents:
+        name = str(agent.name).encode("utf-8")[:255]
+        payload.extend([bytes([len(name)]), name])
+    data = json.dumps(result.metrics, separators=(",", ":")).encode("utf-8") if metrics else b""
+    payload.extend([_METRICS.pack(len(data)), data])
+    payload = b"".join(payload)
+    return _PREFIX.pack(MAGIC, len(payload)) + payload
+
+
+def decode_record(data, offset=0):
+    """ Decode the record that starts at `offset` in a bytes-like object """
+    magic, length = _PREFIX.unpack_from(data, offset)
+    if magic != MAGIC:
+        raise ValueError("No game record at offset {}".format(offset))
+    pos = offset + _PREFIX.size
+    version, width, height, match_id, status, winner, ply_count, loc0, loc1 = \
+        _HEADER.unpack_from(data, pos)
+    if version != VERSION:
+        raise ValueError("Unsupported game record version {}".format(version))
+    pos += _HEADER.size
+    num_bytes = _num_bytes(width, height)
+    board = int.from_bytes(data[pos:pos + num_bytes], "little")
+    pos += num_bytes
+    locs = tuple(None if loc < 0 else loc for loc in (loc0, loc1))
+    state = Isolation(board=board, ply_count=ply_count, locs=locs, width=width, height=height)
+
+    count, = _COUNT.unpack_from(data, pos)
+    pos += _COUNT.size
+    codes = bytes(data[pos:pos + count])
+    pos += count
+    agents = []
+    for _ in range(2):
+        size = data[pos]
+        agents.append(bytes(data[pos + 1:pos + 1 + size]).decode("utf-8"))
+        pos += 1 + size
+    size, = _METRICS.unpack_from(data, pos)
+    pos += _METRICS.size
+    metrics = json.loads(bytes(data[pos:pos + size]).decode("utf-8")) if size else None
+
+    # placement actions are stored as compact cell indices and knight moves
+    # as indices into the action list; which one applies depends on whether
+    # the active player has been placed yet
+    actions = []
+    table = board_tables(width, height).actions
+    locs = list(locs)
+    for ply, code in enumerate(codes):
+        player = (ply_count + ply) % 2
+        if locs[player] is None:
+            action = code % width + (code // width) * (width + 2)
+            locs[player] = action
+        else:
+            action = table[code]
+            locs[player] += action
+        actions.append(action)
+    return Record(tuple(agents), state, actions, Status(status), winner, match_id, metrics)
+
+
+def replay(record, ply=None):
+    """ Return the state after the first `ply` actions of a record (the final
+    state by default), rebuilt with Isolation.result()
+    """
+    state = record.initial_state
+    for action in record.actions[:ply]:
+        state = state.result(action)
+    return state
+
+
+def positions(record):
+    """ Yield every state of a game, from the initial state to the final state """
+    state = record.initial_state
+    yield state
+    for action in record.actions:
+        state = state.result(action)
+        yield state
+
+
+class RecordWriter:
+    """ Append game records to a file
+
+    Every record is appended to a file descriptor opened with O_APPEND, and
+    os.write() is called again for the rest of the record after a short
+    write. Records from processes sharing the file are only guaranteed not
+    to interleave with `lock` set, which holds an exclusive fcntl lock on
+    the file while writing (also needed on file systems where appends are
+    not atomic, like NFS); the lock is skipped where fcntl is not available.
+
+    Parameters
+    ----------
+    path : str
+        Name of the record file (created if it doesn't exist)
+
+    metrics : bool, optional
+        Store the per-move metrics of each game
+
+    lock : bool, optional
+        Lock the file while appending each record
+    """
+    def __init__(self, path, metrics=True, lock=False):
+        self.path = path
+        self.metrics = metrics
+        self.lock = lock and fcntl is not None
+        self._fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+
+    def write(self, result):
+        data = encode_record(result, self.metrics)
+        if self.lock:
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+        try:
+            view = memoryview(data)
+            while view:  # os.write() can write fewer bytes than requested
+                written = os.write(self._fd, view)
+                if not written:
+                    raise OSError("Could not append the record to {}".format(self.path))
+                view = view[written:]
+        finally:
+            if self.lock:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class GameRecords:
+    """ Read-only, memory-mapped view of a record file
+
+    The file is scanned once to find the offset of every record; records
+    are decoded when they are accessed. An incomplete record at the end of
+    the file (e.g., from a writer that is still running) is ignored.
+    """
+    def __init__(self, path):
+        self.path = path
+        self._map = None
+        self._offsets = []
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size:
+                self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._map is None:
+            return
+        offset, end = 0, len(self._map)
+        while offset + _PREFIX.size <= end:
+            magic, length = _PREFIX.unpack_from(self._map, offset)
+            if magic != MAGIC:
+                self.close()
+                raise ValueError("{} is not a game record file (bad record at offset {})".format(
+                    path, offset))
+            if offset + _PREFIX.size + length > end:
+                break
+            self._offsets.append(offset)
+            offset += _PREFIX.size + length
+
+    def __len__(self):
+        return len(self._offsets)
+
+    def __getitem__(self, idx):
+        return decode_record(self._map, self._offsets[idx])
+
+    def __iter__(self):
+        for offset in self._offsets:
+            yield decode_record(self._map, offset)
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
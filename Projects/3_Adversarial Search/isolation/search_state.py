@@ -0,0 +1,130 @@
+""" Lightweight knight's Isolation game state for use inside search
+
+Agents spend most of their search time creating and inspecting game states,
+and Isolation.result() validates every action and builds a NamedTuple. A
+SearchState stores the same fields in a plain class with __slots__, and its
+apply() method trusts that the action is legal, which makes expanding a
+node roughly three times faster.
+"""
+from .isolation import Isolation, board_tables, _WIDTH, _HEIGHT
+
+
+class SearchState:
+    """ Lightweight knight's Isolation game state for use inside search
+
+    SearchState mirrors the read-only interface of Isolation (actions(),
+    player(), terminal_test(), utility(), liberties(), and the board,
+    ply_count & locs attributes), but it is a plain class with __slots__
+    rather than a NamedTuple, and new states are produced by apply(), which
+    does NOT validate the action. Agents should convert to a SearchState when
+    search starts and only hand actions (never states) back to the caller.
+
+    Instances are hashable so that they can be used as dictionary keys, so
+    the attributes must never be changed after a state is created (apply()
+    always returns a new instance).
+
+    Examples
+    --------
+    >>> state = SearchState.from_state(Isolation())
+    >>> child = state.apply(state.actions()[0])
+    >>> isinstance(child.to_state(), Isolation)
+    True
+    """
+    __slots__ = ('board', 'ply_count', 'locs', 'tables')
+
+    def __init__(self, board=None, ply_count=0, locs=(None, None), width=_WIDTH, height=_HEIGHT):
+        self.tables = board_tables(width, height)
+        self.board = self.tables.blank_board if board is None else board
+        self.ply_count = ply_count
+        self.locs = locs
+
+    @classmethod
+    def from_state(cls, state):
+        """ Create a SearchState from an Isolation (or SearchState) instance """
+        return cls(state.board, state.ply_count, state.locs, state.width, state.height)
+
+    def to_state(self):
+        """ Return the equivalent Isolation instance """
+        return Isolation(board=self.board, ply_count=self.ply_count, locs=self.locs,
+                         width=self.width, height=self.height)
+
+    @property
+    def width(self): return self.tables.width
+
+    @property
+    def height(self): return self.tables.height
+
+    def __eq__(self, other):
+        return (isinstance(other, SearchState) and self.board == other.board and
+                self.ply_count == other.ply_count and self.locs == other.locs and
+                self.width == other.width and self.height == other.height)
+
+    def __hash__(self):
+        return hash((self.board, self.ply_count, self.locs))
+
+    def __repr__(self):
+        return "SearchState(board={}, ply_count={}, locs={}, width={}, height={})".format(
+            self.board, self.ply_count, self.locs, self.width, self.height)
+
+    def actions(self):
+        """ Return a list of the legal actions in the current state
+
+        See Also
+        -------
+            Isolation.actions()
+        """
+        loc = self.locs[self.ply_count & 1]
+        if loc is None:
+            return self.liberties(loc)
+        board = self.board
+        return [a for a, c in self.tables.moves[loc] if board & (1 << c)]
+
+    def player(self):
+        """ Return the id of the active player (see Isolation.player()) """
+        return self.ply_count & 1
+
+    def apply(self, action):
+        """ Return the state that results from applying `action` WITHOUT
+        checking that the action is legal in the current state
+
+        See Also
+        -------
+            Isolation.result()
+        """
+        loc0, loc1 = self.locs
+        state = SearchState.__new__(SearchState)
+        if self.ply_count & 1:
+            loc1 = action if loc1 is None else loc1 + action
+            state.board = self.board ^ (1 << loc1)
+        else:
+            loc0 = action if loc0 is None else loc0 + action
+            state.board = self.board ^ (1 << loc0)
+        state.ply_count = self.ply_count + 1
+        state.locs = (loc0, loc1)
+        state.tables = self.tables
+        return state
+
+    def terminal_test(self):
+        """ Return True if either player has no legal moves, otherwise False """
+        return not (self._has_liberties(0) and self._has_liberties(1))
+
+    def utility(self, player_id):
+        """ Returns the utility of the current game state from the perspective
+        of the specified player (see Isolation.utility())
+        """
+        if not self.terminal_test(): return 0
+        player_id_is_active = (player_id == self.player())
+        active_has_liberties = self._has_liberties(self.player())
+        active_player_wins = (active_has_liberties == player_id_is_active)
+        return float("inf") if active_player_wins else float("-inf")
+
+    def liberties(self, loc):
+        """ Return a list of open cells in the neighborhood of `loc` (see Isolation.liberties()) """
+        board = self.board
+        if loc is None:
+            return [c for c in range(self.tables.size) if board & (1 << c)]
+        return [c for _, c in self.tables.moves[loc] if board & (1 << c)]
+
+    def _has_liberties(self, player_id):
+        # same semantics as Isolation._has_liberties()
+        return any(self.liberties(self.locs[player_id]))
@@ -0,0 +1,165 @@
+""" Symmetry-aware canonical keys for knight's Isolation positions
+
+The rectangular board is symmetric under a horizontal flip, a vertical flip,
+and a 180 degree rotation (both flips), and the set of knight moves is
+unchanged by each of them, so all four orientations of a position have the
+same game-theoretic value. Mapping every orientation to a single canonical
+key lets transposition tables and opening books share entries across them.
+
+Each symmetry is a permutation of the cells of the bitboard. Rather than
+moving one bit at a time, the permutation is precomputed as a table for
+each byte of the bitboard mapping the byte value to the transformed bits,
+so transforming a board takes one table lookup per byte.
+
+All four symmetries are their own inverse, so the same functions are used
+to map positions & actions into the canonical orientation and back out.
+
+The permutation tables are built once for each board size the first time
+they are needed; every function takes the board dimensions as optional
+arguments, defaulting to the standard 11x9 board.
+"""
+from functools import lru_cache
+
+from .isolation import Isolation, board_tables, _WIDTH, _HEIGHT
+
+IDENTITY, FLIP_HORIZONTAL, FLIP_VERTICAL, ROTATE_180 = range(4)
+SYMMETRIES = (IDENTITY, FLIP_HORIZONTAL, FLIP_VERTICAL, ROTATE_180)
+
+
+def _num_bytes(width, height):
+    return (board_tables(width, height).size + 7) // 8
+
+
+def _make_permutation(flip_x, flip_y, width, height):
+    """ Return a list mapping each bitboard index to its transformed index
+    (cells in the padding columns are mapped to None)
+    """
+    perm = []
+    for idx in range(_num_bytes(width, height) * 8):
+        x, y = idx % (width + 2), idx // (width + 2)
+        if x >= width or y >= height:
+            perm.append(None)
+            continue
+        if flip_x: x = width - 1 - x
+        if flip_y: y = height - 1 - y
+        perm.append(x + y * (width + 2))
+    return perm
+
+
+def _make_byte_tables(perm):
+    """ Build one 256-entry lookup table per byte of the bitboard """
+    tables = []
+    for byte in range(len(perm) // 8):
+        table = [0] * 256
+        for value in range(256):
+            bits = 0
+            for j in range(8):
+                target = perm[8 * byte + j]
+                if value & (1 << j) and target is not None:
+                    bits |= 1 << target
+            table[value] = bits
+        tables.append(tuple(table))
+    return tuple(tables)
+
+
+@lru_cache(maxsize=None)
+def _permutations(width, height):
+    """ Return the cell permutation of each symmetry for a board size """
+    return tuple(_make_permutation(flip_x, flip_y, width, height)
+                 for flip_x, flip_y in ((False, False), (True, False), (False, True), (True, True)))
+
+
+@lru_cache(maxsize=None)
+def _byte_tables(width, height):
+    """ Return the byte lookup tables of each symmetry for a board size """
+    return tuple(_make_byte_tables(p) for p in _permutations(width, height))
+
+
+def transform_board(board, symmetry, width=_WIDTH, height=_HEIGHT):
+    """ Return the bitboard produced by applying a symmetry to `board` """
+    if symmetry == IDENTITY:
+        return board
+    tables = _byte_tables(width, height)[symmetry]
+    out = 0
+    for table, value in zip(tables, board.to_bytes(len(tables), 'little')):
+        out |= table[value]
+    return out
+
+
+def transform_cell(cell, symmetry, width=_WIDTH, height=_HEIGHT):
+    """ Return the index of `cell` after applying a symmetry (None is unchanged) """
+    return cell if cell is None else _permutations(width, height)[symmetry][cell]
+
+
+def transform_action(action, loc, symmetry, width=_WIDTH, height=_HEIGHT):
+    """ Return the action equivalent to `action` after applying a symmetry
+
+    Parameters
+    ----------
+    action : int
+        An action available to the active player (a cell index if the
+        active player has not been placed on the board yet)
+
+    loc : int or None
+        The (untransformed) location of the active player
+
+    symmetry : int
+        One of the values in SYMMETRIES
+
+    width, height : int
+        The dimensions of the board
+    """
+    if loc is None:
+        return transform_cell(action, symmetry, width, height)
+    perm = _permutations(width, height)[symmetry]
+    actions = board_tables(width, height).actions
+    return actions[actions.index(perm[loc + action] - perm[loc])]
+
+
+def transform_state(state, symmetry):
+    """ Return a copy of `state` with a symmetry applied to the board & locations """
+    size = (state.width, state.height)
+    return Isolation(board=transform_board(state.board, symmetry, *size),
+                     ply_count=state.ply_count,
+                     locs=tuple(transform_cell(l, symmetry, *size) for l in state.locs),
+                     width=state.width, height=state.height)
+
+
+def loc_bits(width=_WIDTH, height=_HEIGHT):
+    """ Return the number of bits used to store each location in a key """
+    return max(8, board_tables(width, height).size.bit_length())
+
+
+def _key(board, ply_count, loc0, loc1, bits=8):
+    loc0 = 0 if loc0 is None else loc0 + 1
+    loc1 = 0 if loc1 is None else loc1 + 1
+    return (((board << bits | loc0) << bits | loc1) << 1) | (ply_count & 1)
+
+
+def canonical_key(state):
+    """ Return a canonical integer key shared by all four orientations of a
+    state, and the symmetry that maps the state to the canonical orientation
+
+    The key encodes the board, both player locations, and the parity of the
+    ply count (i.e., the active player); two states on the same size of
+    board have the same key if and only if one is a symmetric image of the
+    other.
+
+    Returns
+    -------
+    (int, int)
+        The canonical key and the symmetry (one of SYMMETRIES) that transforms
+        the state into the orientation encoded by the key
+    """
+    board, ply_count, (loc0, loc1) = state.board, state.ply_count, state.locs
+    width, height = state.width, state.height
+    bits = loc_bits(width, height)
+    best_key, best_symmetry = _key(board, ply_count, loc0, loc1, bits), IDENTITY
+    for symmetry in SYMMETRIES[1:]:
+        perm = _permutations(width, height)[symmetry]
+        key = _key(transform_board(board, symmetry, width, height), ply_count,
+                   None if loc0 is None else perm[loc0],
+                   None if loc1 is None else perm[loc1], bits)
+        if key < best_key:
+            best_key, best_symmetry = key, symmetry
+    return best_key, best_symmetry
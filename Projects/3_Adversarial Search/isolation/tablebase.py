@@ -0,0 +1,229 @@
+""" Exact solutions of knight's Isolation on small boards
+
+solve() runs a memoized exhaustive search from the empty board and returns
+the game-theoretic value of every reachable position, and the values can be
+saved to a memory-mapped hash table (see write_tablebase() & Tablebase) so
+agents and analysis tools can look up the exact value of any position.
+
+Values are stored from the perspective of the active player as a signed
+byte: a positive value v means the active player wins and the game lasts
+v - 1 more plies with best play (the winner ends the game as quickly as
+possible and the loser delays the end as long as possible); a negative
+value -v means the active player loses after v - 1 more plies.
+
+Positions are keyed by a compact 64-bit key: the open cells of the board
+without the padding columns of the bitboard (one bit per cell), followed
+by the cell index of each player (6 bits each). The ply count is not
+stored because it always equals the number of blocked cells.
+
+The keys are NOT reduced by the symmetries of the board (see
+isolation.symmetry), because no symmetry preserves the values under the
+engine's rules: Isolation._has_liberties() treats a knight whose only move
+is to cell 0 as having no moves, and cell 0 has no mirror image on the
+board, so mirrored positions can have different terminal status & values.
+Every reachable position is stored under its own key instead.
+
+Table file layout (all fields little-endian):
+
+    header:  magic (8 bytes) | version (uint16) | width (uint16) | height (uint16) |
+             reserved (uint16) | capacity (uint64) | count (uint64)
+    keys:    capacity x uint64 (0 marks an empty slot)
+    values:  capacity x int8
+
+Lookups hash the key to a slot and probe linearly until the key or an
+empty slot is found; the capacity is always a power of two.
+"""
+import mmap
+import struct
+import sys
+
+from array import array
+from functools import lru_cache
+
+from .search_state import SearchState
+from .symmetry import _make_byte_tables, _permutations
+
+MAGIC = b"ISOTBL\x00\x00"
+VERSION = 2  # version 1 keys were minimized over the board symmetries
+MAX_CELLS = 52  # 52 board bits + two 6-bit locations fill a 64-bit key
+MAX_LOAD = 0.7  # maximum fraction of occupied slots in the hash table
+
+_HEADER = struct.Struct("<8sHHHHQQ")
+_KEY = struct.Struct("<Q")
+_VALUE = struct.Struct("<b")
+_NO_LOC = 63  # location code of a player that has not been placed yet
+_MASK64 = (1 << 64) - 1
+_GOLDEN = 0x9E3779B97F4A7C15  # Fibonacci hashing multiplier
+
+
+@lru_cache(maxsize=None)
+def _key_tables(width, height):
+    """ Return the byte tables & cell map that map a bitboard directly to
+    the compact board bits & cell indices of a position
+    """
+    if width * height > MAX_CELLS:
+        raise ValueError("Tablebases are limited to boards with at most {} cells".format(MAX_CELLS))
+    compact = {x + y * (width + 2): x + y * width for x in range(width) for y in range(height)}
+    identity = _permutations(width, height)[0]
+    cell_map = [None if p is None else compact[p] for p in identity]
+    return _make_byte_tables(cell_map), cell_map
+
+
+def compact_key(state):
+    """ Return the 64-bit key of a state (see module docstring) """
+    board, (loc0, loc1) = state.board, state.locs
+    byte_tables, cell_map = _key_tables(state.width, state.height)
+    bits = 0
+    for table, value in zip(byte_tables, board.to_bytes(len(byte_tables), "little")):
+        bits |= table[value]
+    return (((bits << 6) | (_NO_LOC if loc0 is None else cell_map[loc0])) << 6) | \
+        (_NO_LOC if loc1 is None else cell_map[loc1])
+
+
+def child_value(value):
+    """ Convert the value of a child state into the value of the parent move
+    from the perspective of the player making the move
+    """
+    return -value + 1 if value < 0 else -value - 1
+
+
+def better(a, b):
+    """ Return True if value `a` is better than `b` for the active player
+    (win quickly, or lose slowly)
+    """
+    if (a > 0) != (b > 0):
+        return a > 0
+    return a < b
+
+
+def solve(width, height):
+    """ Return a dict mapping the compact key of every position reachable
+    from the empty board to its value
+
+    The memo table grows by a factor of ~15-25 for every extra row or
+    column on small boards: 4x4 has ~100,000 positions (under a second), 4x5
+    has ~1.4 million (10-20 seconds), and 5x5 is out of reach for the pure
+    Python solver.
+    """
+    values = {}
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), 4 * width * height + 100))
+
+    def search(state):
+        key = compact_key(state)
+        value = values.get(key)
+        if value is not None:
+            return value
+        if state.terminal_test():
+            value = 1 if state.utility(state.player()) > 0 else -1
+        else:
+            for action in state.actions():
+                candidate = child_value(search(state.apply(action)))
+                if value is None or better(candidate, value):
+                    value = candidate
+        values[key] = value
+        return value
+
+    search(SearchState(width=width, height=height))
+    return values
+
+
+def _slot(key, bits):
+    return ((key * _GOLDEN) & _MASK64) >> (64 - bits)
+
+
+def write_tablebase(path, width, height, values):
+    """ Write the values returned by solve() to a tablebase file """
+    bits = 1
+    while (1 << bits) * MAX_LOAD < len(values):
+        bits += 1
+    capacity = 1 << bits
+    keys, slots = array("Q", bytes(8 * capacity)), array("b", bytes(capacity))
+    for key, value in values.items():
+        idx = _slot(key, bits)
+        while keys[idx]:
+            idx = (idx + 1) & (capacity - 1)
+        keys[idx], slots[idx] = key, value
+    if sys.byteorder != "little":
+        keys.byteswap()
+    with open(path, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, VERSION, width, height, 0, capacity, len(values)))
+        keys.tofile(f)
+        slots.tofile(f)
+
+
+class Tablebase:
+    """ Read-only view of a tablebase file
+
+    Examples
+    --------
+    >>> table = Tablebase("5x5.tbl")
+    >>> table.get(Isolation(width=5, height=5))  # value of the empty board
+    >>> table.best_actions(state)  # every move that achieves the value of state
+    """
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, version, width, height, _, capacity, count = _HEADER.unpack_from(self._map, 0)
+            valid = (magic == MAGIC and version == VERSION and capacity and
+                     not capacity & (capacity - 1) and
+                     len(self._map) == _HEADER.size + 9 * capacity)
+        except struct.error:
+            valid = False
+        if not valid:
+            self._map.close()
+            raise ValueError("{} is not a compatible tablebase file".format(path))
+        self.width, self.height = width, height
+        self._capacity, self._count = capacity, count
+        self._bits = capacity.bit_length() - 1
+        self._values_offset = _HEADER.size + 8 * capacity
+
+    def __len__(self):
+        return self._count
+
+    def __contains__(self, state):
+        return self.get(state) is not None
+
+    def get(self, state, default=None):
+        """ Return the value of `state` for the active player (see module docstring) """
+        if (state.width, state.height) != (self.width, self.height):
+            return default
+        key = compact_key(state)
+        idx = _slot(key, self._bits)
+        while True:
+            probe = _KEY.unpack_from(self._map, _HEADER.size + 8 * idx)[0]
+            if probe == key:
+                return _VALUE.unpack_from(self._map, self._values_offset + idx)[0]
+            if not probe:
+                return default
+            idx = (idx + 1) & (self._capacity - 1)
+
+    def move_values(self, state):
+        """ Return a dict mapping each action in `state` to the value of that
+        move for the active player (empty in terminal states, which can still
+        have a move to cell 0); raise KeyError if a child position is not in
+        the table
+        """
+        state = SearchState.from_state(state)
+        values = {}
+        if state.terminal_test():
+            return values
+        for action in state.actions():
+            value = self.get(state.apply(action))
+            if value is None:
+                raise KeyError("The position after {} is not in {}".format(action, self.path))
+            values[action] = child_value(value)
+        return values
+
+    def best_actions(self, state):
+        """ Return the list of actions that achieve the exact value of `state`;
+        raise KeyError if the position is not in the table
+        """
+        best = self.get(state)
+        if best is None:
+            raise KeyError("The position is not in {}".format(self.path))
+        return [a for a, v in self.move_values(state).items() if v == best]
+
+    def close(self):
+        self._map.close()
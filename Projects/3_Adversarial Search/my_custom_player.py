@@ -1,6 +1,25 @@
 
+import copy
+import random
+import signal
+import threading
+
+from multiprocessing import Pipe, Process
+from multiprocessing.connection import wait
+
+from isolation import SearchState, StopSearch, endgame
+from isolation.symmetry import canonical_key, transform_cell
 from sample_players import DataPlayer
 
+# transposition table entry flags
+_EXACT, _LOWER, _UPPER = range(3)
+
+POLL_INTERVAL = 0.01  # time between checks for results from search processes (in seconds)
+POLL_NODES = 256  # number of nodes searched between checks of the deadline
+
+# search counters reported to the match runner with every move (see isolation.TimedQueue)
+_COUNTERS = ("nodes", "tt_probes", "tt_hits")
+
 
 class CustomPlayer(DataPlayer):
     """ Implement your own agent to play knight's Isolation
@@ -18,7 +37,31 @@ class CustomPlayer(DataPlayer):
     - You can pass state forward to your agent on the next turn by assigning
       any pickleable object to the self.context attribute.
     **********************************************************************
+
+    Attributes
+    ----------
+    search_processes : int
+        The number of worker processes used to search each move (set by the
+        constructor). When more than one process is used, the legal moves at
+        the root of the search tree are divided between the workers, which
+        each run an iterative deepening search over their share of the
+        moves; the agent merges the results of every depth completed by all
+        of the workers.
+
+    metrics : dict
+        Search statistics for the current move, which are reported to the
+        match runner with every call to self.queue.put(): the source of the
+        move ("random", "book", "endgame" or "search"), the number of nodes
+        searched, the deepest completed search depth, and the number of
+        transposition table probes & hits (a hit is any probe that finds an
+        entry, whether it cuts off the search or only orders the moves).
     """
+    def __init__(self, player_id, search_processes=1):
+        super().__init__(player_id)
+        self.search_processes = search_processes
+        self.transpositions = {}
+        self.metrics = self._new_metrics()
+
     def get_action(self, state):
         """ Employ an adversarial search technique to choose an action
         available in the current state calls self.queue.put(ACTION) at least
@@ -36,11 +79,310 @@ class CustomPlayer(DataPlayer):
           Refer to (and use!) the Isolation.play() function to run games.
         **********************************************************************
         """
-        # TODO: Replace the example implementation below with your own search
-        #       method by combining techniques from lecture
-        #
-        # EXAMPLE: choose a random move without any search--this function MUST
-        #          call self.queue.put(ACTION) at least once before time expires
-        #          (the timer is automatically managed for you)
-        import random
-        self.queue.put(random.choice(state.actions()))
+        self.metrics = self._new_metrics()
+        actions = state.actions()
+        if not actions:
+            return
+
+        # always queue a legal move before starting the search so that the
+        # agent has a response even if the first iteration does not finish
+        self.queue.put(random.choice(actions))
+
+        # opening positions were searched deeply offline (see build_opening_book.py)
+        if self.book is not None:
+            action = self.book.get(state)
+            if action is not None:
+                self.metrics["source"] = "book"
+                self.queue.put(action)
+                return
+
+        if state.locs[self.player_id] is None:
+            return
+
+        # the outcome of partitioned positions is already determined, so
+        # play the exact longest tour rather than searching heuristically
+        result = endgame.solve(state)
+        if result is not None:
+            self.metrics["source"] = "endgame"
+            self.queue.put(result.action)
+            return
+
+        self.metrics["source"] = "search"
+        if self.search_processes > 1 and len(actions) > 1:
+            self.parallel_search(state, actions)
+            return
+
+        # iterative deepening alpha-beta search; the tree can never be deeper
+        # than the number of open cells left on the board. Each iteration
+        # takes several times longer than the last, so no new iteration is
+        # started after the soft deadline, and the search polls the hard
+        # deadline to stop on time instead of waiting to be terminated
+        self.transpositions = {}
+        max_depth = bin(state.board).count("1")
+        for depth in range(1, max_depth + 1):
+            if depth > 1 and self.deadline is not None and self.deadline.soft_expired():
+                break
+            action = self.alpha_beta_search(state, depth)
+            self.metrics["depth"] = depth
+            self.queue.put(action)
+
+    def parallel_search(self, state, actions):
+        """ Split the root moves between several search processes and queue
+        the best move from each depth that every worker has completed
+
+        The worker processes are always terminated before returning (including
+        when the time limit expires and self.queue.put() halts the search, and
+        when the agent process itself is terminated with SIGTERM).
+        """
+        num_workers = min(self.search_processes, len(actions))
+        workers, connections = [], {}
+        handler = None
+        if threading.current_thread() is threading.main_thread():
+            handler = signal.signal(signal.SIGTERM, _stop_search)
+        try:
+            for worker_id in range(num_workers):
+                receiver, sender = Pipe(duplex=False)
+                worker = Process(target=_search_worker, daemon=True, args=(
+                    self._worker_copy(), state, actions[worker_id::num_workers], sender))
+                worker.start()
+                sender.close()
+                workers.append(worker)
+                connections[receiver] = worker_id
+
+            best_move = actions[0]
+            depth_results = {}
+            worker_metrics = {}
+            next_depth = 1
+            while connections and not (self.deadline is not None and self.deadline.expired()):
+                for conn in wait(list(connections), timeout=POLL_INTERVAL):
+                    try:
+                        depth, score, move, metrics = conn.recv()
+                    except EOFError:  # worker finished searching the whole tree
+                        del connections[conn]
+                        continue
+                    depth_results.setdefault(depth, {})[connections[conn]] = (score, move)
+                    worker_metrics[connections[conn]] = metrics
+                # merge every depth that all of the workers have completed
+                while len(depth_results.get(next_depth, ())) == num_workers:
+                    _, best_move = max(depth_results.pop(next_depth).values(), key=lambda x: x[0])
+                    self.metrics["depth"] = next_depth
+                    next_depth += 1
+                for counter in _COUNTERS:
+                    self.metrics[counter] = sum(m[counter] for m in worker_metrics.values())
+                # calling put() regularly ends the search promptly at the time limit
+                self.queue.put(best_move)
+        finally:
+            for worker in workers:
+                if worker.is_alive(): worker.terminate()
+            for worker in workers:
+                worker.join()
+            if handler is not None:
+                signal.signal(signal.SIGTERM, handler)
+
+    def _worker_copy(self):
+        """ Return a copy of the agent to run the search in a worker process """
+        agent = copy.copy(self)
+        agent.queue = None
+        agent.deadline = None  # workers run until the agent terminates them
+        agent.transpositions = {}
+        agent.metrics = self._new_metrics()
+        return agent
+
+    @staticmethod
+    def _new_metrics():
+        metrics = dict.fromkeys(_COUNTERS, 0)
+        metrics.update(source="random", depth=0)
+        return metrics
+
+    def alpha_beta_search(self, state, depth):
+        """ Return the best move for the active player using a depth-limited
+        alpha-beta search
+
+        See Also
+        --------
+            CustomPlayer.root_search()
+        """
+        return self.root_search(state, depth)[1]
+
+    def root_search(self, state, depth, actions=None):
+        """ Return the best (score, action) pair for the active player using a
+        depth-limited alpha-beta search over the specified root actions (all
+        legal actions by default)
+
+        See Also
+        --------
+            alpha_beta()
+        """
+        return alpha_beta(state, depth, self.player_id, self.score,
+                          self.transpositions, self.metrics, actions, self.deadline)
+
+    def score(self, state):
+        return liberty_difference(state, self.player_id)
+
+
+def alpha_beta(state, depth, player_id, score, transpositions=None, metrics=None, actions=None,
+               deadline=None):
+    """ Return the best (score, action) pair for the active player using a
+    depth-limited alpha-beta search over the specified root actions (all
+    legal actions by default)
+
+    Interior nodes are cached in a transposition table keyed on the
+    canonical (symmetry-reduced) key of each state, so all four
+    orientations of a position share a single entry. Each entry holds
+    the search depth, the kind of bound the value represents, the value,
+    and the best move (stored as the destination cell in the canonical
+    orientation). The table persists between iterations of iterative
+    deepening: entries from a deeper search cut off the node, and entries
+    from a shallower search are used to try the best move first.
+
+    The search runs on lightweight SearchState instances, which skip the
+    move validation performed by Isolation.result().
+
+    Parameters
+    ----------
+    state : Isolation
+        The root state of the search
+
+    depth : int
+        The search depth (in plies)
+
+    player_id : int
+        The player whose perspective is used for utilities & scores (the
+        active player at the root)
+
+    score : callable
+        Heuristic function called with a state at the depth limit
+
+    transpositions : dict, optional
+        The transposition table (a new table is used by default)
+
+    metrics : dict, optional
+        Search counters (see CustomPlayer.metrics) to increment
+
+    actions : list, optional
+        The root actions to search (all legal actions by default)
+
+    deadline : isolation.Deadline, optional
+        The search raises StopSearch if the hard limit of the deadline
+        expires (checked every POLL_NODES nodes)
+    """
+    table = {} if transpositions is None else transpositions
+    state = SearchState.from_state(state)
+    size = (state.width, state.height)
+    nodes = probes = hits = 0
+
+    def probe(state):
+        nonlocal probes, hits
+        probes += 1
+        key, symmetry = canonical_key(state)
+        entry = table.get(key)
+        if entry is not None: hits += 1
+        return key, symmetry, entry
+
+    def cutoff(entry, depth, alpha, beta):
+        if entry is None or entry[0] < depth:
+            return None, alpha, beta
+        _, flag, value, _ = entry
+        if flag == _EXACT: return value, alpha, beta
+        if flag == _LOWER: alpha = max(alpha, value)
+        if flag == _UPPER: beta = min(beta, value)
+        return (value if alpha >= beta else None), alpha, beta
+
+    def ordered_actions(state, symmetry, entry, actions=None):
+        actions = list(state.actions() if actions is None else actions)
+        if entry is None or entry[3] is None:
+            return actions
+        loc = state.locs[state.player()]
+        cell = transform_cell(entry[3], symmetry, *size)
+        move = cell if loc is None else cell - loc
+        for idx, action in enumerate(actions):
+            if action == move:
+                actions.insert(0, actions.pop(idx))
+                break
+        return actions
+
+    def store(state, key, symmetry, depth, value, flag, move):
+        cell = None
+        if move is not None:
+            loc = state.locs[state.player()]
+            cell = transform_cell(move if loc is None else loc + move, symmetry, *size)
+        table[key] = (depth, flag, value, cell)
+
+    def min_value(state, depth, alpha, beta):
+        nonlocal nodes
+        nodes += 1
+        if deadline is not None and not nodes % POLL_NODES: deadline.check()
+        if state.terminal_test(): return state.utility(player_id)
+        if depth <= 0: return score(state)
+        key, symmetry, entry = probe(state)
+        cached, alpha, beta = cutoff(entry, depth, alpha, beta)
+        if cached is not None: return cached
+        alpha_orig, beta_orig = alpha, beta
+        value, best_move = float("inf"), None
+        for action in ordered_actions(state, symmetry, entry):
+            child_value = max_value(state.apply(action), depth - 1, alpha, beta)
+            if child_value < value: value, best_move = child_value, action
+            if value <= alpha: break
+            beta = min(beta, value)
+        flag = _UPPER if value <= alpha_orig else _LOWER if value >= beta_orig else _EXACT
+        store(state, key, symmetry, depth, value, flag, best_move)
+        return value
+
+    def max_value(state, depth, alpha, beta):
+        nonlocal nodes
+        nodes += 1
+        if deadline is not None and not nodes % POLL_NODES: deadline.check()
+        if state.terminal_test(): return state.utility(player_id)
+        if depth <= 0: return score(state)
+        key, symmetry, entry = probe(state)
+        cached, alpha, beta = cutoff(entry, depth, alpha, beta)
+        if cached is not None: return cached
+        alpha_orig, beta_orig = alpha, beta
+        value, best_move = float("-inf"), None
+        for action in ordered_actions(state, symmetry, entry):
+            child_value = min_value(state.apply(action), depth - 1, alpha, beta)
+            if child_value > value: value, best_move = child_value, action
+            if value >= beta: break
+            alpha = max(alpha, value)
+        flag = _UPPER if value <= alpha_orig else _LOWER if value >= beta_orig else _EXACT
+        store(state, key, symmetry, depth, value, flag, best_move)
+        return value
+
+    key, symmetry, entry = probe(state)
+    alpha, beta = float("-inf"), float("inf")
+    best_score, best_move = float("-inf"), None
+    for action in ordered_actions(state, symmetry, entry, actions):
+        value = min_value(state.apply(action), depth - 1, alpha, beta)
+        if best_move is None or value > best_score:
+            best_score, best_move = value, action
+        alpha = max(alpha, value)
+    if actions is None:  # a search over a subset of the root moves is not exact
+        store(state, key, symmetry, depth, best_score, _EXACT, best_move)
+    if metrics is not None:
+        metrics["nodes"] += nodes
+        metrics["tt_probes"] += probes
+        metrics["tt_hits"] += hits
+    return best_score, best_move
+
+
+def liberty_difference(state, player_id):
+    """ Return the number of liberties of a player minus those of the opponent """
+    return len(state.liberties(state.locs[player_id])) - len(state.liberties(state.locs[1 - player_id]))
+
+
+def _stop_search(signum, frame):
+    """ SIGTERM handler that unwinds the search so the workers are terminated """
+    raise StopSearch
+
+
+def _search_worker(agent, state, actions, sender):
+    """ Run an iterative deepening search over a subset of the root actions
+    in a worker process, sending the best (depth, score, action) found at
+    every depth to the parent process along with the worker's metrics
+    """
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)  # don't inherit the agent's handler
+    max_depth = bin(state.board).count("1")
+    for depth in range(1, max_depth + 1):
+        score, action = agent.root_search(state, depth, actions)
+        sender.send((depth, score, action, agent.metrics))
+    sender.close()
@@ -2,21 +2,28 @@
 #                    YOU DO NOT NEED TO MODIFY THIS FILE                      #
 ###############################################################################
 import argparse
+import json
 import logging
 import math
 import os
+import queue
 import random
 import textwrap
 
 from collections import namedtuple
+from functools import partial
+from logging.handlers import QueueHandler, QueueListener
 from multiprocessing.pool import ThreadPool as Pool
 
-from isolation import Isolation, Agent, play
+from isolation import Isolation, Agent, play_game
+from isolation.isolation import _WIDTH, _HEIGHT
+from isolation.records import RecordWriter
 from sample_players import RandomPlayer, GreedyPlayer, MinimaxPlayer
 from my_custom_player import CustomPlayer
 
 logger = logging.getLogger(__name__)
 
+LOG_FILE = "matches.log"
 NUM_PROCS = 1
 NUM_ROUNDS = 5  # number times to replicate the match; increase for higher confidence estimate
 TIME_LIMIT = 150  # number of milliseconds before timeout
@@ -30,13 +37,63 @@ TEST_AGENTS = {
 
 Match = namedtuple("Match", "players initial_state time_limit match_id debug_flag")
 
+# attributes of every LogRecord; anything else was passed with `extra`
+_RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
 
-def _run_matches(matches, name, num_processes=NUM_PROCS, debug=False):
+
+class JsonFormatter(logging.Formatter):
+    """ Format each log record as one line of JSON containing the time,
+    level, logger name & message, plus any fields passed with `extra`
+    """
+    def format(self, record):
+        data = {"time": record.created, "level": record.levelname,
+                "logger": record.name, "message": record.getMessage()}
+        data.update((k, v) for k, v in vars(record).items() if k not in _RECORD_ATTRIBUTES)
+        if record.exc_info:
+            data["exception"] = self.formatException(record.exc_info)
+        return json.dumps(data, default=str)
+
+
+class RawQueueHandler(QueueHandler):
+    """ QueueHandler that puts the log records on the queue unformatted
+
+    The stock QueueHandler formats the message (and drops the exception
+    info) in the thread that logs it. The records only go to a QueueListener
+    thread in the same process, so they don't need to be pickled and all of
+    the formatting is left to the listener's handlers.
+    """
+    def prepare(self, record):
+        return record
+
+
+def start_logging(filename=LOG_FILE, level=logging.INFO):
+    """ Send log records from every thread to a background thread that
+    writes them to `filename` as JSON lines, and return the QueueListener
+    (call .stop() to flush the remaining records before exiting)
+
+    The game threads only put each record on a queue (see RawQueueHandler),
+    so formatting the messages & JSON and writing to disk don't add to the
+    time of each game.
+    """
+    records = queue.Queue()
+    handler = logging.FileHandler(filename, mode="w")
+    handler.setFormatter(JsonFormatter())
+    listener = QueueListener(records, handler)
+    root = logging.getLogger()
+    root.addHandler(RawQueueHandler(records))
+    root.setLevel(level)
+    listener.start()
+    return listener
+
+
+def _run_matches(matches, name, num_processes=NUM_PROCS, debug=False, recorder=None):
     results = []
     pool = Pool(1) if debug else Pool(num_processes)
     print("Running {} games:".format(len(matches)))
-    for result in pool.imap_unordered(play, matches):
-        print("+" if result[0].name == name else '-', end="")
+    for result in pool.imap_unordered(play_game, matches):
+        print("+" if result.winner.name == name else '-', end="")
+        if recorder is not None:
+            recorder.write(result)
         results.append(result)
     print()
     return results
@@ -44,7 +101,8 @@ def _run_matches(matches, name, num_processes=NUM_PROCS, debug=False):
 
 def make_fair_matches(matches, results):
     new_matches = []
-    for _, game_history, match_id in results:
+    for result in results:
+        game_history, match_id = result.history, result.match_id
         if len(game_history) < 2:
             logger.warn(textwrap.dedent("""\
                 Unable to duplicate match {}
@@ -52,7 +110,7 @@ def make_fair_matches(matches, results):
                 """.format(match_id)))
             continue
         match = matches[match_id]
-        state = Isolation().result(game_history[0]).result(game_history[1])
+        state = match.initial_state.result(game_history[0]).result(game_history[1])
         fair_match = Match(players=match.players[::-1],
                           initial_state=state,
                           time_limit=match.time_limit,
@@ -77,7 +135,7 @@ def play_matches(custom_agent, test_agent, cli_args):
     """
     matches = []
     for match_id in range(cli_args.rounds):
-        state = Isolation()
+        state = Isolation(width=cli_args.width, height=cli_args.height)
         matches.append(Match(
             players=(test_agent, custom_agent),
             initial_state=state,
@@ -93,25 +151,71 @@ def play_matches(custom_agent, test_agent, cli_args):
 
     # Run all matches -- must be done before fair matches in order to populate
     # the first move from each player; these moves are reused in the fair matches
-    results = _run_matches(matches, custom_agent.name, cli_args.processes)
+    recorder = RecordWriter(cli_args.record) if cli_args.record else None
+    try:
+        results = _run_matches(matches, custom_agent.name, cli_args.processes, recorder=recorder)
+
+        if cli_args.fair_matches:
+            _matches = make_fair_matches(matches, results)
+            results.extend(_run_matches(_matches, custom_agent.name, cli_args.processes,
+                                        recorder=recorder))
+    finally:
+        if recorder is not None:
+            recorder.close()
+
+    wins = sum(int(r.winner.name == custom_agent.name) for r in results)
+    return wins, len(matches) * (1 + int(cli_args.fair_matches)), results
+
+
+def summarize_metrics(results):
+    """ Aggregate the per-move search metrics reported by each agent over
+    all of the games, and return a dict of summary statistics keyed by the
+    agent name (agents that do not report a statistic are omitted from it)
+    """
+    moves = {}
+    for result in results:
+        for idx, metrics in enumerate(result.metrics):
+            player_id = (result.initial_state.ply_count + idx) % 2
+            moves.setdefault(result.agents[player_id].name, []).append(metrics)
+
+    summary = {}
+    for name, agent_moves in sorted(moves.items()):
+        stats = {"moves": len(agent_moves)}
+        for key in ("nodes", "depth"):
+            values = [m[key] for m in agent_moves if key in m]
+            if values:
+                stats["mean_" + key] = sum(values) / len(values)
+        probes = sum(m.get("tt_probes", 0) for m in agent_moves)
+        if probes:
+            stats["tt_hit_rate"] = sum(m.get("tt_hits", 0) for m in agent_moves) / probes
+        used = [m["time_used"] / m["time_limit"] for m in agent_moves if m.get("time_limit")]
+        if used:
+            stats["mean_time_used"] = sum(used) / len(used)
+            stats["max_time_used"] = max(used)
+        summary[name] = stats
+    return summary
 
-    if cli_args.fair_matches:
-        _matches = make_fair_matches(matches, results)
-        results.extend(_run_matches(_matches, custom_agent.name, cli_args.processes))
 
-    wins = sum(int(r[0].name == custom_agent.name) for r in results)
-    return wins, len(matches) * (1 + int(cli_args.fair_matches))
+def format_summary(summary):
+    lines = ["Search metrics per move:"]
+    for name, stats in summary.items():
+        lines.append("  {}: {}".format(name, ", ".join(
+            "{}={:.3g}".format(key, value) for key, value in sorted(stats.items()))))
+    return "\n".join(lines)
 
 
 def main(args):
     test_agent = TEST_AGENTS[args.opponent.upper()]
-    custom_agent = Agent(CustomPlayer, "Custom Agent")
-    wins, num_games = play_matches(custom_agent, test_agent, args)
+    custom_agent = Agent(partial(CustomPlayer, search_processes=args.search_processes), "Custom Agent")
+    wins, num_games, results = play_matches(custom_agent, test_agent, args)
 
     logger.info("Your agent won {:.1f}% of matches against {}".format(
        100. * wins / num_games, test_agent.name))
     print("Your agent won {:.1f}% of matches against {}".format(
        100. * wins / num_games, test_agent.name))
+    summary = format_summary(summarize_metrics(results))
+    logger.info(summary)
+    print(summary)
     print()
 
 
@@ -180,17 +284,41 @@ if __name__ == "__main__":
         '-t', '--time_limit', type=int, default=TIME_LIMIT,
         help="Set the maximum allowed time (in milliseconds) for each call to agent.get_action()."
     )
-    args = parser.parse_args()
-
-    logging.basicConfig(filename="matches.log", filemode="w", level=logging.DEBUG)
-    logging.info(
-        "Search Configuration:\n" +
-        "Opponent: {}\n".format(args.opponent) +
-        "Rounds: {}\n".format(args.rounds) +
-        "Fair Matches: {}\n".format(args.fair_matches) +
-        "Time Limit: {}\n".format(args.time_limit) +
-        "Processes: {}\n".format(args.processes) +
-        "Debug Mode: {}".format(args.debug)
+    parser.add_argument(
+        '--search_processes', type=int, default=1,
+        help="""\
+            Set the number of worker processes CustomPlayer uses to search each move
+            by splitting the moves at the root of the search tree between them. This
+            is only useful with long time limits on machines with spare cores.
+        """
     )
+    parser.add_argument(
+        '--log_level', type=str, default="INFO", choices=["DEBUG", "INFO", "WARNING", "ERROR"],
+        help="""\
+            Set the level of the JSON-lines log written to {}. DEBUG also logs the
+            full initial & final state of every game.
+        """.format(LOG_FILE)
+    )
+    parser.add_argument(
+        '--record', type=str, default=None,
+        help="""\
+            Append a binary record of every game (with the search metrics of each move)
+            to this file; see isolation.records to read & replay the games.
+        """
+    )
+    parser.add_argument(
+        '--width', type=int, default=_WIDTH,
+        help="Set the number of columns on the board."
+    )
+    parser.add_argument(
+        '--height', type=int, default=_HEIGHT,
+        help="Set the number of rows on the board."
+    )
+    args = parser.parse_args()
 
-    main(args)
+    listener = start_logging(LOG_FILE, getattr(logging, args.log_level))
+    logger.info("Search configuration", extra={"event": "config", "config": vars(args)})
+    try:
+        main(args)
+    finally:
+        listener.stop()
@@ -5,6 +5,8 @@ import logging
 import pickle
 import random
 
+from isolation.book import OpeningBook
+
 logger = logging.getLogger(__name__)
 
 
@@ -15,6 +17,9 @@ class BasePlayer:
         self.queue = None
         self.context = None
         self.data = None
+        self.book = None
+        self.metrics = None
+        self.deadline = None  # isolation.Deadline of the current move (set before get_action())
 
     def get_action(self, state):
         """ Implement a function that calls self.queue.put(ACTION) within the allowed time limit 
@@ -25,6 +30,10 @@ class BasePlayer:
 
 
 class DataPlayer(BasePlayer):
+    """ Player that loads initialization data from "data.pickle" into
+    self.data, and the opening book built by build_opening_book.py from
+    "data.book" into self.book (both are None if the file does not exist)
+    """
     def __init__(self, player_id):
         super().__init__(player_id)
         try:
@@ -33,6 +42,11 @@ class DataPlayer(BasePlayer):
         except (IOError, TypeError) as e:
             logger.info(str(e))
             self.data = None
+        try:
+            self.book = OpeningBook("data.book")
+        except (IOError, ValueError) as e:
+            logger.info(str(e))
+            self.book = None
 
 
 class RandomPlayer(BasePlayer):
@@ -0,0 +1,279 @@
+""" Generate self-play games and fit the weights of a linear mobility heuristic """
+import argparse
+import json
+import random
+import textwrap
+import time
+
+from multiprocessing.pool import ThreadPool as Pool
+
+import numpy as np
+
+from isolation import Isolation, Agent, Status, play_game
+from isolation.isolation import _WIDTH, _HEIGHT
+from sample_players import RandomPlayer, GreedyPlayer, MinimaxPlayer
+from my_custom_player import CustomPlayer
+
+import batch_eval
+
+DATA_FILE = "selfplay.npz"
+FORMAT_VERSION = 1
+NUM_GAMES = 100
+NUM_PROCS = 1
+OPENING_PLIES = 4  # number of random plies played before the agents take over
+TIME_LIMIT = 150  # number of milliseconds per agent move
+L2_PENALTY = 1e-3
+
+AGENTS = {
+    "RANDOM": Agent(RandomPlayer, "Random Agent"),
+    "GREEDY": Agent(GreedyPlayer, "Greedy Agent"),
+    "MINIMAX": Agent(MinimaxPlayer, "Minimax Agent"),
+    "SELF": Agent(CustomPlayer, "Custom Agent"),
+}
+
+
+def random_opening(num_plies, rng, width=_WIDTH, height=_HEIGHT):
+    """ Return a non-terminal state reached by playing random moves from an
+    empty board (self-play games between deterministic agents would
+    otherwise repeat the same few games)
+    """
+    while True:
+        state = Isolation(width=width, height=height)
+        for _ in range(num_plies):
+            if state.terminal_test(): break
+            state = state.result(rng.choice(state.actions()))
+        if not state.terminal_test():
+            return state
+
+
+def play_games(agent, num_games, time_limit=TIME_LIMIT, processes=NUM_PROCS,
+               opening_plies=OPENING_PLIES, seed=0, width=_WIDTH, height=_HEIGHT):
+    """ Play `num_games` games of `agent` against itself with the match
+    machinery used by run_match.py, and return the finished games (games
+    that ended by timeout or an exception are dropped)
+    """
+    rng = random.Random(seed)
+    matches = [((agent, agent), random_opening(opening_plies, rng, width, height), time_limit, idx)
+               for idx in range(num_games)]
+    results = []
+    with Pool(processes) as pool:
+        for result in pool.imap_unordered(play_game, matches):
+            if result.status == Status.GAME_OVER:
+                results.append(result)
+    return results
+
+
+def positions(results):
+    """ Replay each game and return every non-terminal position along with
+    the id of the winning player and the match id of the game
+
+    Returns
+    -------
+    (list, np.ndarray, np.ndarray)
+        The positions, the winning player of each position's game (0 or 1),
+        and the match id of each position's game
+    """
+    states, winners, games = [], [], []
+    for result in results:
+        game = [result.initial_state]
+        for action in result.history:
+            game.append(game[-1].result(action))
+        winner = 0 if game[-1].utility(0) > 0 else 1
+        states.extend(game[:-1])
+        winners.extend([winner] * len(result.history))
+        games.extend([result.match_id] * len(result.history))
+    return states, np.array(winners, dtype=np.int8), np.array(games, dtype=np.int32)
+
+
+def save_positions(path, states, winners, games):
+    """ Write positions to a compressed columnar file
+
+    Each column is stored as a separate array: the open cells of every board
+    (one bit per cell, packed into bytes), the column index of each player's
+    knight (-1 if not placed; stored as int16 for boards with more than 127
+    cells), the active player, the winning player, and the match id of the
+    game the position was taken from.
+    """
+    batch = batch_eval.pack(states)
+    np.savez_compressed(path, version=np.array(FORMAT_VERSION),
+                        size=np.array([batch.width, batch.height]),
+                        open=np.packbits(batch.open, axis=1),
+                        locs=batch.locs.astype(np.int16),
+                        players=batch.players.astype(np.int8),
+                        winners=np.asarray(winners, dtype=np.int8),
+                        games=np.asarray(games, dtype=np.int32))
+
+
+def load_positions(path):
+    """ Read a file written by save_positions()
+
+    Returns
+    -------
+    (batch_eval.Batch, np.ndarray, np.ndarray)
+        The positions, the winning player of each position, and the match
+        id of each position's game
+    """
+    with np.load(path) as data:
+        if int(data["version"]) != FORMAT_VERSION:
+            raise ValueError("{} is not a compatible self-play file".format(path))
+        width, height = data["size"].tolist()
+        num_cells = width * height
+        open_cells = np.unpackbits(data["open"], axis=1, count=num_cells).astype(bool)
+        batch = batch_eval.Batch(open_cells, data["locs"].astype(np.intp),
+                                 data["players"].astype(np.intp), width, height)
+        return batch, data["winners"], data["games"]
+
+
+def training_data(batch, winners):
+    """ Return the features of each position from the perspective of the
+    active player, and a label that is 1 if the active player won the game
+    """
+    X = np.empty((len(batch.players), len(batch_eval.FEATURES)), dtype=np.float64)
+    for player_id in (0, 1):
+        rows = batch.players == player_id
+        X[rows] = batch_eval.features(batch, player_id)[rows]
+    y = (np.asarray(winners) == batch.players).astype(np.float64)
+    return X, y
+
+
+def fit(X, y, l2=L2_PENALTY, iterations=25, tol=1e-8):
+    """ Fit a logistic regression model P(win) = sigmoid(X @ w + b) with
+    Newton's method and return the (weights, intercept)
+
+    The features are standardized while fitting (so the L2 penalty treats
+    them equally) and the weights are returned on the original scale.
+    """
+    mean, std = X.mean(axis=0), X.std(axis=0)
+    std[std == 0] = 1
+    Z = np.hstack([(X - mean) / std, np.ones((len(X), 1))])
+    w = np.zeros(Z.shape[1])
+    penalty = np.full(Z.shape[1], l2 * len(X))
+    penalty[-1] = 0  # don't shrink the intercept
+    for _ in range(iterations):
+        p = 1 / (1 + np.exp(-(Z @ w)))
+        gradient = Z.T @ (p - y) + penalty * w
+        hessian = (Z * (p * (1 - p))[:, None]).T @ Z + np.diag(penalty)
+        step = np.linalg.solve(hessian, gradient)
+        w -= step
+        if np.abs(step).max() < tol:
+            break
+    weights = w[:-1] / std
+    return weights, w[-1] - weights @ mean
+
+
+def log_loss(X, y, weights, intercept):
+    p = np.clip(1 / (1 + np.exp(-(X @ weights + intercept))), 1e-12, 1 - 1e-12)
+    return float(-np.mean(y * np.log(p) + (1 - y) * np.log(1 - p)))
+
+
+def tune(path, l2=L2_PENALTY, holdout=0.2, seed=0):
+    """ Fit the heuristic weights to the positions in a self-play file
+
+    The games (not the positions, which are highly correlated within a
+    game) are split into training & validation sets, and the log loss of
+    the fitted weights is reported on both.
+    """
+    batch, winners, games = load_positions(path)
+    X, y = training_data(batch, winners)
+    ids = np.unique(games)
+    rng = np.random.RandomState(seed)
+    valid_ids = rng.choice(ids, size=int(len(ids) * holdout), replace=False)
+    valid = np.isin(games, valid_ids)
+    weights, intercept = fit(X[~valid], y[~valid], l2)
+    report = {"positions": len(y), "games": len(ids),
+              "train_loss": log_loss(X[~valid], y[~valid], weights, intercept)}
+    if valid.any():
+        report["valid_loss"] = log_loss(X[valid], y[valid], weights, intercept)
+    return dict(zip(batch_eval.FEATURES, weights.tolist())), float(intercept), report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        description="Generate self-play games and fit the weights of a linear mobility heuristic.",
+        epilog=textwrap.dedent("""\
+            Example Usage:
+            --------------
+            - Play 500 self-play games of the minimax agent with 4 parallel
+              processes and save the positions to {0}:
+
+                $python self_play.py play -a MINIMAX -n 500 -p 4
+
+            - Fit the weights of the features in batch_eval.FEATURES by logistic
+              regression on the saved positions (the weights can be passed to
+              batch_eval.score()):
+
+                $python self_play.py tune -o weights.json
+        """.format(DATA_FILE))
+    )
+    subparsers = parser.add_subparsers(dest="command")
+    play_parser = subparsers.add_parser("play", help="Play self-play games and save the positions.")
+    play_parser.add_argument(
+        '-a', '--agent', type=str, default="MINIMAX", choices=list(AGENTS.keys()),
+        help="Choose the agent that plays both sides of every game."
+    )
+    play_parser.add_argument(
+        '-n', '--num_games', type=int, default=NUM_GAMES,
+        help="Set the number of games to play."
+    )
+    play_parser.add_argument(
+        '-p', '--processes', type=int, default=NUM_PROCS,
+        help="Set the number of games played in parallel."
+    )
+    play_parser.add_argument(
+        '-t', '--time_limit', type=int, default=TIME_LIMIT,
+        help="Set the maximum allowed time (in milliseconds) for each agent move."
+    )
+    play_parser.add_argument(
+        '--opening_plies', type=int, default=OPENING_PLIES,
+        help="Set the number of random plies played at the start of each game."
+    )
+    play_parser.add_argument(
+        '--seed', type=int, default=0,
+        help="Set the seed used to generate the random openings."
+    )
+    play_parser.add_argument(
+        '--width', type=int, default=_WIDTH,
+        help="Set the number of columns on the board."
+    )
+    play_parser.add_argument(
+        '--height', type=int, default=_HEIGHT,
+        help="Set the number of rows on the board."
+    )
+    tune_parser = subparsers.add_parser("tune", help="Fit the heuristic weights to saved positions.")
+    tune_parser.add_argument(
+        '--l2', type=float, default=L2_PENALTY,
+        help="Set the L2 regularization strength (per position)."
+    )
+    tune_parser.add_argument(
+        '-o', '--output', type=str, default=None,
+        help="Save the fitted weights to a JSON file."
+    )
+    for subparser in (play_parser, tune_parser):
+        subparser.add_argument(
+            '-f', '--file', type=str, default=DATA_FILE,
+            help="Set the name of the self-play data file."
+        )
+    args = parser.parse_args()
+
+    if args.command == "play":
+        start = time.perf_counter()
+        results = play_games(AGENTS[args.agent], args.num_games, args.time_limit, args.processes,
+                             args.opening_plies, args.seed, args.width, args.height)
+        states, winners, games = positions(results)
+        save_positions(args.file, states, winners, games)
+        print("Saved {} positions from {} games to {} ({:.1f}s)".format(
+            len(states), len(results), args.file, time.perf_counter() - start))
+    elif args.command == "tune":
+        weights, intercept, report = tune(args.file, args.l2)
+        print("Fit {positions} positions from {games} games".format(**report))
+        print("Log loss: train {:.4f}, validation {:.4f}".format(
+            report["train_loss"], report.get("valid_loss", float("nan"))))
+        for name, weight in weights.items():
+            print("  {:<16} {:+.4f}".format(name, weight))
+        if args.output:
+            with open(args.output, "w") as f:
+                json.dump({"features": list(weights), "weights": list(weights.values()),
+                           "intercept": intercept}, f, indent=2)
+    else:
+        parser.print_help()
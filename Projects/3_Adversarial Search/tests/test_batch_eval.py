@@ -0,0 +1,72 @@
+
+import unittest
+
+from random import Random
+
+from isolation import Isolation
+
+import batch_eval
+
+
+def random_states(seed, count=20):
+    rng = Random(seed)
+    states = []
+    for _ in range(count):
+        state = Isolation()
+        for _ in range(rng.randint(0, 30)):
+            if state.terminal_test(): break
+            state = state.result(rng.choice(state.actions()))
+        states.append(state)
+    return states
+
+
+class BatchEvalTest(unittest.TestCase):
+    def test_liberties_match_isolation(self):
+        """ Batched liberty counts agree with Isolation.liberties() """
+        states = random_states(2718)
+        batch = batch_eval.pack(states)
+        for player_id in (0, 1):
+            liberties, _, _ = batch_eval.player_features(batch, player_id)
+            expected = [len(s.liberties(s.locs[player_id])) for s in states]
+            self.assertEqual(liberties.tolist(), expected)
+
+    def test_reach_includes_two_move_cells(self):
+        """ Reach counts open cells within two knight moves """
+        state = Isolation().result(57).result(0)
+        _, reach, _ = batch_eval.player_features(batch_eval.pack([state]), 0)
+        cells = set()
+        for a in state.liberties(57):
+            cells.add(a)
+            cells.update(state.liberties(a))
+        cells.discard(57)
+        self.assertEqual(reach[0], len(cells))
+
+    def test_children_match_result(self):
+        """ Children packed directly from the parent match Isolation.result() """
+        for state in random_states(1618, count=10):
+            if state.terminal_test(): continue
+            actions, batch = batch_eval.children(state)
+            self.assertEqual(set(actions), set(state.actions()))
+            expected = batch_eval.pack([state.result(a) for a in actions])
+            self.assertEqual(batch.open.tolist(), expected.open.tolist())
+            self.assertEqual(batch.locs.tolist(), expected.locs.tolist())
+            self.assertEqual(batch.players.tolist(), expected.players.tolist())
+
+    def test_default_score_is_liberty_difference(self):
+        state = random_states(42, count=1)[0]
+        scores = batch_eval.evaluate_children(state, player_id=0)
+        for action, value in scores.items():
+            child = state.result(action)
+            own, opp = (len(child.liberties(child.locs[i])) for i in (0, 1))
+            self.assertEqual(value, own - opp)
+
+    def test_small_board(self):
+        """ Batches of 5x5 states use the masks for their own board size """
+        state = Isolation(width=5, height=5).result(16).result(0)
+        batch = batch_eval.pack([state])
+        self.assertEqual(batch.open.shape, (1, 25))
+        for player_id in (0, 1):
+            liberties, _, _ = batch_eval.player_features(batch, player_id)
+            self.assertEqual(liberties[0], len(state.liberties(state.locs[player_id])))
+        with self.assertRaises(ValueError):
+            batch_eval.pack([state, Isolation()])
@@ -0,0 +1,107 @@
+
+import unittest
+
+from random import Random
+
+from isolation import Isolation, SearchState
+from isolation import endgame
+from isolation.symmetry import SYMMETRIES, canonical_key, transform_action, transform_state
+
+
+def perft(state, depth):
+    if depth == 0:
+        return 1
+    return sum(perft(state.result(a), depth - 1) for a in state.actions())
+
+
+def fast_perft(state, depth):
+    if depth == 0:
+        return 1
+    return sum(fast_perft(state.apply(a), depth - 1) for a in state.actions())
+
+
+def xy_perft(width, height, depth, locs=(None, None), blocked=frozenset(), ply=0):
+    """ Reference perft that uses (x, y) coordinates instead of a bitboard """
+    if depth == 0:
+        return 1
+    loc = locs[ply % 2]
+    if loc is None:
+        targets = [(x, y) for x in range(width) for y in range(height)]
+    else:
+        targets = [(loc[0] + dx, loc[1] + dy) for dx, dy in
+                   ((1, 2), (2, 1), (2, -1), (1, -2), (-1, -2), (-2, -1), (-2, 1), (-1, 2))]
+    total = 0
+    for x, y in targets:
+        if 0 <= x < width and 0 <= y < height and (x, y) not in blocked:
+            new_locs = ((x, y), locs[1]) if ply % 2 == 0 else (locs[0], (x, y))
+            total += xy_perft(width, height, depth - 1, new_locs, blocked | {(x, y)}, ply + 1)
+    return total
+
+
+def random_game(rng, width, height):
+    state = Isolation(width=width, height=height)
+    states = [state]
+    while not state.terminal_test():
+        state = state.result(rng.choice(state.actions()))
+        states.append(state)
+    return states
+
+
+def minimax(state):
+    """ Return True if the active player wins with perfect play """
+    if state.terminal_test():
+        return state.utility(state.player()) > 0
+    return any(not minimax(state.result(a)) for a in state.actions())
+
+
+class BoardSizeTest(unittest.TestCase):
+    def test_default_size(self):
+        """ The default board is 11x9 and uses the Action enum """
+        state = Isolation()
+        self.assertEqual((state.width, state.height), (11, 9))
+        self.assertEqual(len(state.actions()), 99)
+        self.assertEqual(Isolation.__new__(Isolation, state.board, 0, (None, None)), state)
+
+    def test_perft_small_boards(self):
+        """ Isolation & SearchState agree with a coordinate-based move generator """
+        for width, height in ((5, 5), (4, 6), (7, 3)):
+            state = Isolation(width=width, height=height)
+            expected = xy_perft(width, height, 3)
+            self.assertEqual(perft(state, 3), expected)
+            self.assertEqual(fast_perft(SearchState.from_state(state), 3), expected)
+
+    def test_search_state_round_trip(self):
+        state = random_game(Random(5), 5, 5)[3]
+        fast_state = SearchState.from_state(state)
+        self.assertEqual((fast_state.width, fast_state.height), (5, 5))
+        self.assertEqual(fast_state.to_state(), state)
+
+    def test_symmetry_non_square(self):
+        """ Canonical keys & transformed actions are consistent on a 4x6 board """
+        rng = Random(46)
+        for _ in range(5):
+            states = random_game(rng, 4, 6)
+            for state in states[:-1]:
+                keys = {canonical_key(transform_state(state, s))[0] for s in SYMMETRIES}
+                self.assertEqual(len(keys), 1)
+                loc = state.locs[state.player()]
+                for symmetry in SYMMETRIES:
+                    image = transform_state(state, symmetry)
+                    for action in state.actions():
+                        mapped = transform_action(action, loc, symmetry, 4, 6)
+                        self.assertEqual(transform_state(state.result(action), symmetry),
+                                         image.result(mapped))
+
+    def test_endgame_small_board(self):
+        """ solve() agrees with exhaustive search of partitioned 5x5 positions """
+        rng = Random(55)
+        solved = 0
+        for _ in range(30):
+            for state in random_game(rng, 5, 5):
+                result = endgame.solve(state)
+                if result is None: continue
+                self.assertEqual(result.active_player_wins, minimax(state))
+                self.assertIn(result.action, state.actions())
+                solved += 1
+                break
+        self.assertGreater(solved, 0)
@@ -0,0 +1,56 @@
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from random import Random
+
+from isolation import Isolation
+from isolation.book import OpeningBook, encode_entry, write_book
+from isolation.symmetry import SYMMETRIES, canonical_key, transform_state
+
+
+class OpeningBookTest(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, "test.book")
+        rng = Random(8128)
+        self.entries = {}
+        state = Isolation()
+        while not state.terminal_test() and len(self.entries) < 12:
+            action = rng.choice(state.actions())
+            self.entries[state] = action
+            state = state.result(action)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_lookup_all_orientations(self):
+        """ Every orientation of a book position returns an equivalent move
+        (symmetric positions, like the empty board, have several equivalent moves)
+        """
+        write_book(self.path, [encode_entry(s, a) for s, a in self.entries.items()])
+        book = OpeningBook(self.path)
+        self.assertEqual(len(book), len(self.entries))
+        for state, action in self.entries.items():
+            for symmetry in SYMMETRIES:
+                image = transform_state(state, symmetry)
+                self.assertIn(image, book)
+                self.assertEqual(canonical_key(image.result(book.get(image)))[0],
+                                 canonical_key(state.result(action))[0])
+            if state.locs[state.player()] is not None:
+                self.assertEqual(book.get(state), action)
+        self.assertIsNone(book.get(Isolation(width=5, height=5)))
+        book.close()
+
+    def test_reject_bad_files(self):
+        """ Truncated or corrupted files raise ValueError """
+        write_book(self.path, [encode_entry(s, a) for s, a in self.entries.items()])
+        with open(self.path, "rb") as f:
+            data = f.read()
+        for bad_data in (data[:7], data[:-1], data + b"\x00", b"NOTABOOK" + data[8:]):
+            with open(self.path, "wb") as f:
+                f.write(bad_data)
+            with self.assertRaises(ValueError):
+                OpeningBook(self.path)
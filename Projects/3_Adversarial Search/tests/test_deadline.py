@@ -0,0 +1,88 @@
+
+import time
+import unittest
+
+from multiprocessing import Pipe
+from queue import Empty
+
+from isolation import Isolation, Deadline, StopSearch, TimedQueue, KILL_GRACE, _get_action, _request_action
+from sample_players import BasePlayer
+from my_custom_player import CustomPlayer
+
+
+class StallingPlayer(BasePlayer):
+    """ Agent that queues one action and then never returns """
+    def get_action(self, state):
+        self.queue.put(state.actions()[0])
+        while True:
+            pass
+
+
+class DeadlinePlayer(BasePlayer):
+    """ Agent that reports the deadline it can see """
+    def get_action(self, state):
+        self.metrics = {"start": self.deadline.start,
+                        "soft": self.deadline.soft - self.deadline.start,
+                        "hard": self.deadline.hard - self.deadline.start}
+        self.queue.put(state.actions()[0])
+
+
+class DeadlineTest(unittest.TestCase):
+    def setUp(self):
+        self.state = Isolation().result(19).result(85)
+
+    def test_limits(self):
+        deadline = Deadline(0.05, soft_limit=0.2)
+        self.assertLess(deadline.soft, deadline.hard)
+        self.assertFalse(deadline.expired())
+        deadline.check()
+        time.sleep(0.02)
+        self.assertTrue(deadline.soft_expired())
+        self.assertFalse(deadline.expired())
+        time.sleep(0.04)
+        self.assertTrue(deadline.expired())
+        self.assertLess(deadline.remaining(), 0)
+        with self.assertRaises(StopSearch):
+            deadline.check()
+
+    def test_agent_sees_deadline(self):
+        _, metrics = _get_action(self.state, DeadlinePlayer(0), 150)
+        self.assertAlmostEqual(metrics["hard"], 0.15)
+        self.assertLess(metrics["soft"], metrics["hard"])
+
+    def test_stalled_agent_is_terminated_promptly(self):
+        """ An agent that never returns costs the time limit plus KILL_GRACE """
+        start = time.perf_counter()
+        action, _ = _get_action(self.state, StallingPlayer(0), 150)
+        self.assertLess(time.perf_counter() - start, 0.15 + KILL_GRACE + 0.25)
+        self.assertEqual(action, self.state.actions()[0])
+
+    def test_custom_player_stops_on_time(self):
+        """ The search stops itself at the deadline without being terminated """
+        agent = CustomPlayer(self.state.player())
+        receiver, sender = Pipe()
+        queue = TimedQueue(receiver, sender, 150)
+        start = time.perf_counter()
+        _request_action(agent, queue, self.state)
+        self.assertLess(time.perf_counter() - start, 0.15 + KILL_GRACE / 2)
+        _, metrics, action = queue.get()
+        self.assertIn(action, self.state.actions())
+        self.assertGreater(metrics["depth"], 0)
+
+    def test_deadline_counts_from_parent_start(self):
+        """ Time spent starting the agent process counts against the limit """
+        receiver, sender = Pipe()
+        queue = TimedQueue(receiver, sender, 150)
+        start = time.perf_counter() - 0.05
+        _request_action(DeadlinePlayer(0), queue, self.state, start)
+        _, metrics, _ = queue.get_nowait()
+        self.assertEqual(metrics["start"], start)
+        self.assertGreaterEqual(metrics["time_used"], 0.05)
+
+    def test_empty_queue_does_not_block(self):
+        receiver, sender = Pipe()
+        queue = TimedQueue(receiver, sender, 150)
+        with self.assertRaises(Empty):
+            queue.get_nowait()
+        with self.assertRaises(Empty):
+            queue.get(timeout=0.01)
@@ -0,0 +1,78 @@
+
+import unittest
+
+from random import Random
+
+from isolation import Isolation
+from isolation.endgame import is_partitioned, longest_path, region, solve
+
+
+def _cell(x, y):
+    return x + y * 13
+
+
+def _minimax(state, player_id):
+    """ Exhaustive game-tree search (only suitable for tiny endgames) """
+    if state.terminal_test(): return state.utility(player_id)
+    values = [_minimax(state.result(a), player_id) for a in state.actions()]
+    return max(values) if state.player() == player_id else min(values)
+
+
+class BaseEndgameTest(unittest.TestCase):
+    def setUp(self):
+        self.rng = Random(2718)
+
+    def make_partitioned_state(self, num_cells=7):
+        """ Build a state where each player is confined to one side of a
+        five-column wall of blocked cells
+        """
+        left = [_cell(x, y) for x in range(3) for y in range(9)]
+        right = [_cell(x, y) for x in range(8, 11) for y in range(9)]
+        loc0, loc1 = self.rng.choice(left), self.rng.choice(right)
+        board = 0
+        for side, loc in ((left, loc0), (right, loc1)):
+            for c in self.rng.sample([c for c in side if c != loc], num_cells):
+                board |= 1 << c
+        return Isolation(board=board, ply_count=self.rng.randint(2, 3), locs=(loc0, loc1))
+
+
+class EndgameTest(BaseEndgameTest):
+    def test_opening_is_not_partitioned(self):
+        """ Positions where a player has not been placed are never partitioned """
+        state = Isolation().result(_cell(0, 0))
+        self.assertFalse(is_partitioned(state))
+        self.assertIsNone(solve(state))
+
+    def test_blank_board_region(self):
+        """ A knight can reach every other cell of an empty board """
+        state = Isolation().result(_cell(5, 4)).result(_cell(0, 0))
+        self.assertEqual(bin(region(state.board, 57)).count("1"), 97)
+        self.assertFalse(is_partitioned(state))
+
+    def test_longest_path_line(self):
+        """ The longest tour follows a forced chain of knight moves """
+        path = [_cell(0, 0), _cell(1, 2), _cell(2, 4), _cell(3, 6)]
+        board = 0
+        for c in path[1:]: board |= 1 << c
+        length, action = longest_path(board, path[0])
+        self.assertEqual(length, 3)
+        self.assertEqual(path[0] + action, path[1])
+
+    def test_solve_matches_exhaustive_search(self):
+        """ solve() returns the same outcome as an exhaustive game-tree search """
+        solved = 0
+        for _ in range(30):
+            state = self.make_partitioned_state()
+            self.assertTrue(is_partitioned(state))
+            result = solve(state)
+            if state.terminal_test():
+                self.assertIsNone(result)
+                continue
+            solved += 1
+            for player_id in (0, 1):
+                self.assertEqual(result.utility(player_id, state), _minimax(state, player_id))
+            self.assertIn(result.action, state.actions())
+            # playing the solver move preserves the game-theoretic value
+            child = state.result(result.action)
+            self.assertEqual(_minimax(child, state.player()), result.utility(state.player(), state))
+        self.assertGreater(solved, 0)
@@ -0,0 +1,103 @@
+
+import json
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import unittest
+
+from isolation import Isolation, Agent, play_game
+from sample_players import GreedyPlayer
+
+from run_match import JsonFormatter, start_logging
+
+
+class UnprintableState(Isolation):
+    """ Initial state that fails the test if it is formatted for the log """
+    def __str__(self):
+        raise AssertionError("the state was formatted")
+
+
+class MatchLoggingTest(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, "matches.log")
+        self.root_level = logging.getLogger().level
+
+    def tearDown(self):
+        logging.getLogger().setLevel(self.root_level)
+        shutil.rmtree(self.tmpdir)
+
+    def play(self, state):
+        agents = (Agent(GreedyPlayer, "first"), Agent(GreedyPlayer, "second"))
+        return play_game((agents, state, 150, 7))
+
+    def test_states_not_formatted_at_info(self):
+        with self.assertLogs("isolation", level=logging.INFO) as logs:
+            result = self.play(UnprintableState(width=5, height=5))
+        [record] = logs.records
+        self.assertEqual(record.event, "game_end")
+        self.assertEqual((record.match_id, record.moves), (7, len(result.history)))
+        self.assertEqual(record.winner, result.winner.name)
+
+    def test_debug_logs_states(self):
+        with self.assertLogs("isolation", level=logging.DEBUG) as logs:
+            self.play(Isolation(width=5, height=5))
+        self.assertEqual([r.event for r in logs.records], ["game_start", "game_state", "game_end"])
+
+    def test_json_lines(self):
+        """ Records are written by the background listener as JSON with the extra fields """
+        listener = start_logging(self.path, logging.INFO)
+        root = logging.getLogger()
+        handler = root.handlers[-1]
+        try:
+            self.play(Isolation(width=5, height=5))
+            logging.getLogger("isolation").debug("not written")
+        finally:
+            listener.stop()
+            root.removeHandler(handler)
+            for h in listener.handlers: h.close()
+        with open(self.path) as f:
+            lines = [json.loads(line) for line in f]
+        self.assertEqual([line["event"] for line in lines], ["game_end"])
+        self.assertEqual(lines[0]["match_id"], 7)
+        self.assertEqual(lines[0]["agents"], ["first", "second"])
+
+    def test_exception_through_listener(self):
+        """ Messages & exceptions are formatted by the listener thread """
+        threads = []
+
+        class Arg:
+            def __str__(self):
+                threads.append(threading.current_thread())
+                return "here"
+
+        listener = start_logging(self.path, logging.INFO)
+        root = logging.getLogger()
+        handler = root.handlers[-1]
+        try:
+            try:
+                raise ValueError("boom")
+            except ValueError:
+                logging.getLogger("test").exception("failed %s", Arg(), extra={"event": "error"})
+        finally:
+            listener.stop()
+            root.removeHandler(handler)
+            for h in listener.handlers: h.close()
+        with open(self.path) as f:
+            [line] = [json.loads(line) for line in f]
+        self.assertEqual((line["message"], line["event"]), ("failed here", "error"))
+        self.assertIn("ValueError: boom", line["exception"])
+        self.assertTrue(any(t is not threading.current_thread() for t in threads))
+
+    def test_formatter_exception(self):
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            record = logging.getLogger("test").makeRecord(
+                "test", logging.ERROR, __file__, 0, "failed %s", ("here",), sys.exc_info())
+        data = json.loads(JsonFormatter().format(record))
+        self.assertEqual(data["message"], "failed here")
+        self.assertIn("ValueError: boom", data["exception"])
@@ -0,0 +1,49 @@
+
+import unittest
+
+from isolation import Isolation, Agent, GameResult, Status, _get_action
+from sample_players import BasePlayer, GreedyPlayer
+
+from run_match import summarize_metrics
+
+
+class CountingPlayer(BasePlayer):
+    """ Agent that reports a fixed set of metrics with its first action """
+    def get_action(self, state):
+        self.metrics = {"nodes": 42, "depth": 3}
+        self.queue.put(state.actions()[0])
+
+
+class MetricsTest(unittest.TestCase):
+    def test_round_trip(self):
+        """ Metrics reported by an agent are returned with its action """
+        state = Isolation()
+        action, metrics = _get_action(state, CountingPlayer(0), 150)
+        self.assertEqual(action, state.actions()[0])
+        self.assertEqual((metrics["nodes"], metrics["depth"]), (42, 3))
+        self.assertEqual(metrics["time_limit"], 0.15)
+        self.assertGreaterEqual(metrics["time_used"], 0)
+
+    def test_agent_without_metrics(self):
+        """ Agents that don't set metrics only report the time fields """
+        state = Isolation().result(19).result(85)
+        agent = GreedyPlayer(0)
+        self.assertIsNone(agent.metrics)
+        _, metrics = _get_action(state, agent, 150)
+        self.assertEqual(set(metrics), {"time_used", "time_limit"})
+
+    def test_summary_credits_active_agent(self):
+        """ Moves are credited to the agent that was active when the game
+        started from a state with an odd ply count (as in fair matches)
+        """
+        first, second = Agent(None, "first"), Agent(None, "second")
+        initial_state = Isolation().result(57)  # player 1 moves next
+        history = [37, 25, 11]
+        metrics = [{"nodes": 10}, {"nodes": 1}, {"nodes": 20}]
+        result = GameResult((first, second), initial_state, history, metrics,
+                            Status.GAME_OVER, second, first, 0)
+        summary = summarize_metrics([result])
+        self.assertEqual(summary["second"]["moves"], 2)
+        self.assertEqual(summary["second"]["mean_nodes"], 15)
+        self.assertEqual(summary["first"]["moves"], 1)
+        self.assertEqual(summary["first"]["mean_nodes"], 1)
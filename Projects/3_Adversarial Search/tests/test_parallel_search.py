@@ -0,0 +1,70 @@
+
+import os
+import signal
+import time
+import unittest
+
+from multiprocessing import Pipe, Process
+
+from isolation import Isolation, TimedQueue, fork_get_action, _request_action
+from my_custom_player import CustomPlayer
+
+
+def forked_processes():
+    """ Return the pids of the live processes forked from this process (or
+    from its children), identified by sharing the command line of this process
+    """
+    with open("/proc/self/cmdline", "rb") as f:
+        cmdline = f.read()
+    pids = set()
+    for name in os.listdir("/proc"):
+        if not name.isdigit() or int(name) == os.getpid():
+            continue
+        try:
+            with open("/proc/{}/cmdline".format(name), "rb") as f:
+                if f.read() != cmdline:
+                    continue
+            with open("/proc/{}/stat".format(name)) as f:
+                if f.read().rsplit(")", 1)[1].split()[0] == "Z":  # zombie
+                    continue
+        except IOError:  # the process exited
+            continue
+        pids.add(int(name))
+    return pids
+
+
+@unittest.skipUnless(os.path.isdir("/proc"), "requires /proc to find worker processes")
+class ParallelSearchTest(unittest.TestCase):
+    def setUp(self):
+        self.state = Isolation().result(19).result(85)
+        self.existing = forked_processes()
+
+    def tearDown(self):
+        for pid in forked_processes() - self.existing:  # don't leave orphans if a test fails
+            os.kill(pid, signal.SIGKILL)
+
+    def assertNoWorkersLeft(self, timeout=2):
+        deadline = time.perf_counter() + timeout
+        while forked_processes() - self.existing and time.perf_counter() < deadline:
+            time.sleep(0.05)
+        self.assertEqual(forked_processes() - self.existing, set())
+
+    def test_fork_get_action(self):
+        """ A parallel search returns a legal move and stops its workers """
+        agent = CustomPlayer(self.state.player(), search_processes=2)
+        action = fork_get_action(self.state, agent, 150)
+        self.assertIn(action, self.state.actions())
+        self.assertNoWorkersLeft()
+
+    def test_agent_terminated(self):
+        """ The workers are stopped when the agent process is terminated """
+        agent = CustomPlayer(self.state.player(), search_processes=2)
+        receiver, sender = Pipe()
+        queue = TimedQueue(receiver, sender, 60 * 1000)
+        p = Process(target=_request_action, args=(agent, queue, self.state))
+        p.start()
+        time.sleep(0.5)
+        self.assertGreater(len(forked_processes() - self.existing), 1)
+        p.terminate()
+        p.join()
+        self.assertNoWorkersLeft()
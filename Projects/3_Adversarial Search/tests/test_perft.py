@@ -0,0 +1,28 @@
+
+import unittest
+
+from isolation import SearchState
+
+from benchmark import make_position, perft, fast_perft
+
+
+class PerftTest(unittest.TestCase):
+    # known leaf counts for the fixed benchmark positions; a change in any of
+    # these values means the move generator has changed
+    COUNTS = {
+        ("empty", 1): 99,
+        ("empty", 2): 9702,
+        ("empty", 3): 55096,
+        ("opening", 3): 272,
+        ("midgame", 3): 151,
+        ("endgame", 3): 78,
+    }
+
+    def test_isolation(self):
+        for (name, depth), nodes in self.COUNTS.items():
+            self.assertEqual(perft(make_position(name), depth), nodes, (name, depth))
+
+    def test_search_state(self):
+        for (name, depth), nodes in self.COUNTS.items():
+            state = SearchState.from_state(make_position(name))
+            self.assertEqual(fast_perft(state, depth), nodes, (name, depth))
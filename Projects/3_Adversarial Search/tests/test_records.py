@@ -0,0 +1,106 @@
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from multiprocessing import Process
+from random import Random
+from unittest import mock
+
+from isolation import Isolation, Agent, GameResult, Status
+from isolation.records import GameRecords, RecordWriter, positions, replay
+
+
+def random_game(seed, width=11, height=9, plies=None, status=Status.GAME_OVER):
+    """ Return a GameResult for a random game (stopped after `plies` actions if set) """
+    rng = Random(seed)
+    initial_state = state = Isolation(width=width, height=height)
+    if seed % 2:  # start some games from a position with an odd ply count, like fair matches
+        initial_state = state = state.result(rng.choice(state.actions()))
+    history = []
+    while not state.terminal_test() and len(history) != plies:
+        history.append(rng.choice(state.actions()))
+        state = state.result(history[-1])
+    agents = (Agent(None, "first"), Agent(None, "second {}".format(seed)))
+    metrics = [{"nodes": i, "time_used": 0.01 * i} for i in range(len(history))]
+    return GameResult(agents, initial_state, history, metrics, status, None, None, -seed)
+
+
+def append_games(path, seeds):
+    with RecordWriter(path, lock=True) as writer:
+        for seed in seeds:
+            writer.write(random_game(seed))
+
+
+class GameRecordsTest(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, "games.rec")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_round_trip(self):
+        results = [random_game(seed) for seed in range(6)]
+        results.append(random_game(6, width=5, height=5))
+        results.append(random_game(7, plies=5, status=Status.TIMEOUT))
+        with RecordWriter(self.path) as writer:
+            for result in results:
+                writer.write(result)
+        records = GameRecords(self.path)
+        self.assertEqual(len(records), len(results))
+        for result, record in zip(results, records):
+            self.assertEqual(record.initial_state, result.initial_state)
+            self.assertEqual(record.actions, result.history)
+            self.assertEqual(record.agents, tuple(a.name for a in result.agents))
+            self.assertEqual(record.metrics, result.metrics)
+            self.assertEqual((record.status, record.match_id), (result.status, result.match_id))
+            states = list(positions(record))
+            self.assertEqual(states[-1], replay(record))
+            self.assertEqual(states[3], replay(record, 3))
+            final = states[-1]
+            if record.status == Status.GAME_OVER:
+                self.assertTrue(final.terminal_test())
+                self.assertGreater(final.utility(record.winner), 0)
+            else:  # the active player forfeits the game
+                self.assertEqual(record.winner, 1 - final.player())
+        records.close()
+
+    def test_without_metrics(self):
+        with RecordWriter(self.path, metrics=False) as writer:
+            writer.write(random_game(0))
+        self.assertIsNone(GameRecords(self.path)[0].metrics)
+
+    def test_concurrent_writers(self):
+        """ Records appended by several processes at once are all intact """
+        workers = [Process(target=append_games, args=(self.path, range(i, 40, 4))) for i in range(4)]
+        for worker in workers: worker.start()
+        for worker in workers: worker.join()
+        records = GameRecords(self.path)
+        self.assertEqual(sorted(r.match_id for r in records), sorted(-i for i in range(40)))
+        for record in records:
+            self.assertEqual(record.actions, random_game(-record.match_id).history)
+
+    def test_short_writes(self):
+        """ Records are written in full when os.write() writes only part of the data """
+        write = os.write
+        with mock.patch("isolation.records.os.write", lambda fd, data: write(fd, data[:7])):
+            append_games(self.path, range(3))
+        self.assertEqual([r.match_id for r in GameRecords(self.path)], [0, -1, -2])
+        with mock.patch("isolation.records.os.write", return_value=0):
+            with RecordWriter(self.path) as writer, self.assertRaises(OSError):
+                writer.write(random_game(0))
+
+    def test_incomplete_tail(self):
+        """ A partially written record at the end of the file is ignored """
+        append_games(self.path, range(3))
+        with open(self.path, "rb") as f:
+            data = f.read()
+        with open(self.path, "wb") as f:
+            f.write(data[:-5])
+        self.assertEqual(len(GameRecords(self.path)), 2)
+        with open(self.path, "wb") as f:
+            f.write(b"garbage!" + data)
+        with self.assertRaises(ValueError):
+            GameRecords(self.path)
@@ -0,0 +1,32 @@
+
+import unittest
+
+from random import Random
+
+from isolation import Isolation, SearchState
+
+
+class SearchStateTest(unittest.TestCase):
+    def test_matches_isolation(self):
+        """ SearchState agrees with Isolation along random games """
+        rng = Random(31415)
+        for _ in range(20):
+            state = Isolation()
+            fast_state = SearchState.from_state(state)
+            while True:
+                self.assertEqual(fast_state.to_state(), state)
+                self.assertEqual(fast_state.actions(), state.actions())
+                self.assertEqual(fast_state.terminal_test(), state.terminal_test())
+                for player_id in (0, 1):
+                    self.assertEqual(fast_state.utility(player_id), state.utility(player_id))
+                    self.assertEqual(fast_state.liberties(state.locs[player_id]),
+                                     state.liberties(state.locs[player_id]))
+                if state.terminal_test(): break
+                action = rng.choice(state.actions())
+                state, fast_state = state.result(action), fast_state.apply(action)
+
+    def test_hashable(self):
+        """ Equal SearchState instances hash to the same value """
+        state = Isolation().result(0).result(20)
+        self.assertEqual(SearchState.from_state(state), SearchState.from_state(state))
+        self.assertEqual(len({SearchState.from_state(state), SearchState.from_state(state)}), 1)
@@ -0,0 +1,80 @@
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from random import Random
+
+import numpy as np
+
+from isolation import Isolation, Agent, GameResult, Status
+
+import batch_eval
+import self_play
+
+
+def random_game(seed, width=5, height=5):
+    rng = Random(seed)
+    initial_state = state = Isolation(width=width, height=height)
+    history = []
+    while not state.terminal_test():
+        history.append(rng.choice(state.actions()))
+        state = state.result(history[-1])
+    agent = Agent(None, "agent")
+    return GameResult((agent, agent), initial_state, history, [{}] * len(history),
+                      Status.GAME_OVER, agent, agent, seed)
+
+
+class SelfPlayTest(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, "games.npz")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_positions_label_winner(self):
+        """ Every position of a game is labeled with the winner of the game """
+        results = [random_game(seed) for seed in range(5)]
+        states, winners, games = self_play.positions(results)
+        self.assertEqual(len(states), sum(len(r.history) for r in results))
+        for result in results:
+            state = result.initial_state
+            for action in result.history:
+                state = state.result(action)
+            rows = games == result.match_id
+            self.assertTrue((winners[rows] == (0 if state.utility(0) > 0 else 1)).all())
+
+    def test_file_round_trip(self):
+        states, winners, games = self_play.positions([random_game(seed) for seed in range(5)])
+        self_play.save_positions(self.path, states, winners, games)
+        batch, loaded_winners, loaded_games = self_play.load_positions(self.path)
+        expected = batch_eval.pack(states)
+        self.assertEqual(batch.open.tolist(), expected.open.tolist())
+        self.assertEqual(batch.locs.tolist(), expected.locs.tolist())
+        self.assertEqual(batch.players.tolist(), expected.players.tolist())
+        self.assertEqual((batch.width, batch.height), (5, 5))
+        self.assertEqual(loaded_winners.tolist(), winners.tolist())
+        self.assertEqual(loaded_games.tolist(), games.tolist())
+
+    def test_file_round_trip_large_board(self):
+        """ Knight locations past cell 127 are saved without wrapping """
+        states, winners, games = self_play.positions([random_game(seed, 20, 10) for seed in range(3)])
+        self_play.save_positions(self.path, states, winners, games)
+        batch, _, _ = self_play.load_positions(self.path)
+        expected = batch_eval.pack(states)
+        self.assertGreater(expected.locs.max(), 127)
+        self.assertEqual(batch.locs.tolist(), expected.locs.tolist())
+        self.assertEqual((batch.width, batch.height), (20, 10))
+
+    def test_fit_recovers_weights(self):
+        """ Logistic regression recovers the weights that generated the labels """
+        rng = np.random.RandomState(0)
+        X = rng.randint(0, 9, size=(20000, 2)).astype(np.float64)
+        true_weights = np.array([0.8, -0.5])
+        p = 1 / (1 + np.exp(-(X @ true_weights + 0.3)))
+        y = (rng.uniform(size=len(p)) < p).astype(np.float64)
+        weights, intercept = self_play.fit(X, y, l2=0)
+        np.testing.assert_allclose(weights, true_weights, atol=0.05)
+        self.assertAlmostEqual(intercept, 0.3, delta=0.15)
@@ -0,0 +1,49 @@
+
+import unittest
+
+from random import Random
+
+from isolation import Isolation
+from isolation.symmetry import (
+    SYMMETRIES, canonical_key, transform_action, transform_state
+)
+
+
+class SymmetryTest(unittest.TestCase):
+    def setUp(self):
+        rng = Random(1618)
+        self.states = [Isolation()]
+        state = Isolation()
+        while not state.terminal_test():
+            state = state.result(rng.choice(state.actions()))
+            self.states.append(state)
+
+    def test_orientations_share_key(self):
+        """ All four orientations of a state map to the same canonical key """
+        for state in self.states:
+            keys = {canonical_key(transform_state(state, s))[0] for s in SYMMETRIES}
+            self.assertEqual(len(keys), 1)
+
+    def test_distinct_states_have_distinct_keys(self):
+        """ States along a single game are never symmetric images of each other """
+        keys = [canonical_key(state)[0] for state in self.states]
+        self.assertEqual(len(keys), len(set(keys)))
+
+    def test_canonical_symmetry(self):
+        """ canonical_key() reports the symmetry that produces the canonical state """
+        for state in self.states:
+            key, symmetry = canonical_key(state)
+            canonical = transform_state(state, symmetry)
+            self.assertEqual(canonical_key(canonical), (key, 0))
+
+    def test_transform_action(self):
+        """ Transformed actions commute with applying actions to the state """
+        for state in self.states[:-1]:
+            loc = state.locs[state.player()]
+            for symmetry in SYMMETRIES:
+                image = transform_state(state, symmetry)
+                for action in state.actions():
+                    mapped = transform_action(action, loc, symmetry)
+                    self.assertIn(mapped, image.actions())
+                    self.assertEqual(transform_state(state.result(action), symmetry),
+                                     image.result(mapped))
@@ -0,0 +1,117 @@
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from functools import lru_cache
+from random import Random
+
+from isolation import Isolation
+from isolation.symmetry import SYMMETRIES, transform_state
+from isolation.tablebase import Tablebase, better, child_value, compact_key, solve, write_tablebase
+
+
+@lru_cache(maxsize=None)
+def exact_value(state):
+    """ Memoized search of Isolation states using the tablebase value convention """
+    if state.terminal_test():
+        return 1 if state.utility(state.player()) > 0 else -1
+    best = None
+    for action in state.actions():
+        value = child_value(exact_value(state.result(action)))
+        if best is None or better(value, best):
+            best = value
+    return best
+
+
+def reachable_states(state):
+    """ Return every Isolation state reachable from `state` (including itself) """
+    seen, frontier = {state}, [state]
+    while frontier:
+        state = frontier.pop()
+        if state.terminal_test(): continue
+        for action in state.actions():
+            child = state.result(action)
+            if child not in seen:
+                seen.add(child)
+                frontier.append(child)
+    return seen
+
+
+class TablebaseTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.values = solve(4, 4)
+        cls.tmpdir = tempfile.mkdtemp()
+        cls.path = os.path.join(cls.tmpdir, "4x4.tbl")
+        write_tablebase(cls.path, 4, 4, cls.values)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.tmpdir)
+
+    def random_states(self, seed, count=20):
+        rng = Random(seed)
+        states = []
+        for _ in range(count):
+            state = Isolation(width=4, height=4)
+            for _ in range(rng.randint(0, 12)):
+                if state.terminal_test(): break
+                state = state.result(rng.choice(state.actions()))
+            states.append(state)
+        return states
+
+    def test_values_match_engine_rules(self):
+        """ Every reachable 3x4 position is in the table with the value found by
+        searching Isolation states with the engine's own terminal test & utility
+        """
+        path = os.path.join(self.tmpdir, "3x4.tbl")
+        write_tablebase(path, 3, 4, solve(3, 4))
+        table = Tablebase(path)
+        for state in reachable_states(Isolation(width=3, height=4)):
+            self.assertEqual(table.get(state), exact_value(state), state)
+            best = table.best_actions(state)
+            self.assertEqual(bool(best), not state.terminal_test())
+        table.close()
+
+    def test_mirrored_positions_keep_their_values(self):
+        """ A knight whose only move is to cell 0 has no moves, so mirrored
+        positions can differ in value and must have separate keys
+        """
+        state = Isolation(board=236771, ply_count=1, locs=(2, None), width=3, height=4)
+        keys = {compact_key(transform_state(state, s)) for s in SYMMETRIES}
+        self.assertEqual(len(keys), len(SYMMETRIES))
+        self.assertEqual(solve(3, 4)[compact_key(state)], exact_value(state))
+        self.assertEqual(exact_value(state), 3)
+
+    def test_missing_position(self):
+        table = Tablebase(self.path)
+        with self.assertRaises(KeyError):
+            table.best_actions(Isolation())
+        table.close()
+
+    def test_file_round_trip(self):
+        """ Every solved position can be looked up in the memory-mapped table """
+        table = Tablebase(self.path)
+        self.assertEqual(len(table), len(self.values))
+        self.assertEqual((table.width, table.height), (4, 4))
+        for state in self.random_states(1618):
+            self.assertEqual(table.get(state), self.values[compact_key(state)])
+            if not state.terminal_test():
+                best = table.best_actions(state)
+                self.assertTrue(best)
+                for action in best:
+                    self.assertEqual(child_value(table.get(state.result(action))), table.get(state))
+        self.assertIsNone(table.get(Isolation()))
+        table.close()
+
+    def test_reject_bad_files(self):
+        with open(self.path, "rb") as f:
+            data = f.read()
+        bad_path = os.path.join(self.tmpdir, "bad.tbl")
+        for bad_data in (data[:7], data[:-1], b"NOTATBL!" + data[8:]):
+            with open(bad_path, "wb") as f:
+                f.write(bad_data)
+            with self.assertRaises(ValueError):
+                Tablebase(bad_path)